@@ -7,6 +7,9 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 
+from pokeclicker_bot_metrics import DriverMetrics, InstrumentedDriver
+from pokeclicker_bot_transport import TRANSPORTS, WebDriverTransport
+
 class PokeclickerBot:
     def __init__(self, log_callback=None, status_callback=None):
         self.log_callback = log_callback
@@ -17,6 +20,39 @@ class PokeclickerBot:
         self.target_pokemon = ""
         self.target_route = ""
         self.autoclicker_interval = 50  # Milliseconds
+        self.transport_mode = "cdp"  # Évaluation JavaScript: "webdriver", "cdp" (execute_cdp_cmd) ou "websocket"
+        self.instrument_driver = False  # Mesurer la latence de chaque appel WebDriver (rapport en fin de session)
+        self.driver_metrics = DriverMetrics()
+        self.board_snapshot_mode = True  # Lire la carte du donjon en un seul appel execute_script
+        self.board_delta_mode = True  # Ne relire que les cases modifiées depuis la dernière lecture
+        self.frontier_planner_mode = True  # Cliquer directement sur les cases adjacentes aux cases visitées
+        self.plan_cache_mode = True  # Mémoriser les chemins calculés tant que les cases concernées ne changent pas
+        self.planning_budget_ms = 50  # Temps de calcul maximal par décision (None: sans limite)
+        self.pipelined_planning = True  # Calculer l'action suivante pendant les combats
+        self.pipelined_planning_budget_ms = 250  # Temps de calcul maximal de l'action anticipée (None: sans limite)
+        self.chest_tour_mode = True  # Planifier la tournée des coffres requis puis du boss
+        self.use_dungeon_priors = True  # Orienter l'exploration vers les positions habituelles des coffres et du boss
+        self.dungeon_priors_file = "dungeon_priors.json"  # Positions apprises, par donjon
+        self.danger_zone_penalty = 0  # Surcoût des cases voisines d'un ennemi dans les chemins (0: désactivé)
+        self.state_backend_mode = "model"  # Source de l'état du donjon: "model" (DungeonRunner) ou "dom"
+        self.state_probe_ttl = 0.05  # Durée de validité (s) d'une lecture d'état fusionnée
+        self.use_event_channel = True  # Réagir aux événements poussés par la page plutôt que d'attendre
+        self.event_channel_ready = False
+        self.combat_mode = "in_page"  # "in_page" (boucle d'attaque dans la page) ou "webdriver"
+        self.attack_rate = 100  # Clics par seconde de la boucle d'attaque dans la page (cadence initiale si régulée)
+        self.adaptive_attack_rate = True  # Ajuster la cadence d'attaque aux dégâts réellement infligés
+        self.attack_rate_min = 5  # Cadence minimale (clics/s) du régulateur
+        self.attack_rate_max = 250  # Cadence maximale (clics/s) du régulateur
+        self.attack_supervision_interval = 0.25  # Intervalle (s) entre deux lectures du statut de combat
+        self.combat_telemetry = True  # Enregistrer chaque combat (courbe de santé, clics, latence) en JSONL
+        self.telemetry_dir = "telemetry"  # Dossier des fichiers de télémétrie (un fichier par session)
+        self.use_battle_time_model = True  # Coût des ennemis dans les chemins d'après la durée mesurée des combats
+        self.seconds_per_move = 0.25  # Durée (s) d'un déplacement, pour convertir la durée d'un combat en coût
+        self.path_executor_mode = True  # Exécuter les chemins planifiés en entier dans la page
+        self.path_step_delay = 0.05  # Pause (s) entre deux pas du chemin exécuté dans la page
+        self.farming_mode = "in_page"  # "in_page" (moteur de farming dans la page) ou "webdriver"
+        self.farm_reroll_interval = 0.05  # Intervalle (s) entre deux nouveaux ennemis sur la route
+        self.farm_status_interval = 10  # Intervalle (s) entre deux relevés de statistiques du farming
         self.dungeons_to_run = 0  # Nombre de donjons à exécuter (0 = illimité)
         self.dungeons_completed = 0
         self.clicks = 0
@@ -34,6 +70,63 @@ class PokeclickerBot:
         if self.status_callback:
             self.status_callback(status)
     
+    def get_transport(self):
+        """
+        Obtenir le transport d'évaluation JavaScript configuré (créé au premier appel)
+        Repli sur un transport plus simple si celui demandé n'est pas disponible avec ce navigateur
+        """
+        mode = getattr(self, "transport_mode", WebDriverTransport.name)
+        transport = getattr(self, "_transport", None)
+        
+        if transport is None or transport.driver is not self.driver or getattr(self, "_transport_mode", None) != mode:
+            if transport is not None:
+                transport.close()
+            
+            # Descendre la chaîne websocket -> cdp -> webdriver jusqu'au premier transport utilisable
+            transport_class = TRANSPORTS.get(mode, WebDriverTransport)
+            transport = None
+            while transport is None:
+                try:
+                    transport = transport_class(self.driver)
+                except Exception as e:
+                    fallback = transport_class.fallback or WebDriverTransport
+                    self.log(f"Transport {transport_class.name} indisponible, repli sur {fallback.name}: {str(e)}")
+                    transport_class = fallback
+            
+            self._transport = transport
+            self._transport_mode = mode
+        
+        return transport
+    
+    def run_js(self, script, *args):
+        """Évaluer un script dans la page via le transport configuré (sémantique de execute_script)"""
+        return self.get_transport().execute(script, *args)
+    
+    def run_js_async(self, script, *args):
+        """Évaluer un script asynchrone via le transport configuré (sémantique de execute_async_script)"""
+        return self.get_transport().execute_async(script, *args)
+    
+    def enable_driver_instrumentation(self):
+        """Envelopper le driver courant dans un proxy qui mesure chaque appel par méthode appelante"""
+        if self.driver is None or isinstance(self.driver, InstrumentedDriver):
+            return
+        self.driver = InstrumentedDriver(self.driver, self.driver_metrics, self)
+        self.log("Mesure des latences WebDriver activée")
+    
+    def log_driver_metrics(self, limit=20, reset=False):
+        """Afficher les histogrammes de latence (p50/p95/p99) des sites d'appel les plus coûteux"""
+        if not isinstance(self.driver, InstrumentedDriver):
+            return
+        
+        lines = self.driver_metrics.report_lines(limit)
+        if lines:
+            self.log(f"========== LATENCES WEBDRIVER ==========")
+            for line in lines:
+                self.log(line)
+        
+        if reset:
+            self.driver_metrics.reset()
+    
     def initialize_browser(self):
         try:
             self.log("Initialisation du navigateur...")
@@ -45,6 +138,9 @@ class PokeclickerBot:
             self.driver = webdriver.Chrome(options=options)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
+            if self.instrument_driver:
+                self.enable_driver_instrumentation()
+            
             self.log("Navigateur initialisé")
             self.update_status("Navigateur initialisé")
             return True
@@ -72,6 +168,9 @@ class PokeclickerBot:
     def close_browser(self):
         try:
             if self.driver:
+                if getattr(self, "_transport", None) is not None:
+                    self._transport.close()
+                    self._transport = None
                 self.driver.quit()
                 self.driver = None
                 self.log("Navigateur fermé")
@@ -152,7 +251,7 @@ class PokeclickerBot:
             
             # Méthode alternative: utiliser JavaScript pour déclencher un clic sur le Pokémon
             try:
-                self.driver.execute_script("Battle.clickAttack();")
+                self.run_js("Battle.clickAttack();")
                 self.clicks += 1
                 return True
             except:
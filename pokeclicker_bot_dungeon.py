@@ -7,7 +7,9 @@ from pokeclicker_bot_dungeon_base import PokeclickerBotDungeonBase
 from pokeclicker_bot_dungeon_navigation import PokeclickerBotDungeonNavigation
 from pokeclicker_bot_dungeon_combat import PokeclickerBotDungeonCombat
 from pokeclicker_bot_dungeon_pathfinding import PokeclickerBotDungeonPathfinding
-
+from pokeclicker_bot_dungeon_actions import Click, FollowPath, MoveTo
+from pokeclicker_bot_dungeon_states import DungeonRun, FINISHED, STALL_TIMEOUT, STATE_HANDLERS
+from pokeclicker_bot_events import MOVE_EVENTS
 
 class PokeclickerBotDungeon(PokeclickerBotDungeonBase, PokeclickerBotDungeonNavigation, PokeclickerBotDungeonCombat, PokeclickerBotDungeonPathfinding):
     """
@@ -60,303 +62,269 @@ class PokeclickerBotDungeon(PokeclickerBotDungeonBase, PokeclickerBotDungeonNavi
     
     def explore_dungeon(self):
         """
-        Explorer le donjon de manière stratégique et adaptive en fonction des différentes phases
-        d'exploration jusqu'à trouver et battre le boss
+        Explorer le donjon jusqu'à trouver et battre le boss
+        Machine à états: chaque état (exploring, battle, chest, boss, recovering) a sa méthode de traitement,
+        qui ne lit que les données dont il a besoin et retourne l'événement décidant de l'état suivant
         """
         try:
             self.log("Exploration du donjon avec l'algorithme optimisé...")
-            
-            # Variables pour suivre l'exploration
-            exploration_start_time = time.time()
-            exploration_attempts = 0
-            max_exploration_attempts = 250  # Augmenté pour donner plus de temps aux donjons complexes
-            found_boss = False
-            last_action_time = time.time()
-            last_state = None
-            stuck_counter = 0
-            time_since_new_tile = time.time()
-            consecutive_failures = 0
-            last_map_hash = ""
-            empty_tile_pause = 0.05  # Pause très courte pour cases vides
-            normal_pause = 0.1 # Pause standard pour autres actions
-            
-            # Statistiques d'exploration
-            stats = {
-                "chests_opened": 0,
-                "enemies_defeated": 0,
-                "tiles_explored": 0,
-                "phase_changes": 0,
-                "current_phase": "initial"
-            }
-            
-            # Détecter le type de donjon pour adapter la stratégie
-            dungeon_type = self.detect_dungeon_type()
-            self.log(f"Type de donjon détecté: {dungeon_type['name']} (difficulté: {dungeon_type['difficulty']})")
-            
-            # Initialiser les valeurs en fonction du type de donjon
-            min_chests_required = dungeon_type["min_chests"]
-            exploration_timeout = 600  # 10 minutes par défaut
-            if dungeon_type["difficulty"] == "hard":
-                exploration_timeout = 900  # 15 minutes pour les donjons difficiles
-                max_exploration_attempts = 350
-            elif dungeon_type["difficulty"] == "easy":
-                exploration_timeout = 300  # 5 minutes pour les donjons faciles
-                max_exploration_attempts = 150
-            
-            self.log(f"Stratégie adaptée: minimum {min_chests_required} coffres requis, timeout: {exploration_timeout/60:.1f} minutes")
-            
-            # Boucle principale d'exploration
-            while exploration_attempts < max_exploration_attempts and self.running:
-                current_time = time.time()
-                
-                # Vérifier le timeout global
-                if current_time - exploration_start_time > exploration_timeout:
-                    self.log(f"Exploration trop longue ({int(current_time - exploration_start_time)}s), abandon du donjon.")
-                    return False
-                
-                # Vérifier l'état actuel du jeu
-                current_state = self.check_game_state()
-                
-                # Analyser la carte pour avoir des informations à jour
-                dungeon_map = self.analyze_dungeon_map()
-                if dungeon_map:
-                    # Calculer un "hash" simple de l'état de la carte pour détecter les changements
-                    visible_count = len(dungeon_map["visible_tiles"])
-                    visited_count = len(dungeon_map["visited_tiles"])
-                    chests_count = len(dungeon_map["chests"])
-                    current_map_hash = f"{visible_count}_{visited_count}_{chests_count}"
-                    
-                    # Si la carte a changé depuis la dernière vérification
-                    if current_map_hash != last_map_hash:
-                        self.log(f"Carte mise à jour: {visible_count} cases visibles, {visited_count} visitées, {chests_count} coffres")
-                        time_since_new_tile = current_time
-                        last_map_hash = current_map_hash
-                    
-                    # Déterminer la phase d'exploration actuelle
-                    exploration_phase = self.determine_exploration_phase(dungeon_map)
-                    
-                    # Si la phase a changé, l'enregistrer
-                    if exploration_phase != stats["current_phase"]:
-                        stats["phase_changes"] += 1
-                        stats["current_phase"] = exploration_phase
-                        self.log(f"Changement de phase d'exploration: {exploration_phase}")
-                        
-                        # Réinitialiser certains compteurs lors d'un changement de phase
-                        consecutive_failures = 0
-                        stuck_counter = 0
-                
-                # Vérifier si nous sommes bloqués dans le même état
-                if current_state == last_state and (current_time - last_action_time) > 3:
-                    stuck_counter += 1
-                    self.log(f"Potentiellement bloqué dans l'état '{current_state}' pendant {int(current_time - last_action_time)}s (compteur: {stuck_counter})")
-                    
-                    # Si nous sommes bloqués trop longtemps, essayer de débloquer
-                    if stuck_counter >= 3:
-                        self.log("Tentative de déblocage...")
-                        self.attempt_to_unstuck(current_state)
-                        
-                        # Augmenter la force de l'intervention à chaque blocage
-                        if stuck_counter >= 5:
-                            self.log("Blocage persistant détecté, utilisation de l'exploration JavaScript avancée")
-                            self.force_exploration_with_javascript()
-                        
-                        # Réinitialiser les compteurs
-                        stuck_counter = 0
-                        last_action_time = current_time
-                        time_since_new_tile = current_time
-
-                # Ajouter une vérification explicite pour les coffres ignorés
-                if dungeon_map and dungeon_map["boss_pos"] and current_state == "chest":
-                    self.log("⏭️ Coffre ignoré car le boss est déjà découvert, se diriger directement vers le boss")
-                    # Forcer l'état "exploring" pour ignorer le coffre et continuer l'exploration
-                    current_state = "exploring"
-                
-                # Traiter l'état actuel avec des stratégies optimisées pour chaque état
-                if current_state == "battle":
-                    battle_result = self.handle_battle()
-                    if battle_result:
-                        stats["enemies_defeated"] += 1
-                    last_action_time = current_time
-                    last_state = current_state
-                    consecutive_failures = 0
-                
-                elif current_state == "chest":
-                    chest_result = self.handle_chest()
-                    if chest_result:
-                        stats["chests_opened"] += 1
-                    last_action_time = current_time
-                    last_state = current_state
-                    time_since_new_tile = current_time
-                    consecutive_failures = 0
-                    
-                    # Vérifier si nous avons ouvert suffisamment de coffres pour révéler le boss
-                    # en fonction du type de donjon
-                    if stats["chests_opened"] >= min_chests_required:
-                        self.log(f"Nombre minimum de coffres atteint ({stats['chests_opened']}/{min_chests_required}), recherche du boss prioritaire")
-                
-                elif current_state == "boss":
-                    self.log("Boss trouvé!")
-                    found_boss = True
-                    result = self.handle_boss_fight()
-                    
-                    if result:
-                        elapsed_time = int(current_time - exploration_start_time)
-                        self.log(f"Boss vaincu! Donjon terminé en {elapsed_time}s!")
-                        self.log(f"Statistiques: {stats['chests_opened']} coffres, {stats['enemies_defeated']} ennemis, {stats['tiles_explored']} cases")
-                        return True
-                    else:
-                        self.log("Échec lors du combat contre le boss.")
-                        return False
-                
-                elif current_state == "exploring":
-                    # Utiliser l'algorithme de pathfinding optimisé en fonction de la phase
-                    next_move = None
-                    
-                    if dungeon_map:
-                        # si disponible dans les mouvements précédents
-                        if hasattr(self, 'cached_final_target') and self.cached_final_target:
-                            target = self.cached_final_target
-                            current_state = self.check_game_state()
-                            if current_state == "exploring":  # Seulement si nous sommes toujours en exploration
-                                self.log(f"Tentative de saut direct vers la cible finale: ({target['x']}, {target['y']})")
-                                self.driver.execute_script("arguments[0].click();", target["element"])
-                                # Réinitialiser après utilisation
-                                self.cached_final_target = None
-                                # Court délai pour voir si ça a fonctionné
-                                time.sleep(0.2)
-                                new_state = self.check_game_state()
-                                if new_state != "exploring":
-                                    self.log(f"Saut direct réussi! Nouvel état: {new_state}")
-                                    last_action_time = current_time
-                                    last_state = new_state
-                                    continue  # Passer à l'itération suivante
-                        # Adapter la stratégie selon la phase d'exploration
-                        if exploration_phase == "boss_visible":
-                            self.log("Phase Boss: Optimisation du chemin vers le boss")
-                            next_move = self.find_optimal_path_to_boss(dungeon_map)
-                        elif exploration_phase == "chests_visible":
-                            self.log("Phase Coffres: Recherche du coffre le plus stratégique")
-                            next_move = self.find_strategic_chest_path(dungeon_map)
-                        else:
-                            self.log("Phase Exploration: Recherche efficace de nouvelles zones")
-                            next_move = self.find_efficient_exploration_move(dungeon_map)
-                    
-                    if next_move:
-                        consecutive_failures = 0
-                        # Enregistrer l'état de la carte avant le mouvement
-                        visible_tiles_count = len(dungeon_map["visible_tiles"]) if dungeon_map else 0
-                        
-                        # Exécuter le mouvement
-                        move_type = next_move.get("type", "unknown")
-                        self.log(f"Mouvement optimisé: {move_type}")
 
-                        if "final_target" in next_move:
-                            self.cached_final_target = next_move["final_target"]
-                            self.log(f"Cible finale mémorisée: ({next_move['final_target']['x']}, {next_move['final_target']['y']})")
-                        
-                        # Si le mouvement est direct, cliquer directement sur l'élément
-                        if next_move.get("direct", False):
-                            self.driver.execute_script("arguments[0].click();", next_move["element"])
-                            
-                            # Si ce mouvement a un objectif suivant, le traiter
-                            if "next_target" in next_move:
-                                # Attendre un court instant pour le changement d'état
-                                time.sleep(0.3)
-                                
-                                # Vérifier que l'état n'a pas changé (combat, coffre, etc.)
-                                new_state = self.check_game_state()
-                                if new_state == "exploring":
-                                    # Cliquer sur la cible suivante
-                                    self.log(f"Clique sur la cible suivante...")
-                                    target = next_move["next_target"]
-                                    self.driver.execute_script("arguments[0].click();", target["element"])
-                        else:
-                            # Pour les chemins plus complexes, suivre étape par étape
-                            if "path" in next_move and next_move["path"]:
-                                next_x, next_y = next_move["path"][0]
-                                next_element = dungeon_map["rows"][next_y][next_x]["element"]
-                                self.driver.execute_script("arguments[0].click();", next_element)
-                        
-                        # Attendre un court instant pour laisser le jeu réagir
-                        # Ajuster le temps d'attente selon le type de mouvement
-                        if "empty" in move_type or "visited" in move_type:
-                            time.sleep(empty_tile_pause)  # Très court pour cases simples
-                        else:
-                            time.sleep(normal_pause)
-                        
-                        # Vérifier si l'état a changé
-                        new_state = self.check_game_state()
-                        if new_state != "exploring":
-                            self.log(f"État changé après le mouvement: {new_state}")
-                            last_action_time = current_time
-                            last_state = new_state
-                            time_since_new_tile = current_time
-                        else:
-                            # Vérifier si la carte a été modifiée
-                            new_dungeon_map = self.analyze_dungeon_map()
-                            if new_dungeon_map:
-                                new_visible_tiles_count = len(new_dungeon_map["visible_tiles"])
-                                if new_visible_tiles_count > visible_tiles_count:
-                                    tiles_difference = new_visible_tiles_count - visible_tiles_count
-                                    stats["tiles_explored"] += tiles_difference
-                                    self.log(f"Carte modifiée: +{tiles_difference} nouvelles cases visibles")
-                                    last_action_time = current_time
-                                    time_since_new_tile = current_time
-                                else:
-                                    self.log("L'action n'a pas modifié la carte")
-                                    last_action_time = current_time
-                    else:
-                        consecutive_failures += 1
-                        self.log(f"Impossible de trouver un mouvement optimal (échecs consécutifs: {consecutive_failures})")
-                        
-                        # Si plusieurs échecs consécutifs, essayer une approche plus agressive
-                        if consecutive_failures >= 3:
-                            self.log("Tentative d'exploration avec JavaScript...")
-                            self.force_exploration_with_javascript()
-                            consecutive_failures = 0
-                            time_since_new_tile = current_time
-                
-                elif current_state == "unknown" or current_state == "error":
-                    # Vérifier si nous sommes sortis du donjon
-                    if self.check_if_dungeon_completed():
-                        self.log("Donjon terminé ou fermé, retour à la sélection de donjon")
-                        return True
-                    
-                    self.log(f"État indéterminé ({current_state}), attente...")
-                    time.sleep(1)
-                    last_action_time = current_time
-                
-                exploration_attempts += 1
-                
-                # Si aucun progrès depuis longtemps, essayer une approche différente
-                if (current_time - time_since_new_tile) > 15:
-                    self.log(f"Aucun progrès depuis {int(current_time - time_since_new_tile)}s, tentative de réinitialisation...")
-                    
-                    # Stratégies adaptatives en fonction du temps passé sans progrès
-                    if (current_time - time_since_new_tile) > 40:
-                        # Blocage très long - tentative de réinitialisation complète
-                        self.log("Blocage majeur détecté, tentative de réinitialisation complète...")
-                        self.try_complete_reset()
-                    else:
-                        # Blocage normal - exploration forcée
-                        self.force_exploration_with_javascript()
-                    
-                    time_since_new_tile = current_time
-                
-                # Pause courte entre les vérifications d'état
-                time.sleep(0.1)
-            
-            # Si on a dépassé le nombre d'essais maximum, abandonner
-            if exploration_attempts >= max_exploration_attempts:
-                self.log("Trop de tentatives d'exploration, abandon du donjon.")
-                return False
-            
-            return found_boss
-            
+            run = self.begin_dungeon_run()
+
+            # État de départ lu dans la page
+            self.enter_dungeon_state(run, self.check_game_state())
+
+            while run.state != FINISHED:
+                if not self.running:
+                    run.finish(False)
+                    break
+
+                # Vérifier le timeout global et le nombre de tours
+                if run.elapsed() > run.timeout:
+                    self.log(f"Exploration trop longue ({int(run.elapsed())}s), abandon du donjon.")
+                    self.enter_dungeon_state(run, "aborted")
+                    break
+                if run.ticks >= run.max_ticks:
+                    self.log("Trop de tentatives d'exploration, abandon du donjon.")
+                    self.enter_dungeon_state(run, "aborted")
+                    break
+
+                state = run.state
+                handler = getattr(self, STATE_HANDLERS[state])
+                tick_start = time.perf_counter()
+                event = handler(run)
+                run.record_tick(state, time.perf_counter() - tick_start)
+
+                # Budget de temps de l'état dépassé sans changement d'état
+                if run.next_state(event) == state and run.budget_exceeded():
+                    self.log(f"État '{state}' actif depuis {int(run.time_in_state())}s, budget dépassé")
+                    event = "timeout"
+
+                self.enter_dungeon_state(run, event)
+
+            for line in run.report_lines():
+                self.log(f"Temps par état - {line}")
+            return bool(run.result)
+
         except Exception as e:
             self.log(f"Erreur pendant l'exploration du donjon: {str(e)}")
             return False
 
+    def begin_dungeon_run(self):
+        """Adapter la stratégie au type de donjon et préparer la lecture de la carte"""
+        # Détecter le type de donjon pour adapter la stratégie
+        dungeon_type = self.detect_dungeon_type()
+        self.log(f"Type de donjon détecté: {dungeon_type['name']} (difficulté: {dungeon_type['difficulty']})")
+
+        # Initialiser les valeurs en fonction du type de donjon
+        exploration_timeout = 600  # 10 minutes par défaut
+        max_exploration_attempts = 250  # Augmenté pour donner plus de temps aux donjons complexes
+        if dungeon_type["difficulty"] == "hard":
+            exploration_timeout = 900  # 15 minutes pour les donjons difficiles
+            max_exploration_attempts = 350
+        elif dungeon_type["difficulty"] == "easy":
+            exploration_timeout = 300  # 5 minutes pour les donjons faciles
+            max_exploration_attempts = 150
+
+        run = DungeonRun(min_chests_required=dungeon_type["min_chests"], timeout=exploration_timeout,
+                         max_ticks=max_exploration_attempts)
+        self.log(f"Stratégie adaptée: minimum {run.min_chests_required} coffres requis, timeout: {exploration_timeout/60:.1f} minutes")
+
+        # Nouvelle carte: la première lecture sera complète, les suivantes incrémentales
+        self.reset_dungeon_grid()
+
+        # Canal d'événements: réagir aux changements de la page sans attendre la pause suivante
+        if getattr(self, "use_event_channel", True):
+            self.install_event_recorder()
+
+        return run
+
+    def enter_dungeon_state(self, run, event):
+        """Appliquer la transition associée à un événement"""
+        next_state = run.next_state(event)
+        if next_state == run.state:
+            return
+
+        if next_state == FINISHED and run.result is None:
+            run.result = event == "boss_defeated"
+        self.log(f"Donjon: {run.state} -> {next_state} ({event})")
+        run.enter(next_state, event)
+
+    def refresh_dungeon_map(self, run):
+        """
+        Relire la carte (lecture incrémentale) et suivre la progression de l'exploration
+        Retourne la carte à jour, ou la dernière carte connue si la lecture échoue
+        """
+        dungeon_map = self.analyze_dungeon_map()
+        if not dungeon_map:
+            return run.dungeon_map
+
+        run.dungeon_map = dungeon_map
+        self.observe_dungeon_priors(dungeon_map)
+        stats = run.stats
+
+        # La version de la grille n'augmente que si au moins une case a changé
+        if dungeon_map.version != run.last_map_version:
+            self.log(f"Carte mise à jour: {len(dungeon_map.visible)} cases visibles, {len(dungeon_map.visited)} visitées, {len(dungeon_map.chests)} coffres")
+            run.last_map_version = dungeon_map.version
+            run.note_progress()
+
+            visible_count = len(dungeon_map.visible)
+            if run.last_visible_count is not None and visible_count > run.last_visible_count:
+                stats["tiles_explored"] += visible_count - run.last_visible_count
+            run.last_visible_count = visible_count
+
+        # Phase d'exploration actuelle (recalculée à chaque modification de la grille)
+        exploration_phase = dungeon_map.exploration_phase
+        if exploration_phase != stats["current_phase"]:
+            stats["phase_changes"] += 1
+            stats["current_phase"] = exploration_phase
+            self.log(f"Changement de phase d'exploration: {exploration_phase}")
+
+            # Réinitialiser les échecs lors d'un changement de phase
+            run.consecutive_failures = 0
+
+        return dungeon_map
+
+    def run_exploring_state(self, run):
+        """Exploration: lire la carte, choisir et exécuter le prochain mouvement, puis relire l'état"""
+        dungeon_map = self.refresh_dungeon_map(run)
+
+        # Aucune nouvelle case depuis trop longtemps: passer en récupération
+        if time.time() - run.last_progress > STALL_TIMEOUT:
+            self.log(f"Aucun progrès depuis {int(time.time() - run.last_progress)}s")
+            return "stalled"
+
+        # Action déjà calculée pendant le combat précédent si la carte est celle prévue
+        next_move = self.take_planned_ahead_move(dungeon_map) if dungeon_map else None
+
+        if next_move:
+            self.log("Action calculée pendant le combat, exécution immédiate")
+            self.cached_final_target = None
+        elif dungeon_map:
+            # Cible finale du chemin précédent: tenter un saut direct
+            target = getattr(self, "cached_final_target", None)
+            if target:
+                self.log(f"Tentative de saut direct vers la cible finale: ({target.x}, {target.y})")
+                self.execute_action(target)
+                # Réinitialiser après utilisation
+                self.cached_final_target = None
+                # Court délai pour voir si ça a fonctionné
+                self.wait_for_event(MOVE_EVENTS, timeout=0.2)
+                new_state = self.check_game_state()
+                if new_state != "exploring":
+                    self.log(f"Saut direct réussi! Nouvel état: {new_state}")
+                    return new_state
+
+            # Adapter la stratégie selon la phase d'exploration (dans la limite du budget de calcul)
+            next_move = self.plan_next_move(dungeon_map, chests_needed=run.chests_needed)
+
+        if not next_move:
+            run.consecutive_failures += 1
+            self.log(f"Impossible de trouver un mouvement optimal (échecs consécutifs: {run.consecutive_failures})")
+
+            # Si plusieurs échecs consécutifs, essayer une approche plus agressive
+            if run.consecutive_failures >= 3:
+                self.log("Tentative d'exploration avec JavaScript...")
+                self.force_exploration_with_javascript()
+                run.consecutive_failures = 0
+
+            # Pause courte (interrompue par tout événement de la page)
+            self.wait_for_event(timeout=0.1)
+            return self.check_game_state()
+
+        run.consecutive_failures = 0
+        move_type = next_move.kind
+        self.log(f"Mouvement optimisé: {move_type}")
+
+        if isinstance(next_move, FollowPath) and next_move.final_target is not None:
+            self.cached_final_target = next_move.final_target
+            self.log(f"Cible finale mémorisée: ({next_move.final_target.x}, {next_move.final_target.y})")
+
+        # Clic direct, déplacement puis cible suivante, ou première étape du chemin
+        self.execute_action(next_move)
+
+        # Attendre un court instant pour laisser le jeu réagir
+        # (l'attente s'arrête dès que la page signale un effet du mouvement)
+        if "empty" in move_type or "visited" in move_type:
+            self.wait_for_event(MOVE_EVENTS, timeout=0.05)  # Très court pour cases simples
+        else:
+            self.wait_for_event(MOVE_EVENTS, timeout=0.1)
+
+        # Les nouvelles cases visibles seront comptées à la prochaine lecture de la carte
+        new_state = self.check_game_state()
+        if new_state != "exploring":
+            self.log(f"État changé après le mouvement: {new_state}")
+            run.note_progress()
+        return new_state
+
+    def run_battle_state(self, run):
+        """Combat: la carte n'est lue qu'une fois, au début du combat, pour calculer l'action suivante"""
+        # Calculer l'action suivante pendant le combat, sur la carte prédite après la victoire.
+        # La carte est relue ici (lecture incrémentale): le mouvement qui a déclenché le combat
+        # a pu révéler des cases ou parcourir plusieurs cases, et la prédiction doit les contenir
+        # pour correspondre exactement à la carte lue après le combat
+        if getattr(self, "pipelined_planning", True):
+            run.dungeon_map = self.analyze_dungeon_map() or run.dungeon_map
+            self.start_planning_ahead(run.dungeon_map, chests_needed=run.chests_needed)
+
+        if self.handle_battle():
+            run.stats["enemies_defeated"] += 1
+        return self.check_game_state()
+
+    def run_chest_state(self, run):
+        """Coffre: l'ouvrir, ou l'ignorer si le boss est connu et assez de coffres sont ouverts"""
+        stats = run.stats
+        if (run.dungeon_map and run.dungeon_map.boss is not None
+                and stats["chests_opened"] >= run.min_chests_required):
+            self.log("⏭️ Coffre ignoré car le boss est déjà découvert, se diriger directement vers le boss")
+            return "chest_skipped"
+
+        if self.handle_chest():
+            stats["chests_opened"] += 1
+            # Vérifier si nous avons ouvert suffisamment de coffres pour révéler le boss
+            if stats["chests_opened"] >= run.min_chests_required:
+                self.log(f"Nombre minimum de coffres atteint ({stats['chests_opened']}/{run.min_chests_required}), recherche du boss prioritaire")
+        run.note_progress()
+        return self.check_game_state()
+
+    def run_boss_state(self, run):
+        """Boss: combattre, le donjon est terminé dans tous les cas"""
+        self.log("Boss trouvé!")
+        stats = run.stats
+
+        if self.handle_boss_fight():
+            self.log(f"Boss vaincu! Donjon terminé en {int(run.elapsed())}s!")
+            self.log(f"Statistiques: {stats['chests_opened']} coffres, {stats['enemies_defeated']} ennemis, {stats['tiles_explored']} cases")
+            return "boss_defeated"
+
+        self.log("Échec lors du combat contre le boss.")
+        return "boss_failed"
+
+    def run_recovering_state(self, run):
+        """
+        Récupération après une erreur de lecture, un blocage ou un budget dépassé
+        Après une erreur de lecture: attendre et relire l'état; sinon exploration forcée,
+        puis réinitialisation complète si les tentatives précédentes n'ont rien débloqué
+        """
+        if run.entered_by == "error":
+            self.log("État indéterminé (error), attente...")
+            time.sleep(1)
+            return self.check_game_state()
+
+        run.recoveries += 1
+        if run.recoveries >= 3:
+            # Blocage persistant - tentative de réinitialisation complète
+            self.log("Blocage majeur détecté, tentative de réinitialisation complète...")
+            self.try_complete_reset()
+        else:
+            self.log("Blocage détecté, utilisation de l'exploration JavaScript avancée")
+            self.force_exploration_with_javascript()
+
+        # Laisser une nouvelle période à l'exploration avant le prochain blocage
+        run.last_progress = time.time()
+        return self.check_game_state()
+
     def try_complete_reset(self):
         """
         Tentative de réinitialisation complète en cas de blocage majeur
@@ -396,18 +364,17 @@ class PokeclickerBotDungeon(PokeclickerBotDungeonBase, PokeclickerBotDungeonNavi
             # 3. Tenter de retourner à la case de départ si possible
             try:
                 dungeon_map = self.analyze_dungeon_map()
-                if dungeon_map and dungeon_map["player_pos"]:
+                if dungeon_map and dungeon_map.player is not None:
                     # Trouver la case la plus proche du point de départ
                     start_positions = [(0, 0), (0, 1), (1, 0)]
                     for start_x, start_y in start_positions:
-                        if (start_x, start_y) in dungeon_map["visited_tiles"]:
+                        if dungeon_map.index(start_x, start_y) in dungeon_map.visited:
                             self.log(f"Tentative de retour au point de départ ({start_x}, {start_y})")
-                            player_x, player_y = dungeon_map["player_pos"]
+                            player_x, player_y = dungeon_map.player_pos
                             
                             # Si nous pouvons cliquer directement
                             if self.is_directly_accessible(player_x, player_y, start_x, start_y, dungeon_map):
-                                start_element = dungeon_map["rows"][start_y][start_x]["element"]
-                                self.driver.execute_script("arguments[0].click();", start_element)
+                                self.execute_action(MoveTo(start_x, start_y, kind="reset_to_start"))
                                 break
             except:
                 pass
@@ -508,6 +475,9 @@ class PokeclickerBotDungeon(PokeclickerBotDungeonBase, PokeclickerBotDungeonNavi
                 explore_result = self.explore_dungeon()
                 dungeon_duration = int(time.time() - dungeon_start_time)
                 
+                # Mettre à jour les positions apprises des coffres et du boss de ce donjon
+                self.record_dungeon_priors()
+                
                 if explore_result:
                     self.dungeons_completed += 1
                     self.log(f"Donjon #{self.dungeons_completed} terminé avec succès en {dungeon_duration}s!")
@@ -543,6 +513,7 @@ class PokeclickerBotDungeon(PokeclickerBotDungeonBase, PokeclickerBotDungeonNavi
         self.log(f"Donjons complétés: {self.dungeons_completed}")
         self.log(f"Total coffres: {self.total_chests_found}, Total ennemis: {self.total_enemies_defeated}")
         self.log(f"Durée totale: {elapsed_time} secondes")
+        self.log_driver_metrics()
         self.update_status("Donjons terminés")
 
     def reset_dungeon_stats(self):
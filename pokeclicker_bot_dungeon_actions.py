@@ -0,0 +1,59 @@
+class DungeonAction:
+    """
+    Action de déplacement produite par les planificateurs
+    Ne transporte que des coordonnées: les cases sont résolues au moment du clic
+    """
+
+    __slots__ = ("kind",)
+
+    def __init__(self, kind):
+        # Libellé de la stratégie ayant produit l'action (pour les logs et les pauses)
+        self.kind = kind
+
+
+class Click(DungeonAction):
+    """Cliquer sur une case cible (case inexplorée, ennemi, coffre ou boss)"""
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y, kind="click"):
+        super().__init__(kind)
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return f"Click({self.x}, {self.y}, kind={self.kind!r})"
+
+
+class MoveTo(DungeonAction):
+    """Se placer sur une case, puis cliquer éventuellement sur une cible adjacente (follow_up)"""
+
+    __slots__ = ("x", "y", "follow_up")
+
+    def __init__(self, x, y, kind="move", follow_up=None):
+        super().__init__(kind)
+        self.x = x
+        self.y = y
+        self.follow_up = follow_up
+
+    def __repr__(self):
+        return f"MoveTo({self.x}, {self.y}, kind={self.kind!r}, follow_up={self.follow_up!r})"
+
+
+class FollowPath(DungeonAction):
+    """Suivre un chemin de cases (x, y), avec une cible finale à cliquer une fois arrivé"""
+
+    __slots__ = ("path", "final_target")
+
+    def __init__(self, path, kind="path", final_target=None):
+        super().__init__(kind)
+        self.path = list(path)
+        self.final_target = final_target
+
+    @property
+    def next_step(self):
+        """Première case du chemin (None si le chemin est vide)"""
+        return self.path[0] if self.path else None
+
+    def __repr__(self):
+        return f"FollowPath({self.path!r}, kind={self.kind!r}, final_target={self.final_target!r})"
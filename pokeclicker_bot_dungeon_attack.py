@@ -0,0 +1,147 @@
+import math
+
+# Rapport entre deux cadences voisines de l'échelle explorée par le régulateur
+RATE_STEP = 1.5
+
+# Durée minimale (s) d'une mesure de dégâts à cadence constante
+MEASURE_WINDOW = 1.0
+
+# Écart relatif de dégâts/s en dessous duquel deux cadences sont jugées équivalentes
+DPS_TOLERANCE = 0.05
+
+# Poids d'une nouvelle mesure dans la moyenne des dégâts/s d'une cadence
+DPS_SMOOTHING = 0.5
+
+# Nombre de mesures à la cadence retenue avant de revérifier les cadences voisines
+REPROBE_WINDOWS = 10
+
+
+class AttackRateController:
+    """
+    Régulateur de la cadence d'attaque à partir des dégâts réellement infligés
+    Mesure les dégâts par seconde et par clic entre deux lectures de la santé de l'ennemi
+    et cherche la cadence la plus basse au-delà de laquelle les dégâts/s n'augmentent plus
+    (au-delà, le jeu ignore les clics supplémentaires: ils ne coûtent que du CPU et des appels)
+    Conservé d'un combat à l'autre pour repartir de la cadence apprise
+    """
+
+    def __init__(self, rate=100, min_rate=5, max_rate=250, step=RATE_STEP, window=MEASURE_WINDOW,
+                 tolerance=DPS_TOLERANCE):
+        self.base_rate = max(min_rate, min(max_rate, rate))
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.step = step
+        self.window = window
+        self.tolerance = tolerance
+
+        # Niveau k de l'échelle: cadence base_rate * step**k, bornée par min_rate et max_rate
+        self.min_level = math.floor(math.log(min_rate / self.base_rate, step) + 1e-9)
+        self.max_level = math.ceil(math.log(max_rate / self.base_rate, step) - 1e-9)
+        self.level = 0
+        self.level_dps = {}  # niveau -> dégâts/s moyens mesurés
+        self.settled_windows = 0
+
+        # Mesure en cours à la cadence cible (poursuivie d'un combat à l'autre pour les combats courts)
+        self.window_clicks = 0
+        self.window_damage = 0.0
+        self.window_seconds = 0.0
+
+        # Dernières valeurs mesurées, exposées pour les journaux et l'interface
+        self.achieved_rate = None
+        self.damage_per_second = None
+        self.damage_per_click = None
+
+        self.start_battle()
+
+    @property
+    def target_rate(self):
+        """Cadence demandée (clics par seconde)"""
+        return self.rate_of(self.level)
+
+    def rate_of(self, level):
+        return max(self.min_rate, min(self.max_rate, round(self.base_rate * self.step ** level)))
+
+    def start_battle(self):
+        """Nouveau combat: la santé et les compteurs repartent de zéro, la cadence apprise est conservée"""
+        self.last_sample = None
+
+    def observe(self, clicks, elapsed, health):
+        """
+        Ajouter une lecture: clics effectués et temps écoulé (s) depuis le début du combat, santé de l'ennemi
+        Retourne la nouvelle cadence cible si elle change, sinon None
+        """
+        sample = (clicks, elapsed, health)
+        last = self.last_sample
+        self.last_sample = sample
+
+        # Première lecture, nouvel ennemi ou compteurs remis à zéro: pas de mesure exploitable
+        if last is None or health > last[2] or clicks < last[0] or elapsed <= last[1]:
+            return None
+
+        self.window_clicks += clicks - last[0]
+        self.window_damage += last[2] - health
+        self.window_seconds += elapsed - last[1]
+        if self.window_seconds < self.window:
+            return None
+
+        return self.end_window()
+
+    def end_window(self):
+        """Clore la mesure en cours, mettre à jour les dégâts/s de la cadence et choisir la suivante"""
+        seconds = self.window_seconds
+        self.achieved_rate = self.window_clicks / seconds
+        self.damage_per_second = self.window_damage / seconds
+        self.damage_per_click = self.window_damage / self.window_clicks if self.window_clicks else None
+        self.window_clicks = 0
+        self.window_damage = 0.0
+        self.window_seconds = 0.0
+
+        previous = self.level_dps.get(self.level)
+        if previous is None:
+            self.level_dps[self.level] = self.damage_per_second
+        else:
+            self.level_dps[self.level] = previous + DPS_SMOOTHING * (self.damage_per_second - previous)
+
+        previous_rate = self.target_rate
+        self.level = self.next_level()
+        if self.target_rate == previous_rate:
+            return None
+
+        # La prochaine lecture (faite à la nouvelle cadence) sert de point de départ à la mesure suivante
+        self.last_sample = None
+        return self.target_rate
+
+    def efficient_level(self):
+        """Niveau le plus bas dont les dégâts/s sont équivalents au meilleur niveau mesuré"""
+        best = max(self.level_dps.values())
+        return min(level for level, dps in self.level_dps.items() if dps >= best * (1 - self.tolerance))
+
+    def next_level(self):
+        """
+        Montée tant que les dégâts/s augmentent avec la cadence, puis descente tant qu'ils ne diminuent pas
+        Une fois stabilisé, les niveaux voisins sont oubliés régulièrement pour suivre les changements du jeu
+        """
+        efficient = self.efficient_level()
+
+        # Les dégâts augmentent encore au niveau le plus haut mesuré: essayer plus vite
+        if efficient == max(self.level_dps) and efficient < self.max_level:
+            return efficient + 1
+
+        # Vérifier qu'une cadence plus basse ne donne pas les mêmes dégâts
+        if efficient - 1 not in self.level_dps and efficient > self.min_level:
+            return efficient - 1
+
+        self.settled_windows += 1
+        if self.settled_windows >= REPROBE_WINDOWS:
+            self.settled_windows = 0
+            self.level_dps = {efficient: self.level_dps[efficient]}
+        return efficient
+
+    def describe(self):
+        """Résumé lisible de la cadence cible, de la cadence atteinte et des dégâts mesurés"""
+        text = f"cadence cible {self.target_rate} clics/s"
+        if self.achieved_rate is not None:
+            text += f", atteinte {self.achieved_rate:.1f} clics/s, {self.damage_per_second:.1f} dégâts/s"
+        if self.damage_per_click is not None:
+            text += f" ({self.damage_per_click:.2f} par clic)"
+        return text
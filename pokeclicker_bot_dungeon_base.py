@@ -5,12 +5,27 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 
+from pokeclicker_bot_dungeon_state import STATE_BACKENDS, GameModelStateBackend
+
 class PokeclickerBotDungeonBase:
     """
     Fonctionnalités de base pour l'automatisation des donjons
     Contient les vérifications d'état et les méthodes utilitaires
     """
     
+    def get_state_backend(self):
+        """Obtenir le backend de lecture d'état configuré (modèle du jeu par défaut, DOM en repli)"""
+        mode = getattr(self, "state_backend_mode", GameModelStateBackend.name)
+        backend = getattr(self, "_state_backend", None)
+        
+        # Recréer le backend si le mode a changé depuis la dernière lecture
+        if backend is None or backend.name != mode:
+            backend_class = STATE_BACKENDS.get(mode, GameModelStateBackend)
+            backend = backend_class(self.run_js)
+            self._state_backend = backend
+        
+        return backend
+    
     def is_element_clickable(self, selector, timeout=2):
         """Vérification si un élément est vraiment cliquable"""
         try:
@@ -22,20 +37,49 @@ class PokeclickerBotDungeonBase:
             self.log(f"Erreur lors de la vérification du clic: {str(e)}")
             return False
     
-    def is_in_dungeon(self):
-        """Méthode pour détecter si nous sommes dans un donjon"""
+    def probe_game_state(self):
+        """
+        Lire tout l'état du donjon en un seul appel (voir DomStateBackend.probe)
+        Le résultat est mis en cache pour le tick courant
+        """
         try:
-            dungeon_board = self.driver.find_element(By.CSS_SELECTOR, "table.dungeon-board")
-            return True
-        except NoSuchElementException:
-            return False
+            probe = self.get_state_backend().probe()
         except Exception as e:
-            self.log(f"Erreur lors de la vérification du donjon: {str(e)}")
-            return False
+            self.log(f"Erreur lors de la lecture de l'état du jeu: {str(e)}")
+            probe = None
+        
+        return self.store_state_probe(probe)
+    
+    def store_state_probe(self, probe):
+        """Mémoriser une lecture d'état (y compris celle renvoyée par un script d'action)"""
+        self._state_probe = probe
+        self._state_probe_time = time.time()
+        return probe
+    
+    def get_state_probe(self):
+        """Obtenir la lecture d'état du tick courant, en relisant la page si elle est trop ancienne"""
+        probe = getattr(self, "_state_probe", None)
+        max_age = getattr(self, "state_probe_ttl", 0.05)
+        if probe is None or time.time() - getattr(self, "_state_probe_time", 0) > max_age:
+            probe = self.probe_game_state()
+        return probe
+    
+    def invalidate_state_probe(self):
+        """Forcer une nouvelle lecture d'état au prochain accès (après une action sur la page)"""
+        self._state_probe = None
+    
+    def is_in_dungeon(self):
+        """Méthode pour détecter si nous sommes dans un donjon"""
+        probe = self.get_state_probe()
+        return bool(probe and probe["in_dungeon"])
     
     def check_game_state(self):
         """Vérifier l'état actuel du jeu pour déterminer l'action à prendre"""
         try:
+            # Une seule lecture de la page pour tous les indicateurs de ce tick
+            if self.probe_game_state() is None:
+                return "error"
+            
             # Vérifier d'abord si le boss est visible
             boss_visible = self.has_boss_button()
             
@@ -98,36 +142,18 @@ class PokeclickerBotDungeonBase:
     
     def has_boss_button(self):
         """Vérifier si le bouton de combat contre le boss est présent"""
-        try:
-            boss_button = self.driver.find_element(By.CSS_SELECTOR, "button.btn-danger.dungeon-button")
-            return True
-        except NoSuchElementException:
-            return False
-        except Exception as e:
-            self.log(f"Erreur lors de la vérification du bouton de boss: {str(e)}")
-            return False
+        probe = self.get_state_probe()
+        return bool(probe and probe["boss"])
     
     def is_in_battle(self):
         """Vérifier si le joueur est en combat"""
-        try:
-            battle_div = self.driver.find_element(By.CSS_SELECTOR, "div[data-bind*='DungeonBattle.enemyPokemon']")
-            return True
-        except NoSuchElementException:
-            return False
-        except Exception as e:
-            self.log(f"Erreur lors de la vérification du combat: {str(e)}")
-            return False
+        probe = self.get_state_probe()
+        return bool(probe and probe["in_battle"])
     
     def is_chest_visible(self):
         """Vérifier si un coffre est visible"""
-        try:
-            chest_div = self.driver.find_element(By.CSS_SELECTOR, "div.dungeon-chest")
-            return True
-        except NoSuchElementException:
-            return False
-        except Exception as e:
-            self.log(f"Erreur lors de la vérification du coffre: {str(e)}")
-            return False
+        probe = self.get_state_probe()
+        return bool(probe and probe["chest"])
     
     def get_visible_tiles(self):
         """Obtenir toutes les cases visibles sur la carte du donjon"""
@@ -0,0 +1,67 @@
+from pokeclicker_bot_dungeon_grid import TILE_COSTS
+
+# Poids d'un nouveau combat dans les moyennes glissantes d'un donjon
+BATTLE_SMOOTHING = 0.2
+
+# Nombre de combats observés dans un donjon avant d'utiliser la durée mesurée
+MIN_BATTLES = 3
+
+# Rapport de durée entre un ennemi fort et un ennemi standard (même rapport que les coûts fixes)
+STRONG_ENEMY_FACTOR = TILE_COSTS["S"] / TILE_COSTS["E"]
+
+# Nombre de décimales des durées fournies au planificateur: évite d'invalider les chemins mémorisés
+# à chaque combat pour une variation insignifiante
+SECONDS_DIGITS = 1
+
+
+class TimeToKillModel:
+    """
+    Durée des combats estimée par donjon à partir des combats observés (santé initiale et durée)
+    Fournit au planificateur la durée attendue d'un combat par code de case ennemie
+    """
+
+    def __init__(self, smoothing=BATTLE_SMOOTHING, min_battles=MIN_BATTLES):
+        self.smoothing = smoothing
+        self.min_battles = min_battles
+        self.dungeons = {}  # nom du donjon -> {"battles", "seconds", "max_hp", "hp_per_second"}
+
+    def average(self, previous, value):
+        return value if previous is None else previous + self.smoothing * (value - previous)
+
+    def observe(self, dungeon, max_hp, duration):
+        """Ajouter un combat gagné contre un ennemi standard (santé initiale, durée en secondes)"""
+        if not dungeon or not duration or duration <= 0:
+            return
+
+        stats = self.dungeons.setdefault(dungeon, {"battles": 0, "seconds": None, "max_hp": None, "hp_per_second": None})
+        stats["battles"] += 1
+        stats["seconds"] = self.average(stats["seconds"], duration)
+        if max_hp:
+            stats["max_hp"] = self.average(stats["max_hp"], max_hp)
+            stats["hp_per_second"] = self.average(stats["hp_per_second"], max_hp / duration)
+
+    def expected_seconds(self, dungeon):
+        """
+        Durée attendue (s) d'un combat par code de case ennemie dans ce donjon
+        None tant que le donjon n'a pas assez de combats observés
+        """
+        stats = self.dungeons.get(dungeon)
+        if stats is None or stats["battles"] < self.min_battles:
+            return None
+
+        # Santé moyenne des ennemis du donjon divisée par les dégâts/s moyens de l'équipe
+        if stats["max_hp"] and stats["hp_per_second"]:
+            seconds = stats["max_hp"] / stats["hp_per_second"]
+        else:
+            seconds = stats["seconds"]
+
+        return {"E": round(seconds, SECONDS_DIGITS), "S": round(seconds * STRONG_ENEMY_FACTOR, SECONDS_DIGITS)}
+
+    def describe(self, dungeon):
+        """Résumé lisible de l'estimation pour un donjon"""
+        stats = self.dungeons.get(dungeon)
+        if stats is None:
+            return f"{dungeon}: aucun combat observé"
+        expected = self.expected_seconds(dungeon)
+        estimate = f"{expected['E']:.1f}s par combat" if expected else "estimation en attente"
+        return f"{dungeon}: {stats['battles']} combats, {estimate}"
@@ -3,6 +3,95 @@ import random
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
 
+from pokeclicker_bot_dungeon_attack import AttackRateController
+from pokeclicker_bot_dungeon_state import DOM_ENEMY_HEALTH_JS, MODEL_ENEMY_HEALTH_JS
+from pokeclicker_bot_telemetry import BattleRecorder, TelemetryWriter
+
+# Détection de la fin du combat dans la page (même sélecteur que is_in_battle)
+BATTLE_ACTIVE_JS = """
+    function battleActive() {
+        return !!document.querySelector("div[data-bind*='DungeonBattle.enemyPokemon']");
+    }
+"""
+
+# (Re)programmer la boucle d'attaque à une nouvelle cadence sans perdre ses compteurs
+ATTACK_SCHEDULE_JS = """
+    function scheduleAttacks(loop, rate) {
+        rate = Math.max(1, rate);
+        if (loop.timer) { clearInterval(loop.timer); }
+        // Les navigateurs limitent setInterval à ~4ms: au-delà de 100 clics/s on groupe les clics
+        loop.rate = rate;
+        loop.period = rate > 100 ? 10 : Math.round(1000 / rate);
+        loop.perTick = rate * loop.period / 1000;
+        loop.timer = setInterval(function() {
+            if (!battleActive()) {
+                loop.ended = true;
+                clearInterval(loop.timer);
+                loop.timer = null;
+                return;
+            }
+            loop.credit += loop.perTick;
+            while (loop.credit >= 1) {
+                loop.credit -= 1;
+                try {
+                    DungeonBattle.clickAttack();
+                    loop.clicks += 1;
+                } catch (e) {
+                    loop.errors += 1;
+                }
+            }
+        }, loop.period);
+    }
+"""
+
+# Boucle d'attaque exécutée dans la page: DungeonBattle.clickAttack à la cadence demandée,
+# arrêt automatique dès que le combat est terminé
+ATTACK_LOOP_SCRIPT = BATTLE_ACTIVE_JS + ATTACK_SCHEDULE_JS + """
+    if (typeof DungeonBattle === 'undefined' || !battleActive()) { return false; }
+
+    var previous = window.__pcbAttack;
+    if (previous && previous.timer) { clearInterval(previous.timer); }
+
+    var loop = window.__pcbAttack = {
+        clicks: 0,
+        errors: 0,
+        ended: false,
+        credit: 0,
+        started: Date.now(),
+        timer: null
+    };
+    scheduleAttacks(loop, arguments[0]);
+    return true;
+"""
+
+# État de la boucle et santé de l'ennemi en une seule évaluation
+# (arguments[0]: nouvelle cadence à appliquer dans le même appel, ou null)
+ATTACK_LOOP_STATUS_SCRIPT = BATTLE_ACTIVE_JS + ATTACK_SCHEDULE_JS + DOM_ENEMY_HEALTH_JS + MODEL_ENEMY_HEALTH_JS + """
+    var loop = window.__pcbAttack;
+    if (!loop) { return null; }
+    var active = battleActive();
+    if (arguments[0] && active && !loop.ended && arguments[0] !== loop.rate) {
+        scheduleAttacks(loop, arguments[0]);
+    }
+    return {
+        clicks: loop.clicks,
+        errors: loop.errors,
+        rate: loop.rate,
+        ended: loop.ended || !active,
+        elapsed: (Date.now() - loop.started) / 1000,
+        enemy: active ? (modelEnemyHealth() || { text: domEnemyHealthText() }) : null
+    };
+"""
+
+STOP_ATTACK_LOOP_SCRIPT = """
+    var loop = window.__pcbAttack;
+    if (!loop) { return 0; }
+    if (loop.timer) { clearInterval(loop.timer); }
+    loop.timer = null;
+    loop.ended = true;
+    return loop.clicks;
+"""
+
 class PokeclickerBotDungeonCombat:
     """
     Fonctionnalités de combat dans le donjon
@@ -10,60 +99,275 @@ class PokeclickerBotDungeonCombat:
     """
     
     def get_enemy_health_info(self):
-        """Récupérer les informations de santé de l'ennemi directement depuis l'élément span"""
+        """
+        Récupérer les informations de santé de l'ennemi
+        Lues dans DungeonBattle.enemyPokemon() ou, à défaut, dans le texte "current / max" affiché
+        """
         try:
-            # Rechercher l'élément span qui contient les informations de santé
-            health_span = self.driver.find_element(By.CSS_SELECTOR, "span[data-bind*=\"DungeonBattle.enemyPokemon().health()\"]")
-            health_text = health_span.text
-            
-            # Analyser le texte qui devrait être au format "current / max"
-            if "/" in health_text:
-                parts = health_text.split("/")
-                current_health = parts[0].strip().replace(",", "")
-                max_health = parts[1].strip().replace(",", "")
-                
-                try:
-                    current_health = float(current_health)
-                    max_health = float(max_health)
-                    health_percentage = (current_health / max_health) * 100 if max_health > 0 else 0
-                    
-                    return {
-                        "current": current_health,
-                        "max": max_health,
-                        "percentage": health_percentage,
-                        "text": health_text
-                    }
-                except ValueError:
-                    # Si la conversion en nombre échoue
-                    return None
-            
-            return None
+            return self.get_state_backend().read_enemy_health()
         except Exception as e:
             # self.log(f"Erreur lors de la lecture des informations de santé: {str(e)}")
             return None
     
+    def start_attack_loop(self, rate):
+        """Installer la boucle d'attaque dans la page (rate = clics par seconde)"""
+        try:
+            return bool(self.run_js(ATTACK_LOOP_SCRIPT, rate))
+        except Exception as e:
+            self.log(f"Erreur lors du démarrage de la boucle d'attaque: {str(e)}")
+            return False
+    
+    def get_attack_controller(self):
+        """
+        Régulateur de cadence d'attaque (conservé d'un combat à l'autre), None si adaptive_attack_rate est désactivé
+        Ses attributs target_rate, achieved_rate et damage_per_second exposent la cadence demandée et mesurée
+        """
+        if not getattr(self, "adaptive_attack_rate", True):
+            return None
+        
+        controller = getattr(self, "_attack_controller", None)
+        if controller is None:
+            controller = AttackRateController(
+                rate=getattr(self, "attack_rate", 100),
+                min_rate=getattr(self, "attack_rate_min", 5),
+                max_rate=getattr(self, "attack_rate_max", 250)
+            )
+            self._attack_controller = controller
+        return controller
+    
+    def get_telemetry_writer(self):
+        """Fichier de télémétrie des combats de la session (créé au premier combat), None si désactivé"""
+        if not getattr(self, "combat_telemetry", True):
+            return None
+        
+        writer = getattr(self, "_telemetry_writer", None)
+        if writer is None:
+            writer = self._telemetry_writer = TelemetryWriter(getattr(self, "telemetry_dir", "telemetry"))
+        return writer
+    
+    def start_battle_recorder(self, is_boss, mode, rate=None):
+        """Commencer l'enregistrement d'un combat (None si ni la télémétrie ni le modèle de durée ne l'utilisent)"""
+        if self.get_telemetry_writer() is None and self.get_battle_model() is None:
+            return None
+        
+        return BattleRecorder(dungeon=self.current_dungeon_name(), boss=is_boss, mode=mode, rate=rate)
+    
+    def record_battle(self, recorder, outcome, clicks=None):
+        """
+        Ajouter le combat terminé au fichier de télémétrie de la session
+        et à la durée des combats du donjon (combats gagnés contre un ennemi standard)
+        """
+        if recorder is None:
+            return
+        
+        record = recorder.finish(outcome, clicks)
+        self.observe_battle_time(record)
+        
+        writer = self.get_telemetry_writer()
+        if writer is None:
+            return
+        
+        try:
+            writer.write(record)
+        except Exception as e:
+            self.log(f"Erreur lors de l'enregistrement de la télémétrie du combat: {str(e)}")
+    
+    def get_attack_loop_status(self, rate=None):
+        """
+        Lire en un seul appel les clics effectués, la fin du combat et la santé de l'ennemi
+        rate: nouvelle cadence appliquée à la boucle dans le même appel
+        """
+        try:
+            status = self.run_js(ATTACK_LOOP_STATUS_SCRIPT, rate)
+        except Exception as e:
+            self.log(f"Erreur lors de la lecture de la boucle d'attaque: {str(e)}")
+            return None
+        
+        if status is None:
+            return None
+        
+        status["health"] = self.get_state_backend().to_health_info(status.get("enemy"))
+        return status
+    
+    def stop_attack_loop(self):
+        """Arrêter la boucle d'attaque de la page et retourner le nombre de clics effectués"""
+        try:
+            return int(self.run_js(STOP_ATTACK_LOOP_SCRIPT) or 0)
+        except Exception as e:
+            self.log(f"Erreur lors de l'arrêt de la boucle d'attaque: {str(e)}")
+            return 0
+    
     def handle_battle(self, is_boss=False):
+        """
+        Gérer un combat: boucle d'attaque dans la page (combat_mode "in_page")
+        ou attaques envoyées une par une via WebDriver
+        """
+        if getattr(self, "combat_mode", "in_page") == "in_page":
+            result = self.handle_battle_in_page(is_boss)
+            if result is not None:
+                return result
+            self.log("Boucle d'attaque dans la page indisponible, attaques via WebDriver")
+        
+        return self.handle_battle_with_webdriver(is_boss)
+    
+    def handle_battle_in_page(self, is_boss=False):
+        """
+        Combat piloté par la boucle d'attaque de la page: Python ne fait que superviser
+        (progression, blocage, fin du combat) avec un appel de statut périodique
+        Retourne None si la boucle n'a pas pu être installée
+        """
+        battle_type = "boss" if is_boss else "standard"
+        controller = self.get_attack_controller()
+        if controller is not None:
+            controller.start_battle()
+            rate = controller.target_rate
+        else:
+            rate = getattr(self, "attack_rate", 100)
+        pending_rate = None
+        supervision_interval = getattr(self, "attack_supervision_interval", 0.25)
+        
+        if not self.start_attack_loop(rate):
+            return None
+        
+        self.log(f"Combat {battle_type} détecté, boucle d'attaque lancée dans la page ({rate} clics/s)")
+        battle_start_time = time.time()
+        recorder = self.start_battle_recorder(is_boss, "in_page", rate)
+        outcome = "stopped"
+        clicks = 0
+        status = None
+        missing_status = 0
+        
+        health_check_interval = 3  # Vérifier la progression toutes les 3 secondes
+        last_health_check_time = battle_start_time
+        last_health_value = None
+        health_not_changed_counter = 0
+        max_health_unchanged = 4  # Après 4 vérifications sans changement (12 sec), considérer comme bloqué
+        last_progress_time = battle_start_time
+        last_progress_value = None
+        unblock_attempts = 0
+        
+        try:
+            while self.running:
+                # Réveil immédiat à la fin du combat, sinon statut à intervalle régulier
+                self.wait_for_event(["battle_end"], timeout=supervision_interval)
+                
+                probe_start = time.perf_counter()
+                new_status = self.get_attack_loop_status(pending_rate)
+                probe_latency = time.perf_counter() - probe_start
+                if new_status is None:
+                    missing_status += 1
+                    if missing_status > 3:
+                        # La boucle a disparu (rechargement de la page...): vérifier le combat
+                        if not self.is_in_battle():
+                            outcome = "ended"
+                            break
+                        if not self.start_attack_loop(rate):
+                            outcome = "loop_lost"
+                            return False
+                        if controller is not None:
+                            controller.start_battle()
+                        if recorder is not None:
+                            recorder.event("loop_restart")
+                        missing_status = 0
+                    continue
+                
+                status = new_status
+                missing_status = 0
+                if pending_rate is not None:
+                    rate = pending_rate
+                    pending_rate = None
+                    if recorder is not None:
+                        recorder.event("rate", rate)
+                if status["ended"]:
+                    outcome = "won"
+                    break
+                
+                current_time = time.time()
+                health_info = status["health"]
+                if recorder is not None:
+                    recorder.sample(health_info, status["clicks"], probe_latency)
+                if not health_info:
+                    continue
+                
+                # Ajuster la cadence aux dégâts mesurés (appliquée lors de la prochaine lecture du statut)
+                if controller is not None:
+                    pending_rate = controller.observe(status["clicks"], status["elapsed"], health_info["current"])
+                
+                # Déblocage si la santé ne bouge plus entre deux lectures rapprochées
+                if last_progress_value is None or abs(health_info["current"] - last_progress_value) >= 0.1:
+                    last_progress_value = health_info["current"]
+                    last_progress_time = current_time
+                    unblock_attempts = 0
+                elif current_time - last_progress_time > 1:
+                    unblock_attempts += 1
+                    self.log("Tentative de déblocage du combat...")
+                    if recorder is not None:
+                        recorder.event("advanced_unblock" if unblock_attempts >= 3 else "unblock", unblock_attempts)
+                    if unblock_attempts >= 3:
+                        self.try_advanced_unblocking_strategies()
+                    else:
+                        self.try_basic_unblocking_strategies()
+                    last_progress_time = current_time
+                
+                # Vérification périodique de la progression de la santé
+                if current_time - last_health_check_time > health_check_interval:
+                    self.log(f"Progression du combat: {health_info['text']} ({health_info['percentage']:.1f}%), "
+                             f"{status['clicks']} clics"
+                             + (f", {controller.describe()}" if controller is not None else ""))
+                    
+                    if last_health_value is not None and abs(health_info["current"] - last_health_value) < 1:
+                        health_not_changed_counter += 1
+                        self.log(f"⚠️ Santé semble bloquée ({health_not_changed_counter}/{max_health_unchanged} vérifications)")
+                        if recorder is not None:
+                            recorder.event("stuck", health_not_changed_counter)
+                        
+                        if health_not_changed_counter >= max_health_unchanged:
+                            self.log("❌ Combat bloqué: la santé n'a pas changé pendant trop longtemps")
+                            outcome = "stuck"
+                            return False
+                    else:
+                        health_not_changed_counter = 0
+                    
+                    last_health_value = health_info["current"]
+                    last_health_check_time = current_time
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            clicks = self.stop_attack_loop()
+            self.clicks += clicks
+            self.record_battle(recorder, outcome, clicks)
+        
+        battle_duration = time.time() - battle_start_time
+        dps = clicks / battle_duration if battle_duration > 0 else 0  # Attaques par seconde
+        self.log(f"Combat terminé en {battle_duration:.1f}s après {clicks} attaques! ({dps:.1f} attaques/s)")
+        if controller is not None:
+            self.log(f"Régulation de l'attaque: {controller.describe()}")
+        return True
+    
+    def handle_battle_with_webdriver(self, is_boss=False):
         """Gérer un combat en cliquant sur l'ennemi avec vérification d'efficacité et une stratégie adaptative"""
+        recorder = None
+        outcome = "error"
+        battle_attempts = 0
         try:
             battle_type = "boss" if is_boss else "standard"
             self.log(f"Combat {battle_type} détecté, attaque en cours...")
             battle_start_time = time.time()
-            battle_attempts = 0            
             last_check_time = time.time()
             last_health_info = None
             stuck_counter = 0
             consecutive_errors = 0
-            attack_interval = 0.01 # Intervalle initial entre les attaques (1ms)
             
-            # Obtenir les infos initiales sur la santé pour déterminer la difficulté du combat
-            initial_health_info = self.get_enemy_health_info()
-            if initial_health_info:
-                # Estimer la difficulté du combat (santé > 10000 = combat difficile)
-                difficult_battle = initial_health_info["max"] > 10000
-                if difficult_battle:
-                    self.log(f"Combat difficile détecté (HP: {initial_health_info['max']}), adapting strategy")
-                    # Réduire l'intervalle pour les combats difficiles
-                    attack_interval = 0.02
+            # Intervalle entre les attaques: fixé par le régulateur d'après les dégâts mesurés
+            # (les lectures de santé de chaque itération limitent de toute façon la cadence réelle)
+            controller = self.get_attack_controller()
+            if controller is not None:
+                controller.start_battle()
+                attack_interval = 1 / controller.target_rate
+            else:
+                attack_interval = 1 / max(1, getattr(self, "attack_rate", 100))
+            recorder = self.start_battle_recorder(is_boss, "webdriver", round(1 / attack_interval))
             
             health_check_interval = 3  # Vérifier la santé toutes les 3 secondes
             last_health_check_time = time.time()
@@ -75,7 +379,10 @@ class PokeclickerBotDungeonCombat:
                 current_time = time.time()
                 
                 # Récupérer les informations de santé actuelles
+                probe_start = time.perf_counter()
                 current_health_info = self.get_enemy_health_info()
+                if recorder is not None:
+                    recorder.sample(current_health_info, battle_attempts, time.perf_counter() - probe_start)
                 
                 # Vérification périodique de la progression de la santé
                 if current_time - last_health_check_time > health_check_interval:
@@ -90,9 +397,12 @@ class PokeclickerBotDungeonCombat:
                             if abs(current_health - last_health_value) < 1:  # Seuil minimal de changement
                                 health_not_changed_counter += 1
                                 self.log(f"⚠️ Santé semble bloquée ({health_not_changed_counter}/{max_health_unchanged} vérifications)")
+                                if recorder is not None:
+                                    recorder.event("stuck", health_not_changed_counter)
                                 
                                 if health_not_changed_counter >= max_health_unchanged:
                                     self.log("❌ Combat bloqué: la santé n'a pas changé pendant trop longtemps")
+                                    outcome = "stuck"
                                     return False
                             else:
                                 # Réinitialiser le compteur si la santé change
@@ -115,6 +425,8 @@ class PokeclickerBotDungeonCombat:
                                 
                                 if stuck_counter >= 2:  # Réagir plus rapidement aux blocages
                                     self.log("Tentative de déblocage du combat...")
+                                    if recorder is not None:
+                                        recorder.event("advanced_unblock" if stuck_counter >= 5 else "unblock", stuck_counter)
                                     
                                     # Stratégie de déblocage adaptative
                                     if stuck_counter >= 5:
@@ -129,20 +441,18 @@ class PokeclickerBotDungeonCombat:
                                     last_check_time = current_time
                         else:
                             # La santé a changé, réinitialiser les compteurs
-                            battle_is_progressing = True
-                            
-                            # Adapter la fréquence des logs en fonction de la progression
-                            hp_percentage = current_health_info["percentage"]
-                            
-                            # Adapter la stratégie en fonction de la progression du combat
-                            if hp_percentage < 20 and attack_interval > 0.02:
-                                # Accélérer les attaques en fin de combat
-                                attack_interval = 0.02
-                                self.log("Phase finale du combat, accélération des attaques")
-                            
                             stuck_counter = 0
                             last_check_time = current_time
                     
+                    # Ajuster l'intervalle entre les attaques aux dégâts mesurés
+                    if controller is not None:
+                        new_rate = controller.observe(battle_attempts, current_time - battle_start_time,
+                                                      current_health_info["current"])
+                        if new_rate is not None:
+                            attack_interval = 1 / new_rate
+                            if recorder is not None:
+                                recorder.event("rate", new_rate)
+                    
                     # Mettre à jour les informations de santé
                     last_health_info = current_health_info
                 else:
@@ -170,19 +480,26 @@ class PokeclickerBotDungeonCombat:
                     # Si le combat dure vraiment trop longtemps, essayer une approche plus agressive
                     if battle_duration > 20:
                         self.log("Combat prolongé, activation du mode rafale d'attaques")
+                        if recorder is not None:
+                            recorder.event("burst", 5)
                         self.execute_burst_attack_mode(5)  # 5 attaques rapides
                 
                 # Pause adaptative entre les attaques
                 time.sleep(attack_interval)
             
-            battle_duration = int(time.time() - battle_start_time)
-            dps = battle_attempts / max(1, battle_duration)  # Attaques par seconde
-            self.log(f"Combat terminé en {battle_duration}s après {battle_attempts} attaques! ({dps:.1f} attaques/s)")
+            outcome = "won" if self.running else "stopped"
+            battle_duration = time.time() - battle_start_time
+            dps = battle_attempts / battle_duration if battle_duration > 0 else 0  # Attaques par seconde
+            self.log(f"Combat terminé en {battle_duration:.1f}s après {battle_attempts} attaques! ({dps:.1f} attaques/s)")
+            if controller is not None:
+                self.log(f"Régulation de l'attaque: {controller.describe()}")
             return True
                     
         except Exception as e:
             self.log(f"Erreur pendant le combat: {str(e)}")
             return False
+        finally:
+            self.record_battle(recorder, outcome, battle_attempts)
 
     def execute_multi_method_attack(self):
         """Exécute plusieurs méthodes d'attaque en séquence pour maximiser les chances de succès"""
@@ -370,9 +687,10 @@ class PokeclickerBotDungeonCombat:
             # Trouver le bouton d'ouverture du coffre et cliquer dessus
             chest_button = self.driver.find_element(By.CSS_SELECTOR, "button.chest-button")
             self.driver.execute_script("arguments[0].click();", chest_button)
+            self.invalidate_state_probe()
             
-            # Attendre que le coffre soit ouvert
-            time.sleep(0.3)
+            # Attendre que le coffre soit ouvert (réveil immédiat à l'ouverture)
+            self.wait_for_event(["chest_opened"], timeout=0.3)
             
             # Vérifier si un message de récompense est visible
             try:
@@ -400,12 +718,13 @@ class PokeclickerBotDungeonCombat:
             # Cliquer sur le bouton pour commencer le combat contre le boss
             boss_button = self.driver.find_element(By.CSS_SELECTOR, "button.btn-danger.dungeon-button")
             self.driver.execute_script("arguments[0].click();", boss_button)
+            self.invalidate_state_probe()
             
             # Attendre que le combat commence
-            time.sleep(1)
+            self.wait_for_event(["battle_start"], timeout=1)
             
             # Gérer le combat
-            return self.handle_battle()
+            return self.handle_battle(is_boss=True)
             
         except Exception as e:
             self.log(f"Erreur lors du combat contre le boss: {str(e)}")
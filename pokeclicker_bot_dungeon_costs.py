@@ -0,0 +1,155 @@
+from pokeclicker_bot_dungeon_grid import BLOCKED_CODES, ENEMY_CODES
+
+
+class CostLayer:
+    """
+    Couche d'un profil de coût: transforme le coût d'entrée d'une case calculé par les couches précédentes
+    Les couches ne modifient jamais la grille; elles sont évaluées case par case pendant la recherche
+    """
+
+    # Le coût d'une case ne dépend que de son propre code (sinon, le cache invalide à chaque modification)
+    local = True
+
+    @property
+    def key(self):
+        """Identifiant de la couche et de ses paramètres (clé du cache de planification)"""
+        return (type(self).__name__,)
+
+    def cost(self, grid, index, value):
+        """Nouveau coût de la case (None: case interdite)"""
+        return value
+
+
+class TerrainCost(CostLayer):
+    """Couche de base: coût du terrain (TILE_COSTS), cases invisibles, murs et sorties interdits"""
+
+    def cost(self, grid, index, value):
+        if grid.codes[index] in BLOCKED_CODES:
+            return None
+        return grid.costs[index]
+
+
+class ClickCost(CostLayer):
+    """Couche de base du planificateur de frontière: un clic par case, cases bloquées interdites"""
+
+    def cost(self, grid, index, value):
+        if grid.codes[index] in BLOCKED_CODES:
+            return None
+        return 1
+
+
+class EnemyCost(CostLayer):
+    """Remplacer le coût des cases ennemies (élevé pour les éviter, réduit pour forcer le passage)"""
+
+    def __init__(self, enemy_cost):
+        self.enemy_cost = enemy_cost
+
+    @property
+    def key(self):
+        return ("EnemyCost", self.enemy_cost)
+
+    def cost(self, grid, index, value):
+        if grid.codes[index] in ENEMY_CODES:
+            return self.enemy_cost
+        return value
+
+
+class EnemyPenalty(CostLayer):
+    """Ajouter un surcoût fixe aux cases ennemies"""
+
+    def __init__(self, penalty):
+        self.penalty = penalty
+
+    @property
+    def key(self):
+        return ("EnemyPenalty", self.penalty)
+
+    def cost(self, grid, index, value):
+        if grid.codes[index] in ENEMY_CODES:
+            return value + self.penalty
+        return value
+
+
+class BattleTimeCost(CostLayer):
+    """
+    Ajouter la durée estimée du combat sur les cases ennemies, convertie en coût de déplacement
+    seconds_by_code: durée moyenne (s) par code d'ennemi, seconds_per_cost: durée d'une unité de coût
+    """
+
+    def __init__(self, seconds_by_code, seconds_per_cost=1.0):
+        self.seconds_by_code = dict(seconds_by_code)
+        self.seconds_per_cost = seconds_per_cost
+
+    @property
+    def key(self):
+        return ("BattleTimeCost", tuple(sorted(self.seconds_by_code.items())), self.seconds_per_cost)
+
+    def cost(self, grid, index, value):
+        seconds = self.seconds_by_code.get(grid.codes[index])
+        if seconds:
+            return value + seconds / self.seconds_per_cost
+        return value
+
+
+class DangerZoneCost(CostLayer):
+    """Ajouter un surcoût par ennemi voisin (cases d'où un ennemi risque d'être déclenché par erreur)"""
+
+    local = False
+
+    def __init__(self, penalty):
+        self.penalty = penalty
+
+    @property
+    def key(self):
+        return ("DangerZoneCost", self.penalty)
+
+    def cost(self, grid, index, value):
+        enemies = grid.enemies
+        nearby = sum(1 for neighbor in grid.neighbors[index] if neighbor in enemies)
+        return value + nearby * self.penalty
+
+
+class VisitedOnlyCost(CostLayer):
+    """N'autoriser que les cases visitées (et les cases explicitement permises, comme la cible)"""
+
+    def __init__(self, allowed=()):
+        self.allowed = frozenset(allowed)
+
+    @property
+    def key(self):
+        return ("VisitedOnlyCost", tuple(sorted(self.allowed)))
+
+    def cost(self, grid, index, value):
+        if index not in grid.visited and index not in self.allowed:
+            return None
+        return value
+
+
+class CostProfile:
+    """
+    Profil de coût composé de couches superposées, évaluées à la demande pendant la recherche
+    Deux profils de même clé donnent les mêmes coûts: la clé sert à mémoriser les résultats
+    """
+
+    def __init__(self, *layers):
+        self.layers = tuple(layers)
+        self.key = tuple(layer.key for layer in self.layers)
+        self.local = all(layer.local for layer in self.layers)
+
+    def with_layers(self, *layers):
+        """Nouveau profil avec des couches supplémentaires (le profil d'origine n'est pas modifié)"""
+        return CostProfile(*(self.layers + tuple(layers)))
+
+    def step_cost(self, grid):
+        """Fonction index -> coût d'entrée de la case (None si interdite) pour cette grille"""
+        layers = self.layers
+
+        def step_cost(index):
+            value = None
+            for layer in layers:
+                value = layer.cost(grid, index, value)
+                if value is None:
+                    return None
+            return value
+
+        return step_cost
@@ -0,0 +1,426 @@
+import heapq
+from collections import OrderedDict
+
+from pokeclicker_bot_dungeon_state import TILE_CODES
+
+# Coût de base pour traverser une case, par code (voir TILE_CODES)
+TILE_COSTS = {
+    "P": 1,
+    "B": 1,    # Coût faible pour favoriser l'accès au boss
+    "c": 1,    # Coût faible pour favoriser l'accès aux coffres
+    "r": 1,
+    "e": 1,
+    "V": 2,    # Les cases visitées ont un coût moyen
+    "I": 999,  # Coût élevé pour éviter les cases invisibles
+    "E": 5,    # Coût élevé pour les ennemis standards
+    "S": 8,    # Coût très élevé pour les ennemis forts
+    ".": 1,    # Coût minimal pour favoriser les cases vides
+    "W": 999,  # Murs infranchissables
+    "X": 999,
+}
+UNKNOWN_TILE_COST = 10
+
+# Cases qu'on ne peut pas viser (invisibles, murs, sorties)
+BLOCKED_CODES = frozenset("IWX")
+VISITED_CODES = frozenset("PV")
+CHEST_CODES = frozenset("cre")
+ENEMY_CODES = frozenset("ES")
+# Cases comptées comme "visibles" (les cases visitées sont comptées à part)
+VISIBLE_CODES = frozenset("Bcre.ESWX")
+
+# Ordre des voisins: haut, droite, bas, gauche
+DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+# Nombre maximal de requêtes de planification mémorisées par grille
+PLAN_CACHE_SIZE = 256
+
+# Tables de voisinage partagées par toutes les grilles de mêmes dimensions
+_NEIGHBOR_TABLES = {}
+
+
+def neighbor_table(width, height):
+    """Voisins (indices, ordre DIRECTIONS) de chaque case d'une grille width x height"""
+    key = (width, height)
+    table = _NEIGHBOR_TABLES.get(key)
+    if table is None:
+        table = []
+        for y in range(height):
+            for x in range(width):
+                neighbors = []
+                for dx, dy in DIRECTIONS:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < width and 0 <= ny < height:
+                        neighbors.append(ny * width + nx)
+                table.append(tuple(neighbors))
+        table = _NEIGHBOR_TABLES[key] = tuple(table)
+    return table
+
+
+class DungeonGrid:
+    """
+    Carte du donjon sous forme de tableaux plats indexés par y * width + x
+    Codes de cases et coûts dans deux listes, index d'appartenance (visitées, visibles,
+    ennemis, coffres) dans des ensembles, voisinage précalculé
+    """
+
+    def __init__(self, width, height, codes, name=None):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.name = name
+        self.neighbors = neighbor_table(width, height)
+
+        self.codes = ["I"] * self.size
+        self.costs = [TILE_COSTS["I"]] * self.size
+        self.visited = set()
+        self.visible = set()
+        self.enemies = set()
+        self.chests = set()
+        self.common_chests = set()
+        self.rare_chests = set()
+        self.walls = set()
+        self.empty = set()
+        self.player = None
+        self.boss = None
+
+        # Renseignés par le bot après la construction
+        self.dungeon_type = None
+        self.exploration_phase = None
+        # Incrémentée à chaque modification appliquée (les planificateurs s'en servent comme clé)
+        self.version = 0
+        # Version de la carte côté page (mises à jour incrémentales)
+        self.page_version = None
+        # Version de la dernière modification de chaque case (invalidation du cache de planification)
+        self.tile_versions = [0] * self.size
+        self.plan_cache = PlanCache(self)
+        # Sommes cumulées du masque des cases inexplorées: (version, table)
+        self._unexplored_table = None
+        # Cartes de comptage par rayon, pour la version courante: {rayon: (version, comptes)}
+        self._unexplored_counts = {}
+
+        for index, code in enumerate(codes):
+            self.set_code(index, code)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Construire la grille à partir d'une capture (lignes de codes, voir TILE_CODES)"""
+        rows = snapshot["rows"]
+        height = len(rows)
+        width = len(rows[0]) if height > 0 else 0
+
+        codes = []
+        for line in rows:
+            # Compléter ou tronquer les lignes irrégulières
+            codes.extend(line[:width].ljust(width, "I"))
+
+        return cls(width, height, codes, snapshot.get("name"))
+
+    @property
+    def dungeon_name(self):
+        """Nom du donjon: titre lu dans la page, sinon nom déduit du type détecté"""
+        if self.name:
+            return self.name
+        return self.dungeon_type["name"] if self.dungeon_type else None
+
+    def copy(self):
+        """Grille indépendante avec les mêmes cases (cache de planification vide)"""
+        grid = DungeonGrid(self.width, self.height, self.codes, self.name)
+        grid.dungeon_type = self.dungeon_type
+        return grid
+
+    def set_code(self, index, code):
+        """Changer le code d'une case et mettre à jour les index qui en dépendent"""
+        self.unindex_tile(index)
+        self.codes[index] = code
+        self.costs[index] = TILE_COSTS.get(code, UNKNOWN_TILE_COST)
+
+        if code in VISITED_CODES:
+            self.visited.add(index)
+            if code == "P":
+                self.player = index
+        elif code in VISIBLE_CODES:
+            self.visible.add(index)
+            if code == "B":
+                self.boss = index
+            elif code in CHEST_CODES:
+                self.chests.add(index)
+                if code == "c":
+                    self.common_chests.add(index)
+                else:
+                    self.rare_chests.add(index)
+            elif code in ENEMY_CODES:
+                self.enemies.add(index)
+            elif code == ".":
+                self.empty.add(index)
+            else:
+                self.walls.add(index)
+
+    def apply_changes(self, changes):
+        """Appliquer une liste de modifications [(indice, code), ...] et incrémenter la version"""
+        changes = [(index, code) for index, code in changes if self.codes[index] != code]
+        if not changes:
+            return
+
+        self.version += 1
+        for index, code in changes:
+            self.set_code(index, code)
+            self.tile_versions[index] = self.version
+
+    def unindex_tile(self, index):
+        """Retirer une case de tous les index (avant changement de son code)"""
+        for indexes in (self.visited, self.visible, self.enemies, self.chests,
+                        self.common_chests, self.rare_chests, self.walls, self.empty):
+            indexes.discard(index)
+        if self.player == index:
+            self.player = None
+        if self.boss == index:
+            self.boss = None
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def position(self, index):
+        """Coordonnées (x, y) d'un indice"""
+        y, x = divmod(index, self.width)
+        return (x, y)
+
+    def positions(self, indexes):
+        """Coordonnées d'un ensemble d'indices, dans l'ordre de lecture de la carte"""
+        return [self.position(index) for index in sorted(indexes)]
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def code_at(self, x, y):
+        return self.codes[y * self.width + x]
+
+    def tile_type(self, index):
+        """Type lisible d'une case (player, boss, chest_common, enemy_strong, ...)"""
+        return TILE_CODES.get(self.codes[index], "unknown")
+
+    def is_accessible(self, index):
+        """Une case est accessible si elle n'est ni invisible, ni un mur, ni une sortie"""
+        return self.codes[index] not in BLOCKED_CODES
+
+    def is_visited(self, index):
+        return index in self.visited
+
+    def is_explored(self, index):
+        """Case visible ou visitée (le contraire d'une case inexplorée)"""
+        return index in self.visible or index in self.visited
+
+    def unexplored_table(self):
+        """
+        Table des sommes cumulées (summed-area table) des cases inexplorées, de taille (width+1) x (height+1)
+        Calculée une seule fois par version de la grille: le nombre de cases inexplorées
+        d'un rectangle quelconque s'obtient ensuite en quatre lectures
+        """
+        if self._unexplored_table is not None and self._unexplored_table[0] == self.version:
+            return self._unexplored_table[1]
+
+        stride = self.width + 1
+        table = [0] * (stride * (self.height + 1))
+        visible = self.visible
+        visited = self.visited
+        for y in range(self.height):
+            row_sum = 0
+            base = y * self.width
+            above = y * stride
+            current = above + stride
+            for x in range(self.width):
+                index = base + x
+                if index not in visible and index not in visited:
+                    row_sum += 1
+                table[current + x + 1] = table[above + x + 1] + row_sum
+
+        self._unexplored_table = (self.version, table)
+        return table
+
+    def count_unexplored(self, x, y, radius):
+        """Nombre de cases inexplorées dans le carré de rayon radius autour de (x, y), case centrale exclue"""
+        table = self.unexplored_table()
+        stride = self.width + 1
+        left = max(0, x - radius)
+        top = max(0, y - radius)
+        right = min(self.width, x + radius + 1)
+        bottom = min(self.height, y + radius + 1)
+
+        count = (table[bottom * stride + right] - table[top * stride + right]
+                 - table[bottom * stride + left] + table[top * stride + left])
+        if self.in_bounds(x, y) and not self.is_explored(self.index(x, y)):
+            count -= 1
+        return count
+
+    def unexplored_counts(self, radius):
+        """
+        Nombre de cases inexplorées autour de chaque case de la grille (liste plate, voir count_unexplored)
+        Toute la carte est calculée d'un coup à partir de la table des sommes cumulées
+        """
+        cached = self._unexplored_counts.get(radius)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+
+        table = self.unexplored_table()
+        stride = self.width + 1
+        visible = self.visible
+        visited = self.visited
+        counts = [0] * self.size
+        for y in range(self.height):
+            top = max(0, y - radius) * stride
+            bottom = min(self.height, y + radius + 1) * stride
+            for x in range(self.width):
+                left = max(0, x - radius)
+                right = min(self.width, x + radius + 1)
+                index = y * self.width + x
+                count = table[bottom + right] - table[top + right] - table[bottom + left] + table[top + left]
+                if index not in visible and index not in visited:
+                    count -= 1
+                counts[index] = count
+
+        self._unexplored_counts[radius] = (self.version, counts)
+        return counts
+
+    @property
+    def player_pos(self):
+        return self.position(self.player) if self.player is not None else None
+
+    @property
+    def boss_pos(self):
+        return self.position(self.boss) if self.boss is not None else None
+
+    @property
+    def exploration_percentage(self):
+        """Pourcentage de cases visibles (hors cases visitées, comme le comptage historique)"""
+        return (len(self.visible) / self.size) * 100 if self.size > 0 else 0
+
+
+class DistanceField:
+    """
+    Distances et prédécesseurs de toutes les cases depuis une ou plusieurs sources (une seule passe de Dijkstra)
+    Les requêtes suivantes (accessibilité, distance, chemin vers une case) sont de simples lectures
+    """
+
+    def __init__(self, grid, sources, step_cost, budget_check=None):
+        # step_cost(index) retourne le coût d'entrée dans une case, ou None si elle est interdite
+        # budget_check() est appelée à chaque case traitée et peut interrompre le calcul (exception)
+        self.grid = grid
+        self.sources = set(sources)
+        self.distances = [None] * grid.size
+        self.previous = [None] * grid.size
+
+        distances = self.distances
+        previous = self.previous
+        neighbors = grid.neighbors
+        queue = []
+        for source in sorted(self.sources):
+            distances[source] = 0
+            queue.append((0, source))
+        heapq.heapify(queue)
+
+        while queue:
+            distance, current = heapq.heappop(queue)
+            if distance > distances[current]:
+                continue
+            if budget_check is not None:
+                budget_check()
+
+            for neighbor in neighbors[current]:
+                cost = step_cost(neighbor)
+                if cost is None:
+                    continue
+
+                new_distance = distance + cost
+                known = distances[neighbor]
+                if known is None or new_distance < known:
+                    distances[neighbor] = new_distance
+                    previous[neighbor] = current
+                    heapq.heappush(queue, (new_distance, neighbor))
+
+    def reachable(self, index):
+        return self.distances[index] is not None
+
+    def distance(self, index):
+        """Coût cumulé pour atteindre la case (None si elle est inaccessible)"""
+        return self.distances[index]
+
+    def source_of(self, index):
+        """Source depuis laquelle la case est atteinte au meilleur coût"""
+        if self.distances[index] is None:
+            return None
+        while index not in self.sources:
+            index = self.previous[index]
+        return index
+
+    def path_to(self, index):
+        """
+        Chemin (x, y) vers la case, sans la case source (même format que les chemins A*)
+        Retourne None si la case est inaccessible
+        """
+        if self.distances[index] is None:
+            return None
+
+        path = []
+        while index not in self.sources:
+            path.append(self.grid.position(index))
+            index = self.previous[index]
+        path.reverse()
+        return path
+
+    def nearest(self, indexes):
+        """Case la plus proche parmi indexes (à égalité, la première dans l'ordre de lecture), ou None"""
+        best = None
+        for index in sorted(indexes):
+            distance = self.distances[index]
+            if distance is not None and (best is None or distance < self.distances[best]):
+                best = index
+        return best
+
+
+# Valeur retournée par PlanCache.get en l'absence d'entrée valide (None est un résultat légitime)
+MISSING = object()
+
+
+class PlanCache:
+    """
+    Cache LRU des requêtes de planification d'une grille (chemins, champs de distances)
+    Chaque entrée mémorise la version de la grille et les cases dont elle dépend: elle reste
+    valable tant qu'aucune de ces cases n'a changé (toutes les cases si les dépendances sont inconnues)
+    """
+
+    def __init__(self, grid, max_entries=PLAN_CACHE_SIZE):
+        self.grid = grid
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Résultat mémorisé pour key, ou MISSING si absent ou invalidé"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        version, dependencies, value = entry
+        if version != self.grid.version:
+            tile_versions = self.grid.tile_versions
+            if dependencies is None or any(tile_versions[index] > version for index in dependencies):
+                del self.entries[key]
+                self.misses += 1
+                return MISSING
+            # Aucune case utile n'a changé: l'entrée est revalidée pour la version courante
+            self.entries[key] = (self.grid.version, dependencies, value)
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value, dependencies=None):
+        """Mémoriser un résultat et les cases dont il dépend (None: toute la grille)"""
+        self.entries[key] = (self.grid.version, dependencies, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
@@ -2,6 +2,86 @@ import random
 from selenium.webdriver.common.by import By
 import time
 
+from pokeclicker_bot_dungeon_actions import Click, FollowPath, MoveTo
+from pokeclicker_bot_dungeon_state import (
+    DOM_ENEMY_HEALTH_JS, MODEL_ENEMY_HEALTH_JS, MODEL_STATE_FLAGS_JS
+)
+from pokeclicker_bot_events import MOVE_EVENTS
+
+# Clic sur une case par ses coordonnées: API du jeu en priorité, sinon clic sur la cellule du DOM
+MOVE_TO_TILE_JS = """
+    function moveToTile(x, y) {
+        try {
+            if (typeof DungeonRunner !== 'undefined' && DungeonRunner.map
+                    && typeof DungeonRunner.map.moveToCoordinates === 'function') {
+                DungeonRunner.map.moveToCoordinates(x, y);
+                return 'model';
+            }
+        } catch (e) {}
+        var rows = document.querySelectorAll('table.dungeon-board tr');
+        if (y < 0 || y >= rows.length) { return null; }
+        var cells = rows[y].querySelectorAll('td');
+        if (x < 0 || x >= cells.length) { return null; }
+        cells[x].click();
+        return 'dom';
+    }
+"""
+
+CLICK_TILE_SCRIPT = MOVE_TO_TILE_JS + """
+    return moveToTile(arguments[0], arguments[1]);
+"""
+
+# Exécution d'un chemin complet dans la page: un pas par intervalle, arrêt au premier pas
+# qui déclenche un combat, un coffre, le boss ou la fin du donjon (ou si un pas est refusé)
+# Seuls les indicateurs apparus depuis le pas précédent arrêtent le parcours: un coffre ignoré
+# sur la case de départ n'empêche pas de partir
+FOLLOW_PATH_SCRIPT = MODEL_STATE_FLAGS_JS + DOM_ENEMY_HEALTH_JS + MODEL_ENEMY_HEALTH_JS + MOVE_TO_TILE_JS + """
+    var path = arguments[0];
+    var stepDelay = arguments[1];
+    var done = arguments[arguments.length - 1];
+    var index = 0;
+    var previous = probeFlags();
+
+    function playerPosition(flags) {
+        return (flags.in_dungeon && modelPlayerPosition()) || domPlayerPosition();
+    }
+    function stopReason(flags) {
+        var reason = null;
+        if (!flags.in_dungeon) { reason = 'dungeon_end'; }
+        else if (flags.in_battle && !previous.in_battle) { reason = 'battle'; }
+        else if (flags.chest && !previous.chest) { reason = 'chest'; }
+        else if (flags.boss && !previous.boss) { reason = 'boss'; }
+        previous = flags;
+        return reason;
+    }
+    function finish(reason) {
+        var probe = probeFlags();
+        probe.enemy = probe.in_battle ? (modelEnemyHealth() || { text: domEnemyHealthText() }) : null;
+        probe.player = playerPosition(probe);
+        done({ steps: index, stopped: reason, state: probe });
+    }
+    function step() {
+        if (index >= path.length) { finish('complete'); return; }
+
+        var target = path[index];
+        if (!moveToTile(target[0], target[1])) { finish('blocked'); return; }
+
+        setTimeout(function() {
+            var flags = probeFlags();
+            var reason = stopReason(flags);
+            var pos = playerPosition(flags);
+            if (pos && pos[0] === target[0] && pos[1] === target[1]) {
+                index += 1;
+                if (reason) { finish(reason); } else { step(); }
+            } else {
+                // Déplacement refusé par le jeu (case inaccessible) ou interrompu
+                finish(reason || 'blocked');
+            }
+        }, stepDelay);
+    }
+    if (!previous.in_dungeon) { finish('dungeon_end'); } else { step(); }
+"""
+
 class PokeclickerBotDungeonNavigation:
     """
     Fonctionnalités de navigation dans le donjon
@@ -365,4 +445,85 @@ class PokeclickerBotDungeonNavigation:
             return True
         except Exception as e:
             self.log(f"Erreur lors du déplacement direct: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+    def click_tile(self, x, y):
+        """Cliquer sur la case (x, y) sans passer par une référence d'élément WebDriver"""
+        try:
+            clicked = self.run_js(CLICK_TILE_SCRIPT, x, y)
+        except Exception as e:
+            self.log(f"Erreur lors du clic sur la case ({x}, {y}): {str(e)}")
+            return False
+
+        # L'état du jeu a pu changer: la prochaine lecture doit refaire une sonde
+        self.invalidate_state_probe()
+        if not clicked:
+            self.log(f"Case ({x}, {y}) introuvable sur la carte")
+        return bool(clicked)
+
+    def follow_path_in_page(self, path):
+        """
+        Envoyer tout le chemin à la page et l'exécuter en un seul aller-retour
+        Retourne {"steps", "stopped", "state"} (stopped: complete, battle, chest, boss,
+        dungeon_end ou blocked), ou None si l'exécuteur n'a pas pu tourner
+        """
+        step_delay_ms = int(getattr(self, "path_step_delay", 0.05) * 1000)
+        try:
+            result = self.run_js_async(
+                FOLLOW_PATH_SCRIPT, [[x, y] for x, y in path], step_delay_ms
+            )
+        except Exception as e:
+            self.log(f"Erreur lors de l'exécution du chemin dans la page: {str(e)}")
+            self.invalidate_state_probe()
+            return None
+
+        if not result:
+            self.invalidate_state_probe()
+            return None
+
+        # L'état renvoyé par l'exécuteur remplace une nouvelle sonde
+        state = self.get_state_backend().normalize_probe(result.get("state"))
+        self.store_state_probe(state)
+
+        steps = int(result.get("steps") or 0)
+        stopped = result.get("stopped") or "blocked"
+        self.log(f"Chemin exécuté dans la page: {steps}/{len(path)} pas ({stopped})")
+        return {"steps": steps, "stopped": stopped, "state": state}
+
+    def execute_action(self, action):
+        """
+        Exécuter une action produite par les planificateurs
+        Click/MoveTo: clic sur la case; FollowPath: clic sur la première étape du chemin
+        Une cible de suivi (follow_up) n'est cliquée que si le joueur est toujours en exploration
+        """
+        if isinstance(action, FollowPath):
+            if action.next_step is None:
+                return False
+            if getattr(self, "path_executor_mode", True):
+                result = self.follow_path_in_page(action.path)
+                if result is not None:
+                    if result["stopped"] == "complete" and action.final_target is not None:
+                        # Chemin parcouru en entier: viser la cible finale sans attendre un nouveau plan
+                        self.cached_final_target = None
+                        return self.execute_action(action.final_target)
+                    if result["steps"] > 0:
+                        return True
+                    # Aucun pas effectué dans la page: cliquer directement sur la première étape
+            next_x, next_y = action.next_step
+            return self.click_tile(next_x, next_y)
+
+        if not isinstance(action, (Click, MoveTo)):
+            self.log(f"Action de déplacement inconnue: {action!r}")
+            return False
+
+        if not self.click_tile(action.x, action.y):
+            return False
+
+        if isinstance(action, MoveTo) and action.follow_up is not None:
+            # Attendre que le déplacement produise son effet avant de viser la cible suivante
+            self.wait_for_event(MOVE_EVENTS, timeout=0.3)
+            if self.check_game_state() == "exploring":
+                self.log("Clique sur la cible suivante...")
+                return self.execute_action(action.follow_up)
+
+        return True
@@ -0,0 +1,1336 @@
+import heapq
+import random
+import threading
+import time
+
+from pokeclicker_bot_dungeon_actions import Click, FollowPath, MoveTo
+from pokeclicker_bot_dungeon_costs import (BattleTimeCost, ClickCost, CostProfile, EnemyCost, EnemyPenalty, TerrainCost,
+                                           VisitedOnlyCost)
+from pokeclicker_bot_dungeon_grid import BLOCKED_CODES, CHEST_CODES, MISSING, DistanceField
+
+# Coût d'une case ennemie pour les chemins qui évitent les combats
+ENEMY_AVOIDANCE_COST = 20
+# Coût réduit d'une case ennemie pour forcer le passage (ignore_enemies)
+FORCED_ENEMY_COST = 2
+# Surcoût d'une case ennemie pour le planificateur de frontière (en nombre de clics équivalents)
+FRONTIER_ENEMY_PENALTY = 4
+
+# Ajustement du score d'exploration selon le type de case
+EXPLORATION_TILE_BONUS = {
+    "c": 10,   # Bonus majeur pour les coffres
+    "r": 10,
+    "e": 10,
+    ".": 2,    # Bonus pour les cases vides
+    "E": -1,   # Pénalité légère pour les ennemis
+    "S": -1,
+}
+
+# Attraction des positions apprises des coffres et du boss: les PRIOR_TARGETS cases les plus probables,
+# pondérées par l'inverse de la distance, et poids de cette attraction dans le score d'exploration
+PRIOR_TARGETS = 32
+PRIOR_WEIGHT = 6
+
+# Nombre maximal de coffres pour le calcul exact de la tournée (au-delà: insertion puis 2-opt)
+TOUR_EXACT_LIMIT = 10
+# Nombre de points de départ essayés par l'heuristique de tournée
+TOUR_HEURISTIC_STARTS = 5
+
+
+def classify_dungeon(name=None, width=None, height=None):
+    """
+    Type, difficulté et nombre minimal de coffres d'un donjon, d'après son nom
+    ou à défaut d'après les dimensions de sa carte
+    """
+    if name is not None:
+        # Détecter les donjons spéciaux
+        if "Victory Road" in name:
+            return {"name": name, "type": "victory_road", "difficulty": "hard", "min_chests": 3}
+        elif "Cave" in name:
+            return {"name": name, "type": "cave", "difficulty": "medium", "min_chests": 2}
+        elif "Tower" in name or "Temple" in name:
+            return {"name": name, "type": "tower", "difficulty": "hard", "min_chests": 3}
+        elif "Forest" in name or "Woods" in name:
+            return {"name": name, "type": "forest", "difficulty": "easy", "min_chests": 1}
+        else:
+            # Donjon standard
+            return {"name": name, "type": "standard", "difficulty": "normal", "min_chests": 2}
+    
+    if width is not None and height is not None:
+        # Classifier en fonction de la taille
+        if width >= 15 or height >= 15:
+            return {"name": "Large Dungeon", "type": "large", "difficulty": "hard", "min_chests": 3}
+        elif width >= 10 or height >= 10:
+            return {"name": "Medium Dungeon", "type": "medium", "difficulty": "normal", "min_chests": 2}
+        else:
+            return {"name": "Small Dungeon", "type": "small", "difficulty": "easy", "min_chests": 1}
+    
+    # Valeur par défaut si la détection échoue
+    return {"name": "Unknown Dungeon", "type": "standard", "difficulty": "normal", "min_chests": 2}
+
+
+def tour_cost(order, start_costs, pair_costs, end_costs=None):
+    """Coût total d'un ordre de visite (None si une étape est impossible)"""
+    if not order:
+        return 0
+    legs = [start_costs[order[0]]]
+    legs.extend(pair_costs[a][b] for a, b in zip(order, order[1:]))
+    if end_costs is not None:
+        legs.append(end_costs[order[-1]])
+    if any(leg is None for leg in legs):
+        return None
+    return sum(legs)
+
+
+def solve_tour(start_costs, pair_costs, count, end_costs=None):
+    """
+    Choisir et ordonner count cibles parmi n pour minimiser le coût total du parcours
+    start_costs[i]: coût du départ à la cible i, pair_costs[i][j]: de la cible i à la cible j,
+    end_costs[i]: de la cible i à l'arrivée (None: parcours ouvert); None signifie inaccessible
+    Calcul exact (programmation dynamique sur les sous-ensembles) jusqu'à TOUR_EXACT_LIMIT cibles,
+    insertion la moins coûteuse puis améliorations 2-opt et échanges au-delà
+    Retourne (ordre, coût), ou (None, None) si aucun parcours n'est possible
+    """
+    n = len(start_costs)
+    count = min(count, n)
+    if count <= 0:
+        return [], 0
+    
+    if n <= TOUR_EXACT_LIMIT:
+        return solve_tour_exact(start_costs, pair_costs, count, end_costs)
+    return solve_tour_heuristic(start_costs, pair_costs, count, end_costs)
+
+
+def solve_tour_exact(start_costs, pair_costs, count, end_costs=None):
+    """Programmation dynamique de Held-Karp sur les sous-ensembles d'au plus count cibles"""
+    n = len(start_costs)
+    # best[(masque, dernière cible)] = (coût, cible précédente)
+    best = {}
+    for i in range(n):
+        if start_costs[i] is not None:
+            best[(1 << i, i)] = (start_costs[i], None)
+    
+    for mask in range(1, 1 << n):
+        size = bin(mask).count("1")
+        if size >= count:
+            continue
+        for last in range(n):
+            entry = best.get((mask, last))
+            if entry is None:
+                continue
+            for following in range(n):
+                if mask & (1 << following):
+                    continue
+                step = pair_costs[last][following]
+                if step is None:
+                    continue
+                key = (mask | (1 << following), following)
+                cost = entry[0] + step
+                if key not in best or cost < best[key][0]:
+                    best[key] = (cost, last)
+    
+    best_key = None
+    best_cost = None
+    for (mask, last), (cost, _) in best.items():
+        if bin(mask).count("1") != count:
+            continue
+        if end_costs is not None:
+            if end_costs[last] is None:
+                continue
+            cost += end_costs[last]
+        if best_cost is None or cost < best_cost or (cost == best_cost and (mask, last) < best_key):
+            best_key, best_cost = (mask, last), cost
+    
+    if best_key is None:
+        return None, None
+    
+    order = []
+    mask, last = best_key
+    while last is not None:
+        order.append(last)
+        previous = best[(mask, last)][1]
+        mask &= ~(1 << last)
+        last = previous
+    order.reverse()
+    return order, best_cost
+
+
+def solve_tour_heuristic(start_costs, pair_costs, count, end_costs=None):
+    """
+    Insertion la moins coûteuse à partir des TOUR_HEURISTIC_STARTS cibles les plus proches du départ,
+    puis 2-opt, déplacements et échanges avec les cibles non retenues; le meilleur résultat est gardé
+    """
+    n = len(start_costs)
+    
+    def cost_of(candidate):
+        cost = tour_cost(candidate, start_costs, pair_costs, end_costs)
+        return float("inf") if cost is None else cost
+    
+    seeds = sorted((i for i in range(n) if start_costs[i] is not None), key=lambda i: (start_costs[i], i))
+    best_order = None
+    best_cost = float("inf")
+    for seed in seeds[:TOUR_HEURISTIC_STARTS]:
+        order = [seed]
+        remaining = set(range(n)) - {seed}
+        
+        while len(order) < count:
+            best = None
+            for target in sorted(remaining):
+                for position in range(len(order) + 1):
+                    candidate = order[:position] + [target] + order[position:]
+                    cost = cost_of(candidate)
+                    if best is None or cost < best[0]:
+                        best = (cost, candidate, target)
+            if best is None or best[0] == float("inf"):
+                break
+            order = best[1]
+            remaining.discard(best[2])
+        
+        if len(order) < count:
+            continue
+        
+        order, cost = improve_tour(order, remaining, cost_of)
+        if cost < best_cost:
+            best_order, best_cost = order, cost
+    
+    if best_order is None or best_cost == float("inf"):
+        return None, None
+    return best_order, best_cost
+
+
+def improve_tour(order, remaining, cost_of):
+    """Recherche locale (2-opt, déplacements, échanges) jusqu'à ce qu'aucune amélioration ne soit possible"""
+    current = cost_of(order)
+    improved = True
+    while improved:
+        improved = False
+        # 2-opt: inverser un segment du parcours
+        for i in range(len(order) - 1):
+            for j in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                cost = cost_of(candidate)
+                if cost < current:
+                    order, current, improved = candidate, cost, True
+        # Déplacement: retirer une cible et la réinsérer ailleurs dans le parcours
+        for i in range(len(order)):
+            for position in range(len(order)):
+                if position == i:
+                    continue
+                shortened = order[:i] + order[i + 1:]
+                candidate = shortened[:position] + [order[i]] + shortened[position:]
+                cost = cost_of(candidate)
+                if cost < current:
+                    order, current, improved = candidate, cost, True
+        # Échange: remplacer une cible du parcours par une cible non retenue
+        for i in range(len(order)):
+            for target in sorted(remaining):
+                candidate = order[:i] + [target] + order[i + 1:]
+                cost = cost_of(candidate)
+                if cost < current:
+                    remaining.add(order[i])
+                    remaining.discard(target)
+                    order, current, improved = candidate, cost, True
+    
+    return order, current
+
+
+class PlanningTimeout(Exception):
+    """Budget de temps de planification épuisé"""
+    pass
+
+
+class PlanAhead:
+    """
+    Calcul d'une action dans un fil d'exécution séparé, sur une carte prédite (pendant un combat)
+    L'action n'est utilisée que si la carte réelle correspond exactement à la carte prédite
+    """
+
+    def __init__(self, planner, predicted_map, budget_ms=None, chests_needed=None):
+        self.planner = planner
+        self.predicted_map = predicted_map
+        self.budget_ms = budget_ms
+        self.chests_needed = chests_needed
+        self.action = None
+        self.error = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def time_left(self):
+        """Temps restant (s) sur le budget du calcul depuis son démarrage (None: sans limite)"""
+        if self.budget_ms is None:
+            return None
+        return max(0.0, self.budget_ms / 1000 - (time.perf_counter() - self.started))
+
+    def run(self):
+        try:
+            self.action = self.planner.plan(self.predicted_map, budget_ms=self.budget_ms,
+                                            chests_needed=self.chests_needed)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def matches(self, dungeon_map):
+        """La carte réelle est-elle celle qui a servi au calcul (comparaison des codes de cases)"""
+        return (dungeon_map is not None and dungeon_map.width == self.predicted_map.width
+                and dungeon_map.codes == self.predicted_map.codes)
+
+    def result(self, dungeon_map, timeout=None):
+        """Action calculée si elle est prête (après au plus timeout s) et valide pour dungeon_map, sinon None"""
+        if not self.done.wait(timeout) or self.error is not None:
+            return None
+        return self.action if self.matches(dungeon_map) else None
+
+
+class DungeonPlanner:
+    """
+    Planification des déplacements dans le donjon, sans driver ni log: grille en entrée, action en sortie
+    Les explications des choix sont accumulées dans messages (le bot les journalise ensuite)
+    """
+
+    def __init__(self, frontier_mode=True, cache_enabled=True, rng=None, priors=None, cost_layers=(),
+                 battle_model=None, seconds_per_move=None):
+        self.frontier_mode = frontier_mode
+        self.cache_enabled = cache_enabled
+        # Couches de coût ajoutées à tous les profils (durée des combats, zones dangereuses...)
+        self.cost_layers = tuple(cost_layers)
+        # Positions apprises des coffres et du boss par donjon (DungeonPriors), facultatif
+        self.priors = priors
+        # Durée mesurée des combats (TimeToKillModel) et durée d'un déplacement pour la convertir en coût
+        self.battle_model = battle_model
+        self.seconds_per_move = seconds_per_move
+        self.random = rng or random
+        self.messages = []
+        self.deadline = None
+
+    def note(self, message):
+        self.messages.append(message)
+
+    def check_budget(self):
+        """Interrompre la planification si le budget de temps est épuisé"""
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise PlanningTimeout()
+
+    def plan(self, dungeon_map, budget_ms=None, chests_needed=None):
+        """
+        Choisir la prochaine action selon la phase d'exploration
+        Avec budget_ms, un plan rapide est calculé d'abord et retourné si le budget est dépassé
+        chests_needed (coffres restant à ouvrir) active la tournée optimisée des coffres visibles
+        """
+        if dungeon_map is None or dungeon_map.player is None:
+            return None
+        
+        phase = dungeon_map.exploration_phase or self.determine_exploration_phase(dungeon_map)
+        fallback = None
+        if budget_ms is not None:
+            self.deadline = time.perf_counter() + budget_ms / 1000
+            fallback = self.quick_plan(dungeon_map, phase)
+        
+        try:
+            # Coffres encore nécessaires: tournée optimisée (coffres puis boss s'il est visible)
+            if chests_needed and dungeon_map.chests:
+                tour_move = self.find_chest_tour_move(dungeon_map, chests_needed)
+                if tour_move:
+                    return tour_move
+            
+            if phase == "boss_visible":
+                self.note("Boss découvert! Ignorer les coffres et se diriger directement vers le boss")
+                return self.find_optimal_path_to_boss(dungeon_map)
+            elif phase == "chests_visible":
+                self.note("Phase Coffres: Recherche du coffre le plus stratégique pour révéler le boss")
+                return self.find_strategic_chest_path(dungeon_map)
+            else:
+                self.note("Phase Exploration: Recherche efficace de nouvelles zones")
+                return self.find_efficient_exploration_move(dungeon_map)
+        except PlanningTimeout:
+            self.note(f"Budget de planification dépassé ({budget_ms} ms), plan rapide retenu: {fallback}")
+            return fallback
+        finally:
+            self.deadline = None
+
+    def quick_plan(self, dungeon_map, phase):
+        """
+        Plan de secours en un seul parcours de la frontière: cliquer sur la case adjacente
+        aux cases visitées la plus proche de la cible de la phase (boss, coffre ou joueur)
+        """
+        player_x, player_y = dungeon_map.player_pos
+        goal = (player_x, player_y)
+        if phase == "boss_visible" and dungeon_map.boss is not None:
+            goal = dungeon_map.boss_pos
+        elif phase == "chests_visible" and dungeon_map.chests:
+            goal = min(dungeon_map.positions(dungeon_map.chests),
+                       key=lambda chest: abs(chest[0] - player_x) + abs(chest[1] - player_y))
+        
+        best = None
+        best_distance = None
+        for visited in sorted(dungeon_map.visited):
+            for neighbor in dungeon_map.neighbors[visited]:
+                if neighbor in dungeon_map.visited or not dungeon_map.is_accessible(neighbor):
+                    continue
+                x, y = dungeon_map.position(neighbor)
+                distance = abs(x - goal[0]) + abs(y - goal[1])
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = (x, y), distance
+        
+        if best is None:
+            return None
+        return Click(best[0], best[1], kind="quick_frontier")
+
+    def determine_exploration_phase(self, dungeon_map):
+        """
+        Détermine avec plus de précision la phase actuelle d'exploration du donjon
+        """
+        # Phase Boss: Le boss est visible
+        if dungeon_map.boss is not None:
+            return "boss_visible"
+        
+        # Phase Coffres: Des coffres sont visibles mais pas le boss
+        if dungeon_map.chests:
+            return "chests_visible"
+        
+        # Si plus de 30% de la carte est visible mais pas de coffres ni de boss, on est dans une phase intermédiaire
+        if dungeon_map.exploration_percentage > 30:
+            return "intermediate_exploration"
+        
+        # Phase initiale: peu de cases sont visibles
+        return "initial_exploration"
+
+    def is_directly_accessible(self, start_x, start_y, target_x, target_y, dungeon_map):
+        """
+        Vérifier si une case cible est directement accessible depuis la case de départ
+        Une case est directement accessible si:
+        1. Elle est adjacente à la case de départ
+        2. La case de départ est visitée ou c'est la position du joueur
+        """
+        # Vérifier si les cases sont adjacentes (pas en diagonale)
+        manhattan_distance = abs(target_x - start_x) + abs(target_y - start_y)
+        if manhattan_distance != 1 or not dungeon_map.in_bounds(target_x, target_y):
+            return False
+        
+        # Vérifier si la case de départ est visitée (la position du joueur l'est toujours)
+        if dungeon_map.index(start_x, start_y) in dungeon_map.visited:
+            # Vérifier si la case cible est visible (pas invisible)
+            return dungeon_map.is_accessible(dungeon_map.index(target_x, target_y))
+        
+        return False
+
+    def can_click_from_any_visited(self, target_x, target_y, dungeon_map):
+        """
+        Vérifier si la case cible peut être cliquée depuis n'importe quelle case visitée
+        (pas nécessairement depuis la position actuelle du joueur)
+        """
+        target = dungeon_map.index(target_x, target_y)
+        if not dungeon_map.is_accessible(target):
+            return None
+        
+        # Seuls les voisins de la cible peuvent servir de point de départ (ordre de lecture de la carte)
+        for neighbor in sorted(dungeon_map.neighbors[target]):
+            if neighbor in dungeon_map.visited:
+                return dungeon_map.position(neighbor)  # Retourne la position de la case visitée depuis laquelle on peut cliquer
+                
+        return None  # Aucune case visitée ne permet d'accéder directement à la cible
+
+    def find_all_access_points(self, target_x, target_y, dungeon_map):
+        """
+        Trouve toutes les cases visitées depuis lesquelles on peut accéder directement à la cible
+        """
+        target = dungeon_map.index(target_x, target_y)
+        
+        # Voisins dans l'ordre haut, droite, bas, gauche
+        return [dungeon_map.position(neighbor) for neighbor in dungeon_map.neighbors[target]
+                if neighbor in dungeon_map.visited]
+
+    def heuristic(self, x1, y1, x2, y2):
+        """
+        Heuristique pour l'algorithme A* - Distance de Manhattan
+        Estime la distance entre deux points
+        """
+        return abs(x1 - x2) + abs(y1 - y2)
+
+    def count_enemies_on_path(self, path, dungeon_map):
+        """
+        Compte le nombre d'ennemis sur un chemin donné
+        """
+        return sum(1 for x, y in path if dungeon_map.index(x, y) in dungeon_map.enemies)
+
+    def plan_cache_for(self, dungeon_map):
+        """Cache de planification de la grille (None si le cache est désactivé)"""
+        if not self.cache_enabled:
+            return None
+        return dungeon_map.plan_cache
+
+    def cost_profile(self, *layers):
+        """Profil de coût formé des couches données puis des couches communes du planificateur"""
+        return CostProfile(*(layers + self.cost_layers))
+
+    def battle_layers(self, dungeon_map):
+        """
+        Coût mesuré des cases ennemies: un déplacement plus la durée attendue du combat,
+        exprimée en déplacements (liste vide tant que la durée des combats du donjon est inconnue)
+        """
+        if self.battle_model is None or not self.seconds_per_move:
+            return []
+        
+        seconds = self.battle_model.expected_seconds(dungeon_map.dungeon_name)
+        if seconds is None:
+            return []
+        return [EnemyCost(1), BattleTimeCost(seconds, self.seconds_per_move)]
+
+    def search_path(self, start, goal, dungeon_map, profile):
+        """
+        A* sur les indices de la grille, avec les coûts du profil (CostProfile)
+        Le résultat est mémorisé pour (départ, but, profil)
+        Retourne la liste des positions (x, y) sans la case de départ, ou None
+        """
+        step_cost = profile.step_cost(dungeon_map)
+        cache = self.plan_cache_for(dungeon_map)
+        if cache is not None:
+            key = ("path", start, goal, profile.key)
+            path = cache.get(key)
+            if path is MISSING:
+                # Cases dont le coût a été consulté: le chemin ne change que si l'une d'elles change
+                # (un profil non local dépend aussi des voisins: toute modification l'invalide)
+                examined = {start}
+                path = self.run_path_search(start, goal, dungeon_map, step_cost, examined)
+                cache.put(key, path, examined if profile.local else None)
+            return list(path) if path is not None else None
+        
+        return self.run_path_search(start, goal, dungeon_map, step_cost)
+
+    def run_path_search(self, start, goal, dungeon_map, step_cost, examined=None):
+        """Recherche A* proprement dite (voir search_path); examined reçoit les cases consultées"""
+        width = dungeon_map.width
+        neighbors = dungeon_map.neighbors
+        goal_x, goal_y = dungeon_map.position(goal)
+        
+        g_score = {start: 0}
+        came_from = {}
+        closed_set = set()
+        open_set = [(0, start)]
+        
+        while open_set:
+            # Récupérer le nœud avec le plus petit f_score
+            _, current = heapq.heappop(open_set)
+            self.check_budget()
+            
+            # Si on a atteint le but, reconstruire le chemin
+            if current == goal:
+                path = []
+                while current != start:
+                    path.append(dungeon_map.position(current))
+                    current = came_from[current]
+                path.reverse()
+                return path  # Exclut la position de départ
+            
+            if current in closed_set:
+                continue
+            closed_set.add(current)
+            current_g = g_score[current]
+            
+            for neighbor in neighbors[current]:
+                if neighbor in closed_set:
+                    continue
+                
+                if examined is not None:
+                    examined.add(neighbor)
+                cost = step_cost(neighbor)
+                if cost is None:
+                    continue
+                
+                temp_g_score = current_g + cost
+                if temp_g_score < g_score.get(neighbor, float("inf")):
+                    came_from[neighbor] = current
+                    g_score[neighbor] = temp_g_score
+                    neighbor_y, neighbor_x = divmod(neighbor, width)
+                    f_score = temp_g_score + abs(neighbor_x - goal_x) + abs(neighbor_y - goal_y)
+                    heapq.heappush(open_set, (f_score, neighbor))
+        
+        # Si on arrive ici, aucun chemin trouvé
+        return None
+
+    def find_best_path(self, start_x, start_y, target_x, target_y, dungeon_map, ignore_enemies=False, enemy_cost=None):
+        """
+        Utiliser l'algorithme A* pour trouver le chemin le plus court 
+        en priorisant les chemins directs et en évitant les ennemis
+        enemy_cost remplace le coût des cases ennemies (ignore_enemies le réduit pour forcer le passage)
+        Par défaut, les cases ennemies coûtent la durée mesurée des combats si elle est connue
+        """
+        # Si la cible est directement accessible depuis la position actuelle
+        if self.is_directly_accessible(start_x, start_y, target_x, target_y, dungeon_map):
+            return [(target_x, target_y)]
+        
+        # Vérifier si la cible est directement accessible depuis une autre case visitée
+        access_point = self.can_click_from_any_visited(target_x, target_y, dungeon_map)
+        if access_point:
+            access_x, access_y = access_point
+            
+            # Si c'est directement depuis la position du joueur
+            if (access_x, access_y) == (start_x, start_y):
+                return [(target_x, target_y)]
+                
+            # Sinon, nous devons d'abord nous déplacer vers cette case visitée
+            # Vérifier si le point d'accès est directement cliquable
+            if self.is_directly_accessible(start_x, start_y, access_x, access_y, dungeon_map):
+                return [(access_x, access_y), (target_x, target_y)]
+            
+            # Sinon, trouver un chemin vers ce point d'accès
+            # et ensuite vers la cible
+            path_to_access = self.find_best_path_through_visited(start_x, start_y, access_x, access_y, dungeon_map)
+            if path_to_access:
+                return path_to_access + [(target_x, target_y)]
+        
+        if ignore_enemies:
+            enemy_cost = FORCED_ENEMY_COST  # Coût réduit pour forcer le passage
+        
+        # Coût du terrain (cases inaccessibles ignorées), puis coût des ennemis imposé ou mesuré
+        layers = [TerrainCost()]
+        if enemy_cost is not None:
+            layers.append(EnemyCost(enemy_cost))
+        else:
+            layers.extend(self.battle_layers(dungeon_map))
+        
+        return self.search_path(dungeon_map.index(start_x, start_y), dungeon_map.index(target_x, target_y),
+                                dungeon_map, self.cost_profile(*layers))
+
+    def find_best_path_through_visited(self, start_x, start_y, target_x, target_y, dungeon_map):
+        """
+        Trouver le meilleur chemin d'une position à une autre en passant uniquement par des cases déjà visitées
+        """
+        # Vérifier si la cible est directement accessible
+        if self.is_directly_accessible(start_x, start_y, target_x, target_y, dungeon_map):
+            return [(target_x, target_y)]
+        
+        # Ne considérer que les cases visitées (dont la position du joueur) et la cible
+        goal = dungeon_map.index(target_x, target_y)
+        profile = self.cost_profile(TerrainCost(), VisitedOnlyCost(allowed=(goal,)))
+        
+        return self.search_path(dungeon_map.index(start_x, start_y), goal, dungeon_map, profile)
+
+    def build_distance_field(self, dungeon_map, sources=None, visited_only=False, enemy_cost=None):
+        """
+        Calculer en une passe les distances de toutes les cases depuis sources (par défaut le joueur)
+        visited_only limite les déplacements aux cases visitées, enemy_cost remplace le coût des ennemis
+        """
+        if sources is None:
+            sources = [dungeon_map.player]
+        
+        layers = [TerrainCost()]
+        if visited_only:
+            layers.append(VisitedOnlyCost())
+        elif enemy_cost is not None:
+            layers.append(EnemyCost(enemy_cost))
+        else:
+            layers.extend(self.battle_layers(dungeon_map))
+        
+        return self.build_field(dungeon_map, sources, self.cost_profile(*layers))
+
+    def build_field(self, dungeon_map, sources, profile):
+        """Champ de distances depuis sources avec les coûts du profil, mémorisé pour la version de la grille"""
+        # Un champ dépend de toute la grille: il n'est réutilisé que tant que la carte n'a pas changé
+        cache = self.plan_cache_for(dungeon_map)
+        key = ("field", tuple(sorted(sources)), profile.key)
+        if cache is not None:
+            field = cache.get(key)
+            if field is not MISSING:
+                return field
+        
+        field = DistanceField(dungeon_map, sources, profile.step_cost(dungeon_map), self.check_budget)
+        if cache is not None:
+            cache.put(key, field)
+        return field
+
+    def build_frontier_field(self, dungeon_map, enemy_penalty=FRONTIER_ENEMY_PENALTY, extra_sources=()):
+        """
+        Distances depuis toutes les cases visitées à la fois: on peut cliquer sur n'importe quelle case
+        adjacente à une case visitée, donc seules les nouvelles cases coûtent (un clic chacune)
+        extra_sources ajoute des cases considérées comme déjà atteintes (cible précédente d'une tournée)
+        """
+        # La durée mesurée des combats remplace le surcoût fixe dès qu'elle est connue
+        battle_layers = self.battle_layers(dungeon_map)
+        if battle_layers:
+            profile = self.cost_profile(ClickCost(), *battle_layers)
+        else:
+            profile = self.cost_profile(ClickCost(), EnemyPenalty(enemy_penalty))
+        return self.build_field(dungeon_map, dungeon_map.visited | set(extra_sources), profile)
+
+    def plan_frontier_clicks(self, target_x, target_y, dungeon_map, kind, final_kind, field=None):
+        """
+        Suite minimale de clics dans des cases non visitées pour atteindre la cible
+        Le premier clic vise une case de la frontière (adjacente à une case visitée), sans repasser
+        par les cases déjà visitées; la cible elle-même est le clic final
+        Retourne un Click, un FollowPath ou None si la cible est inaccessible
+        """
+        if field is None:
+            field = self.build_frontier_field(dungeon_map)
+        
+        clicks = field.path_to(dungeon_map.index(target_x, target_y))
+        if not clicks:
+            return None
+        
+        if len(clicks) == 1:
+            return Click(target_x, target_y, kind=kind)
+        
+        self.note(f"Chemin par la frontière: {len(clicks)} clics jusqu'à ({target_x}, {target_y})")
+        return FollowPath(clicks[:-1], kind=f"{kind}_path", final_target=Click(target_x, target_y, kind=final_kind))
+
+    def find_best_path_avoiding_enemies(self, start_x, start_y, target_x, target_y, dungeon_map):
+        """
+        Trouve le meilleur chemin d'un point à un autre en évitant au maximum les ennemis
+        """
+        # Durée mesurée des combats si elle est connue (un détour n'est pris que s'il est plus rapide),
+        # sinon coût très élevé pour les ennemis, sans modifier la grille partagée
+        if self.battle_layers(dungeon_map):
+            return self.find_best_path(start_x, start_y, target_x, target_y, dungeon_map)
+        return self.find_best_path(start_x, start_y, target_x, target_y, dungeon_map, enemy_cost=ENEMY_AVOIDANCE_COST)
+
+    def unexplored_prior(self, dungeon_map):
+        """
+        Intérêt a priori des cases encore inexplorées (liste plate), ou None sans historique pour ce donjon
+        Le contenu des cases déjà explorées est connu: leur a priori est ignoré
+        """
+        if self.priors is None or not dungeon_map.name:
+            return None
+        
+        prior = self.priors.prior_map(dungeon_map.name, dungeon_map.width, dungeon_map.height)
+        if prior is None:
+            return None
+        
+        cache = self.plan_cache_for(dungeon_map)
+        key = ("prior", self.priors.revision)
+        if cache is not None:
+            masked = cache.get(key)
+            if masked is not MISSING:
+                return masked
+        
+        masked = [0 if dungeon_map.is_explored(index) else value for index, value in enumerate(prior)]
+        if cache is not None:
+            cache.put(key, masked)
+        return masked
+
+    def prior_attraction(self, dungeon_map):
+        """
+        Fonction index -> attraction des positions probables de contenu (somme des a priori divisés
+        par 1 + distance, sur les PRIOR_TARGETS cases les plus probables), ou None sans historique
+        """
+        prior = self.unexplored_prior(dungeon_map)
+        if prior is None:
+            return None
+        
+        width = dungeon_map.width
+        likely = sorted(((value, index) for index, value in enumerate(prior) if value > 0), reverse=True)
+        targets = [(index % width, index // width, value) for value, index in likely[:PRIOR_TARGETS]]
+        if not targets:
+            return None
+        
+        memo = {}
+        
+        def attraction(index):
+            if index not in memo:
+                x, y = index % width, index // width
+                memo[index] = sum(value / (1 + abs(x - tx) + abs(y - ty)) for tx, ty, value in targets)
+            return memo[index]
+        
+        return attraction
+
+    def count_unexplored_around(self, x, y, dungeon_map, radius=2):
+        """
+        Compte le nombre de cases inexplorées dans un rayon donné autour d'une position
+        (lecture dans la table des sommes cumulées de la grille, en temps constant)
+        """
+        return dungeon_map.count_unexplored(x, y, radius)
+
+    def plan_chest_tour(self, dungeon_map, chests_needed):
+        """
+        Tournée des coffres visibles (puis du boss s'il est visible) minimisant le temps estimé:
+        un clic par nouvelle case et un surcoût par combat (FRONTIER_ENEMY_PENALTY)
+        Seuls chests_needed coffres sont retenus (les plus rentables)
+        Retourne (liste des coffres dans l'ordre, coût estimé) ou None
+        """
+        field = self.build_frontier_field(dungeon_map)
+        targets = [chest for chest in sorted(dungeon_map.chests) if field.reachable(chest)]
+        count = min(chests_needed, len(targets))
+        if count <= 0:
+            return None
+        
+        # Coûts entre cibles: depuis les cases visitées et la cible précédente, qui sera alors visitée
+        target_fields = []
+        for target in targets:
+            self.check_budget()
+            target_fields.append(self.build_frontier_field(dungeon_map, extra_sources=(target,)))
+        
+        start_costs = [field.distance(target) for target in targets]
+        pair_costs = [[target_field.distance(other) for other in targets] for target_field in target_fields]
+        end_costs = None
+        if dungeon_map.boss is not None:
+            end_costs = [target_field.distance(dungeon_map.boss) for target_field in target_fields]
+        
+        order, cost = solve_tour(start_costs, pair_costs, count, end_costs)
+        if order is None and end_costs is not None:
+            # Boss inaccessible après les coffres: tournée ouverte
+            order, cost = solve_tour(start_costs, pair_costs, count)
+        if not order:
+            return None
+        
+        return [targets[i] for i in order], cost
+
+    def find_chest_tour_move(self, dungeon_map, chests_needed):
+        """Premier déplacement de la tournée optimisée des coffres"""
+        tour = self.plan_chest_tour(dungeon_map, chests_needed)
+        if tour is None:
+            return None
+        
+        chests, cost = tour
+        positions = [dungeon_map.position(chest) for chest in chests]
+        ending = " puis le boss" if dungeon_map.boss is not None else ""
+        self.note(f"Tournée des coffres: {positions}{ending} (coût estimé: {cost})")
+        
+        chest_x, chest_y = positions[0]
+        return self.plan_move_to_target(chest_x, chest_y, dungeon_map, kind="tour_chest", final_kind="chest")
+
+    def plan_move_to_target(self, target_x, target_y, dungeon_map, kind, final_kind):
+        """Action pour atteindre une cible: clics sur la frontière, ou chemin évitant les ennemis"""
+        if self.frontier_mode:
+            return self.plan_frontier_clicks(target_x, target_y, dungeon_map, kind=kind, final_kind=final_kind)
+        
+        player_x, player_y = dungeon_map.player_pos
+        path = self.find_best_path_avoiding_enemies(player_x, player_y, target_x, target_y, dungeon_map)
+        if not path:
+            return None
+        if len(path) == 1:
+            return Click(target_x, target_y, kind=kind)
+        return FollowPath(path[:-1], kind=f"{kind}_path", final_target=Click(target_x, target_y, kind=final_kind))
+
+    def find_optimal_path_to_boss(self, dungeon_map):
+        """
+        Trouve le chemin optimal vers le boss en évitant les ennemis au maximum
+        et en exploitant la possibilité de cliquer sur des cases adjacentes à des cases visitées
+        """
+        if dungeon_map.boss is None:
+            return None
+            
+        boss_x, boss_y = dungeon_map.boss_pos
+        player_x, player_y = dungeon_map.player_pos
+        
+        self.note(f"Boss détecté en ({boss_x}, {boss_y}), calcul du chemin optimal...")
+        
+        # Clics directs depuis la frontière des cases visitées (ennemis évités au maximum)
+        if self.frontier_mode:
+            frontier_move = self.plan_frontier_clicks(
+                boss_x, boss_y, dungeon_map, kind="boss_frontier", final_kind="boss",
+                field=self.build_frontier_field(dungeon_map, enemy_penalty=ENEMY_AVOIDANCE_COST)
+            )
+            if frontier_move:
+                return frontier_move
+        
+        # Distances à travers les cases visitées, calculées une seule fois pour tous les points d'accès
+        visited_field = self.build_distance_field(dungeon_map, visited_only=True)
+        
+        # AMÉLIORATION: Vérifier d'abord si on peut cliquer directement sur le boss depuis 
+        # n'importe quelle case déjà visitée
+        # Cela permet de court-circuiter tout le calcul de chemin si une case visitée
+        # est adjacente au boss
+        # (seuls les voisins visités du boss peuvent convenir: parcours dans l'ordre de lecture de la carte)
+        direct_access_from = None
+        if dungeon_map.is_accessible(dungeon_map.boss):
+            for neighbor in sorted(dungeon_map.neighbors[dungeon_map.boss]):
+                if neighbor not in dungeon_map.visited:
+                    continue
+                direct_access_from = dungeon_map.position(neighbor)
+                # Si le joueur est déjà sur cette case, c'est la solution optimale
+                if neighbor == dungeon_map.player:
+                    self.note(f"Boss directement accessible depuis la position actuelle! Clic direct.")
+                    return Click(boss_x, boss_y, kind="boss_direct")
+        
+        # Si on a trouvé une case visitée qui permet d'accéder directement au boss,
+        # déplaçons-nous vers cette case d'abord
+        if direct_access_from:
+            access_x, access_y = direct_access_from
+            self.note(f"Boss accessible directement depuis la case ({access_x}, {access_y}). Optimisation du parcours.")
+            
+            # Si cette case est adjacente au joueur, on peut s'y déplacer directement
+            if self.is_directly_accessible(player_x, player_y, access_x, access_y, dungeon_map):
+                self.note(f"Déplacement direct vers la case d'accès, puis clic sur le boss")
+                return MoveTo(
+                    access_x, access_y,
+                    kind="move_to_direct_boss_access",
+                    follow_up=Click(boss_x, boss_y, kind="boss")
+                )
+            # Sinon, il faut trouver un chemin vers cette case visitée
+            else:
+                path_to_access = visited_field.path_to(dungeon_map.index(access_x, access_y))
+                if path_to_access:
+                    self.note(f"Optimisation du chemin vers le point d'accès direct au boss")
+                    return FollowPath(
+                        path_to_access,
+                        kind="path_to_direct_boss_access",
+                        final_target=Click(boss_x, boss_y, kind="boss")
+                    )
+        
+        # Si pas d'accès direct possible, on revient à l'algorithme original
+        # 1. Vérifier si le boss est directement accessible depuis la position actuelle
+        if self.is_directly_accessible(player_x, player_y, boss_x, boss_y, dungeon_map):
+            self.note(f"Boss directement accessible depuis la position actuelle! Clic direct.")
+            return Click(boss_x, boss_y, kind="boss_direct")
+        
+        # 2. Vérifier si le boss est accessible depuis une case visitée (shortcut)
+        access_points = self.find_all_access_points(boss_x, boss_y, dungeon_map)
+        if access_points:
+            # Trier les points d'accès par priorité: 
+            # 1. Position actuelle du joueur
+            # 2. Cases adjacentes au joueur
+            # 3. Cases avec le moins d'ennemis sur le chemin
+            # 4. Cases les plus proches du joueur
+            
+            # Organiser les points d'accès
+            categorized_access_points = []
+            for ax, ay in access_points:
+                self.check_budget()
+                
+                # Calculer la distance entre le joueur et ce point d'accès
+                distance = abs(player_x - ax) + abs(player_y - ay)
+                
+                # Déterminer la priorité de cette case
+                priority = 999  # Priorité par défaut (basse)
+                
+                if (ax, ay) == (player_x, player_y):
+                    priority = 1  # Le joueur est déjà sur un point d'accès
+                elif self.is_directly_accessible(player_x, player_y, ax, ay, dungeon_map):
+                    priority = 2  # Point d'accès directement accessible
+                else:
+                    # Calculer le nombre d'ennemis sur le chemin vers ce point d'accès
+                    path = visited_field.path_to(dungeon_map.index(ax, ay))
+                    if path:
+                        enemies_count = self.count_enemies_on_path(path, dungeon_map)
+                        priority = 3 + enemies_count  # Plus il y a d'ennemis, plus la priorité est basse
+                    else:
+                        priority = 999  # Pas de chemin trouvé
+                
+                categorized_access_points.append({
+                    "x": ax, 
+                    "y": ay,
+                    "distance": distance,
+                    "priority": priority
+                })
+            
+            # Trier les points d'accès par priorité puis par distance
+            categorized_access_points.sort(key=lambda p: (p["priority"], p["distance"]))
+            
+            # Prendre le meilleur point d'accès
+            if categorized_access_points:
+                best_access = categorized_access_points[0]
+                ax, ay = best_access["x"], best_access["y"]
+                
+                self.note(f"Meilleur point d'accès au boss trouvé en ({ax}, {ay}) (priorité {best_access['priority']})")
+                
+                # Si nous sommes déjà sur ce point d'accès
+                if (ax, ay) == (player_x, player_y):
+                    return Click(boss_x, boss_y, kind="boss_from_current_position")
+                
+                # Si le point d'accès est directement accessible
+                if self.is_directly_accessible(player_x, player_y, ax, ay, dungeon_map):
+                    return MoveTo(
+                        ax, ay,
+                        kind="move_to_boss_access_direct",
+                        follow_up=Click(boss_x, boss_y, kind="boss")
+                    )
+                
+                # Si le point d'accès n'est pas directement accessible,
+                # trouver le meilleur chemin vers ce point via des cases visitées
+                path_to_access = self.find_best_path_avoiding_enemies(player_x, player_y, ax, ay, dungeon_map)
+                if path_to_access:
+                    return FollowPath(
+                        path_to_access,
+                        kind="path_to_boss_access_point",
+                        final_target=Click(boss_x, boss_y, kind="boss")
+                    )
+        
+        # 3. Si pas de raccourci possible, trouver le meilleur chemin complet en évitant les ennemis
+        path = self.find_best_path_avoiding_enemies(player_x, player_y, boss_x, boss_y, dungeon_map)
+        if path:
+            next_x, next_y = path[0]
+            self.note(f"Chemin complet vers le boss trouvé! Prochain mouvement: ({next_x}, {next_y})")
+            return FollowPath(path, kind="complete_path_to_boss")
+        
+        # 4. En cas d'échec, tenter un chemin direct même avec des ennemis
+        direct_path = self.find_best_path(player_x, player_y, boss_x, boss_y, dungeon_map, ignore_enemies=True)
+        if direct_path:
+            next_x, next_y = direct_path[0]
+            self.note(f"Chemin direct vers le boss trouvé (avec ennemis)! Prochain mouvement: ({next_x}, {next_y})")
+            return FollowPath(direct_path, kind="direct_path_to_boss_with_enemies")
+        
+        return None
+    
+    def find_efficient_exploration_move(self, dungeon_map):
+        """
+        Trouve le meilleur mouvement pour l'exploration initiale
+        Privilégie les cases qui maximisent la découverte de nouvelles zones
+        """
+        player_x, player_y = dungeon_map.player_pos
+        
+        # Phase d'exploration complètement initiale (beaucoup de cases invisibles)
+        if len(dungeon_map.visible) < 10:
+            # Explorer de manière semi-aléatoire mais systématique
+            directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]  # haut, droite, bas, gauche
+            
+            # Trier les directions pour favoriser celles qui n'ont pas encore été explorées
+            # et celles qui sont dans la direction du centre du donjon
+            center_x, center_y = dungeon_map.width // 2, dungeon_map.height // 2
+            
+            # Avec un historique pour ce donjon, viser plutôt le barycentre des positions probables
+            # des coffres et du boss
+            prior = self.unexplored_prior(dungeon_map)
+            if prior is not None:
+                mass = sum(value for value in prior if value > 0)
+                if mass > 0:
+                    center_x = round(sum(value * (index % dungeon_map.width)
+                                         for index, value in enumerate(prior) if value > 0) / mass)
+                    center_y = round(sum(value * (index // dungeon_map.width)
+                                         for index, value in enumerate(prior) if value > 0) / mass)
+                    self.note(f"A priori du donjon: contenu probable autour de ({center_x}, {center_y})")
+            
+            # Calculer dans quelle direction se trouve le centre par rapport au joueur
+            center_dir_x = 1 if center_x > player_x else (-1 if center_x < player_x else 0)
+            center_dir_y = 1 if center_y > player_y else (-1 if center_y < player_y else 0)
+            
+            # Trier les directions par "intérêt d'exploration"
+            direction_scores = []
+            for dx, dy in directions:
+                new_x, new_y = player_x + dx, player_y + dy
+                
+                # Vérifier si la case est dans les limites
+                if not dungeon_map.in_bounds(new_x, new_y):
+                    continue
+                    
+                # Facteurs qui augmentent l'intérêt d'une direction:
+                # 1. N'a pas encore été visitée
+                # 2. Est dans la direction générale du centre du donjon
+                # 3. N'est pas invisible (si on peut le savoir)
+                
+                score = 0
+                
+                # Pénaliser les cases déjà visitées
+                if dungeon_map.index(new_x, new_y) in dungeon_map.visited:
+                    score -= 10
+                
+                # Favoriser les directions vers le centre
+                if (dx * center_dir_x + dy * center_dir_y) > 0:
+                    score += 3
+                    
+                # Favoriser les cases qui ne sont pas invisibles (si connues)
+                if dungeon_map.code_at(new_x, new_y) != "I":
+                    score += 5
+                    
+                direction_scores.append((dx, dy, score))
+            
+            # Trier par score (du plus haut au plus bas)
+            direction_scores.sort(key=lambda d: -d[2])
+            
+            # Prendre la direction avec le meilleur score
+            if direction_scores:
+                best_dx, best_dy, _ = direction_scores[0]
+                new_x, new_y = player_x + best_dx, player_y + best_dy
+                
+                self.note(f"Exploration initiale: direction ({best_dx}, {best_dy}) vers ({new_x}, {new_y})")
+                
+                return Click(new_x, new_y, kind="initial_exploration")
+        
+        # Phase d'exploration plus avancée
+        # Chercher des cases non visitées adjacentes aux cases visitées,
+        # en priorisant celles qui sont susceptibles de révéler de nouvelles zones
+        
+        # En mode frontière, toute case adjacente à une case visitée se clique directement:
+        # la distance du joueur à la case visitée ne coûte plus rien
+        frontier_mode = self.frontier_mode
+        distance_weight = 0 if frontier_mode else 0.5
+        
+        # Intérêt d'exploration de toutes les cases, calculé en une passe sur la carte entière
+        unexplored_counts = dungeon_map.unexplored_counts(1)
+        codes = dungeon_map.codes
+        
+        # Contenu probable (positions apprises des explorations précédentes) autour de chaque case
+        attraction = self.prior_attraction(dungeon_map)
+        visited_tiles = dungeon_map.visited
+        
+        best_option = None
+        best_score = None
+        
+        # Pour chaque case visitée
+        for visited in sorted(visited_tiles):
+            # Ne pas considérer la position actuelle du joueur (sauf en mode frontière)
+            if visited == dungeon_map.player and not frontier_mode:
+                continue
+            visited_x, visited_y = dungeon_map.position(visited)
+            
+            # Calculer la distance entre le joueur et la case visitée
+            distance_penalty = (abs(player_x - visited_x) + abs(player_y - visited_y)) * distance_weight
+            
+            # Chercher les cases adjacentes non visitées (haut, droite, bas, gauche)
+            for adjacent in dungeon_map.neighbors[visited]:
+                # Vérifier si cette case n'a pas été visitée et n'est pas invisible
+                code = codes[adjacent]
+                if adjacent in visited_tiles or code in BLOCKED_CODES:
+                    continue
+                
+                # Score combinant l'intérêt d'exploration, la distance et le type de case
+                exploration_score = unexplored_counts[adjacent] - distance_penalty + EXPLORATION_TILE_BONUS.get(code, 0)
+                if attraction is not None:
+                    exploration_score += PRIOR_WEIGHT * attraction(adjacent)
+                
+                # Garder la première meilleure option (dans l'ordre de lecture de la carte)
+                if best_score is None or exploration_score > best_score:
+                    best_score = exploration_score
+                    best_option = (visited_x, visited_y, adjacent)
+        
+        # Prendre la meilleure option
+        if best_option is not None:
+            visited_x, visited_y, adjacent = best_option
+            target_x, target_y = dungeon_map.position(adjacent)
+            
+            self.note(f"Meilleure option d'exploration: case ({target_x}, {target_y}) "
+                    f"depuis ({visited_x}, {visited_y}), score: {best_score}")
+            
+            # Case de la frontière: un seul clic, quelle que soit la position du joueur
+            if frontier_mode:
+                return Click(target_x, target_y, kind="exploration_frontier")
+            
+            # Si le joueur est déjà sur la case visitée, cliquer directement sur la cible
+            if (visited_x, visited_y) == (player_x, player_y):
+                return Click(target_x, target_y, kind="exploration_from_current")
+            
+            # Si la case visitée est directement accessible
+            if self.is_directly_accessible(player_x, player_y, visited_x, visited_y, dungeon_map):
+                return MoveTo(
+                    visited_x, visited_y,
+                    kind="move_to_exploration_access",
+                    follow_up=Click(target_x, target_y, kind="exploration_target")
+                )
+            
+            # Si la case visitée n'est pas directement accessible, trouver un chemin
+            path_to_visited = self.find_best_path_through_visited(player_x, player_y, visited_x, visited_y, dungeon_map)
+            if path_to_visited:
+                return FollowPath(
+                    path_to_visited,
+                    kind="path_to_exploration_access",
+                    final_target=Click(target_x, target_y, kind="exploration_target")
+                )
+        
+        # Si aucune option d'exploration intéressante n'a été trouvée, chercher une direction aléatoire
+        directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+        self.random.shuffle(directions)
+        
+        for dx, dy in directions:
+            new_x, new_y = player_x + dx, player_y + dy
+            
+            # Vérifier si la case est dans les limites
+            if not dungeon_map.in_bounds(new_x, new_y):
+                continue
+                
+            # Vérifier si cette case est accessible
+            if dungeon_map.is_accessible(dungeon_map.index(new_x, new_y)):
+                self.note(f"Exploration aléatoire vers ({new_x}, {new_y})")
+                return Click(new_x, new_y, kind="random_exploration")
+        
+        # En dernier recours, utiliser l'API JavaScript pour explorer
+        self.note("Aucun mouvement viable trouvé, utilisation de l'exploration JavaScript forcée")
+        return None
+    
+    def find_strategic_chest_path(self, dungeon_map):
+        """
+        Trouve le chemin vers le coffre le plus stratégique (pas forcément le plus proche)
+        Considère la position des autres coffres et l'état d'exploration du donjon
+        """
+        if not dungeon_map.chests:
+            return None
+            
+        player_x, player_y = dungeon_map.player_pos
+        chest_positions = dungeon_map.positions(dungeon_map.chests)
+        
+        # Calculer l'intérêt stratégique de chaque coffre
+        strategic_chests = []
+        
+        # Accessibilité des coffres (passage forcé à travers les ennemis), calculée au premier besoin
+        # En mode frontière, le même calcul sert ensuite à planifier les clics vers le coffre choisi
+        reach_field = None
+        frontier_mode = self.frontier_mode
+        
+        for chest_x, chest_y in chest_positions:
+            self.check_budget()
+            
+            # Distance du joueur au coffre
+            distance = abs(chest_x - player_x) + abs(chest_y - player_y)
+            
+            # Nombre de cases inexplorées autour du coffre (potentiel de révélation)
+            unexplored_around = self.count_unexplored_around(chest_x, chest_y, dungeon_map)
+            
+            # Distance aux autres coffres (préférer les coffres isolés)
+            min_distance_to_other_chests = float('inf')
+            for other_x, other_y in chest_positions:
+                if (other_x, other_y) != (chest_x, chest_y):
+                    dist = abs(other_x - chest_x) + abs(other_y - chest_y)
+                    min_distance_to_other_chests = min(min_distance_to_other_chests, dist)
+            
+            if min_distance_to_other_chests == float('inf'):
+                min_distance_to_other_chests = 0
+            
+            # Calculer le score stratégique (plus il est bas, mieux c'est)
+            # Formule: distance au joueur - (potentiel de révélation + distance aux autres coffres)
+            strategic_score = distance - (unexplored_around * 2 + min_distance_to_other_chests)
+            
+            # Vérifier si ce coffre est directement accessible depuis la position actuelle
+            direct_access = self.is_directly_accessible(player_x, player_y, chest_x, chest_y, dungeon_map)
+            
+            # Vérifier s'il est accessible depuis une case visitée
+            access_points = self.find_all_access_points(chest_x, chest_y, dungeon_map)
+            
+            # Vérifier si un chemin est possible vers ce coffre
+            # MODIFICATION: vérifier la possibilité d'accès avant d'ajouter le coffre à la liste
+            has_possible_path = False
+            
+            if direct_access:
+                has_possible_path = True
+            elif access_points:
+                has_possible_path = True
+            else:
+                # Tester si un chemin existe vers ce coffre (une seule recherche pour tous les coffres)
+                if reach_field is None:
+                    if frontier_mode:
+                        reach_field = self.build_frontier_field(dungeon_map)
+                    else:
+                        reach_field = self.build_distance_field(dungeon_map, enemy_cost=FORCED_ENEMY_COST)
+                has_possible_path = reach_field.reachable(dungeon_map.index(chest_x, chest_y))
+            
+            # N'ajouter que les coffres accessibles
+            if has_possible_path:
+                strategic_chests.append({
+                    "x": chest_x,
+                    "y": chest_y,
+                    "distance": distance,
+                    "unexplored_around": unexplored_around,
+                    "min_distance_to_other_chests": min_distance_to_other_chests,
+                    "strategic_score": strategic_score,
+                    "direct_access": direct_access,
+                    "access_points": access_points
+                })
+        
+        # Si aucun coffre n'est accessible, essayer d'explorer pour révéler de nouvelles zones
+        if not strategic_chests:
+            self.note("Aucun coffre accessible trouvé, passage en mode exploration pour révéler de nouvelles zones")
+            return self.find_efficient_exploration_move(dungeon_map)
+        
+        # Trier les coffres par score stratégique (ascendant)
+        strategic_chests.sort(key=lambda c: c["strategic_score"])
+    
+        
+        # Prendre les 3 meilleurs coffres et choisir celui avec le meilleur accès
+        best_chests = strategic_chests[:3] if len(strategic_chests) >= 3 else strategic_chests
+        
+        # Trier ces meilleurs coffres par facilité d'accès
+        for chest in best_chests:
+            # Priorité d'accès (plus c'est bas, mieux c'est)
+            access_priority = 999
+            
+            if chest["direct_access"]:
+                access_priority = 1  # Accès direct depuis la position actuelle
+            elif chest["access_points"]:
+                # Vérifier si un des points d'accès est directement accessible
+                for ax, ay in chest["access_points"]:
+                    if (ax, ay) == (player_x, player_y):
+                        access_priority = 2  # Le joueur est déjà sur un point d'accès
+                        break
+                    elif self.is_directly_accessible(player_x, player_y, ax, ay, dungeon_map):
+                        access_priority = 3  # Point d'accès directement accessible
+                        break
+                
+                if access_priority == 999:
+                    access_priority = 4  # Points d'accès mais pas directement accessibles
+            
+            chest["access_priority"] = access_priority
+        
+        # Trier d'abord par facilité d'accès, puis par score stratégique
+        best_chests.sort(key=lambda c: (c["access_priority"], c["strategic_score"]))
+        
+        # Prendre le meilleur coffre après tous ces critères
+        if not best_chests:
+            return None
+            
+        best_chest = best_chests[0]
+        chest_x, chest_y = best_chest["x"], best_chest["y"]
+        
+        self.note(f"Coffre le plus stratégique en ({chest_x}, {chest_y}) " 
+                f"(score: {best_chest['strategic_score']}, accès: {best_chest['access_priority']})")
+        
+        # Construire la réponse en fonction du meilleur accès à ce coffre
+        
+        # Mode frontière: clics directs dans les cases non visitées, sans marcher sur les cases visitées
+        if frontier_mode:
+            if reach_field is None:
+                reach_field = self.build_frontier_field(dungeon_map)
+            frontier_move = self.plan_frontier_clicks(
+                chest_x, chest_y, dungeon_map, kind="strategic_chest_frontier", final_kind="chest", field=reach_field
+            )
+            if frontier_move:
+                return frontier_move
+        
+        # 1. Accès direct depuis la position actuelle
+        if best_chest["direct_access"]:
+            return Click(chest_x, chest_y, kind="strategic_chest_direct")
+        
+        # 2. Accès depuis un point d'accès
+        if best_chest["access_points"]:
+            # Trouver le meilleur point d'accès
+            best_access = None
+            best_access_priority = 999
+            
+            for ax, ay in best_chest["access_points"]:
+                priority = 999
+                
+                if (ax, ay) == (player_x, player_y):
+                    priority = 1  # Le joueur est déjà sur ce point d'accès
+                    best_access = (ax, ay)
+                    best_access_priority = priority
+                    break
+                elif self.is_directly_accessible(player_x, player_y, ax, ay, dungeon_map):
+                    priority = 2  # Point d'accès directement accessible
+                else:
+                    priority = 3 + abs(player_x - ax) + abs(player_y - ay)  # Distance au point d'accès
+                
+                if priority < best_access_priority:
+                    best_access = (ax, ay)
+                    best_access_priority = priority
+            
+            if best_access:
+                ax, ay = best_access
+                
+                # Si nous sommes déjà sur ce point d'accès
+                if (ax, ay) == (player_x, player_y):
+                    return Click(chest_x, chest_y, kind="strategic_chest_from_current")
+                
+                # Si le point d'accès est directement accessible
+                if self.is_directly_accessible(player_x, player_y, ax, ay, dungeon_map):
+                    return MoveTo(
+                        ax, ay,
+                        kind="move_to_chest_access_direct",
+                        follow_up=Click(chest_x, chest_y, kind="chest")
+                    )
+                
+                # Si le point d'accès n'est pas directement accessible,
+                # trouver le meilleur chemin vers ce point via des cases visitées
+                path_to_access = self.find_best_path_avoiding_enemies(player_x, player_y, ax, ay, dungeon_map)
+                if path_to_access:
+                    return FollowPath(
+                        path_to_access,
+                        kind="path_to_chest_access",
+                        final_target=Click(chest_x, chest_y, kind="chest")
+                    )
+        
+        # 3. En dernier recours, trouver un chemin complet
+        path = self.find_best_path_avoiding_enemies(player_x, player_y, chest_x, chest_y, dungeon_map)
+        if path:
+            return FollowPath(path, kind="complete_path_to_chest")
+        
+        return None
@@ -0,0 +1,113 @@
+import json
+import os
+
+# Poids de chaque type de contenu dans la carte d'a priori (fréquence d'apparition par case)
+PRIOR_WEIGHTS = {
+    "chest": 1.0,
+    "boss": 1.5,
+    "enemy": -0.25,
+}
+
+
+class DungeonPriors:
+    """
+    Cartes de fréquence des positions de coffres, boss et ennemis, par nom de donjon
+    Enregistrées dans un fichier JSON et mises à jour à la fin de chaque exploration
+    Les positions vues pendant l'exploration sont accumulées (observe) puis comptées
+    une seule fois par exploration (record_run)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.dungeons = {}
+        # Incrémentée à chaque mise à jour des cartes (invalidation des a priori calculés)
+        self.revision = 0
+        self._prior_maps = {}
+        self.reset_run()
+
+    def load(self):
+        """Charger les cartes enregistrées (fichier absent: aucune connaissance préalable)"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as handle:
+            self.dungeons = json.load(handle)
+        self.revision += 1
+        self._prior_maps = {}
+
+    def save(self):
+        """Enregistrer les cartes (écriture dans un fichier temporaire puis remplacement)"""
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as handle:
+            json.dump(self.dungeons, handle)
+        os.replace(temporary_path, self.path)
+
+    def reset_run(self):
+        """Oublier les positions observées pendant l'exploration en cours"""
+        self.run_name = None
+        self.run_size = None
+        self.run_positions = {kind: set() for kind in PRIOR_WEIGHTS}
+
+    def observe(self, grid):
+        """Mémoriser les coffres, boss et ennemis visibles sur la grille (exploration en cours)"""
+        if grid is None or not grid.name:
+            return
+
+        size = (grid.width, grid.height)
+        if grid.name != self.run_name or size != self.run_size:
+            self.reset_run()
+            self.run_name = grid.name
+            self.run_size = size
+
+        self.run_positions["chest"].update(grid.chests)
+        self.run_positions["enemy"].update(grid.enemies)
+        if grid.boss is not None:
+            self.run_positions["boss"].add(grid.boss)
+
+    def record_run(self):
+        """
+        Ajouter les positions observées pendant l'exploration aux cartes du donjon
+        Retourne False si rien n'a été observé
+        """
+        if self.run_name is None:
+            return False
+
+        width, height = self.run_size
+        entry = self.dungeons.get(self.run_name)
+        if entry is None or entry.get("width") != width or entry.get("height") != height:
+            # Premier passage (ou carte de taille différente): nouvelles cartes de fréquence
+            entry = {"width": width, "height": height, "runs": 0}
+            for kind in PRIOR_WEIGHTS:
+                entry[kind] = [0] * (width * height)
+            self.dungeons[self.run_name] = entry
+
+        entry["runs"] += 1
+        for kind, positions in self.run_positions.items():
+            counts = entry[kind]
+            for index in positions:
+                counts[index] += 1
+
+        self.revision += 1
+        self._prior_maps.pop(self.run_name, None)
+        self.reset_run()
+        return True
+
+    def prior_map(self, name, width, height):
+        """
+        Intérêt a priori de chaque case (liste plate) pour un donjon de ces dimensions:
+        fréquence d'apparition des coffres et du boss, moins celle des ennemis
+        Retourne None si le donjon n'a jamais été exploré avec cette taille de carte
+        """
+        entry = self.dungeons.get(name)
+        if not entry or entry.get("width") != width or entry.get("height") != height or not entry.get("runs"):
+            return None
+
+        prior = self._prior_maps.get(name)
+        if prior is None:
+            runs = entry["runs"]
+            prior = [0.0] * (width * height)
+            for kind, weight in PRIOR_WEIGHTS.items():
+                for index, count in enumerate(entry[kind]):
+                    if count:
+                        prior[index] += weight * count / runs
+            self._prior_maps[name] = prior
+        return prior
@@ -0,0 +1,503 @@
+# Codes compacts des types de cases, dans l'ordre de priorité de la détection
+# (un coffre déjà visité reste un coffre, un boss visité reste un boss, etc.)
+TILE_CODES = {
+    "P": "player",
+    "B": "boss",
+    "c": "chest_common",
+    "r": "chest_rare",
+    "e": "chest_epic",
+    "V": "visited",
+    "I": "invisible",
+    "E": "enemy_standard",
+    "S": "enemy_strong",
+    ".": "empty",
+    "W": "wall",
+    "X": "exit",
+    "?": "unknown",
+}
+
+# Classes CSS canoniques reconstruites à partir d'un code de case
+# (utilisées par les planificateurs qui testent la présence de "tile-*")
+TILE_CODE_CLASSES = {
+    "P": "tile tile-player",
+    "B": "tile tile-boss",
+    "c": "tile tile-chest tile-chest-common",
+    "r": "tile tile-chest tile-chest-rare",
+    "e": "tile tile-chest tile-chest-epic",
+    "V": "tile tile-visited",
+    "I": "tile tile-invisible",
+    "E": "tile tile-enemy",
+    "S": "tile tile-enemy tile-enemy-strong",
+    ".": "tile tile-empty",
+    "W": "tile tile-wall",
+    "X": "tile tile-exit",
+    "?": "tile",
+}
+
+# Conversion d'une chaîne de classes CSS en code compact (même ordre que classify_tile_class)
+TILE_CLASSIFIER_JS = """
+    function classify(cls) {
+        cls = ' ' + cls + ' ';
+        function has(name) { return cls.indexOf(' ' + name + ' ') !== -1; }
+        if (has('tile-player')) return 'P';
+        if (has('tile-boss')) return 'B';
+        if (has('tile-chest')) {
+            if (has('tile-chest-rare')) return 'r';
+            if (has('tile-chest-epic')) return 'e';
+            return 'c';
+        }
+        if (has('tile-visited')) return 'V';
+        if (has('tile-invisible')) return 'I';
+        if (has('tile-enemy')) return has('tile-enemy-strong') ? 'S' : 'E';
+        if (has('tile-empty')) return '.';
+        if (has('tile-wall')) return 'W';
+        if (has('tile-exit')) return 'X';
+        return '?';
+    }
+"""
+
+# Lecture de la carte depuis le tableau HTML: une chaîne de codes par ligne
+DOM_BOARD_JS = """
+    function domTitle() {
+        var title = document.querySelector('h4.modal-title');
+        return title ? title.textContent.trim() : null;
+    }
+    function domCells() {
+        var table = document.querySelector('table.dungeon-board');
+        if (!table) { return null; }
+        var rows = table.querySelectorAll('tr');
+        var cells = [];
+        for (var y = 0; y < rows.length; y++) {
+            cells.push(Array.prototype.slice.call(rows[y].querySelectorAll('td')));
+        }
+        return cells;
+    }
+    function readBoardFromDom() {
+        var cells = domCells();
+        if (!cells) { return null; }
+        var codes = [];
+        var width = 0;
+        var player = null;
+        for (var y = 0; y < cells.length; y++) {
+            var line = '';
+            for (var x = 0; x < cells[y].length; x++) {
+                var code = classify(cells[y][x].className);
+                if (code === 'P') { player = [x, y]; }
+                line += code;
+            }
+            width = Math.max(width, cells[y].length);
+            codes.push(line);
+        }
+        return {
+            source: 'dom',
+            width: width,
+            height: cells.length,
+            rows: codes,
+            player: player,
+            name: domTitle()
+        };
+    }
+"""
+
+# Donjon en cours selon le modèle du jeu: true/false, ou null si le modèle n'est pas exposé
+MODEL_DUNGEON_JS = """
+    function modelDungeonActive() {
+        try {
+            if (typeof App === 'undefined' || !App.game || typeof GameConstants === 'undefined'
+                    || !GameConstants.GameState || typeof DungeonRunner === 'undefined') { return null; }
+            if (ko.unwrap(App.game.gameState) !== GameConstants.GameState.dungeon) { return false; }
+            return !ko.unwrap(DungeonRunner.dungeonFinished);
+        } catch (e) { return null; }
+    }
+"""
+
+# Lecture de la carte depuis DungeonRunner.map (indépendante du rendu HTML)
+# La carte du modèle n'est utilisée que pendant un donjon (elle reste en mémoire après la sortie)
+MODEL_BOARD_JS = MODEL_DUNGEON_JS + """
+    function modelTileCode(tile) {
+        var cls = (typeof ko !== 'undefined') ? ko.unwrap(tile.cssClass) : null;
+        if (typeof cls === 'string' && cls) { return classify(cls); }
+        if (!ko.unwrap(tile.isVisible)) return 'I';
+        if (ko.unwrap(tile.hasPlayer)) return 'P';
+        var tileTypes = GameConstants.DungeonTileType || GameConstants.DungeonTile;
+        var typeName = tileTypes[ko.unwrap(tile.type)];
+        if (typeName === 'boss') return 'B';
+        if (typeName === 'chest') return 'c';
+        if (ko.unwrap(tile.isVisited)) return 'V';
+        if (typeName === 'enemy') return 'E';
+        if (typeName === 'empty' || typeName === 'entrance') return '.';
+        return '?';
+    }
+    function modelDungeonName() {
+        try {
+            return (DungeonRunner.dungeon && DungeonRunner.dungeon.name) || null;
+        } catch (e) { return null; }
+    }
+    function readBoardFromModel() {
+        if (typeof DungeonRunner === 'undefined' || !DungeonRunner.map) { return null; }
+        if (modelDungeonActive() === false) { return null; }
+        try {
+            var pos = DungeonRunner.map.playerPosition();
+            var board = DungeonRunner.map.board()[pos.floor || 0];
+            if (!board || !board.length) { return null; }
+            var codes = [];
+            var width = 0;
+            for (var y = 0; y < board.length; y++) {
+                var line = '';
+                for (var x = 0; x < board[y].length; x++) {
+                    line += modelTileCode(board[y][x]);
+                }
+                width = Math.max(width, board[y].length);
+                codes.push(line);
+            }
+            return {
+                source: 'model',
+                width: width,
+                height: board.length,
+                rows: codes,
+                player: [pos.x, pos.y],
+                name: modelDungeonName()
+            };
+        } catch (e) {
+            return null;
+        }
+    }
+"""
+
+DOM_READ_BOARD_JS = TILE_CLASSIFIER_JS + DOM_BOARD_JS + """
+    function readBoard() {
+        return readBoardFromDom();
+    }
+"""
+
+# Le modèle est lu en priorité; le titre du donjon est complété par le DOM
+# dans le même appel s'il est absent du modèle
+MODEL_READ_BOARD_JS = TILE_CLASSIFIER_JS + DOM_BOARD_JS + MODEL_BOARD_JS + """
+    function readBoard() {
+        var board = readBoardFromModel();
+        if (!board) { return readBoardFromDom(); }
+        if (!board.name) { board.name = domTitle(); }
+        return board;
+    }
+"""
+
+DOM_BOARD_SCRIPT = DOM_READ_BOARD_JS + """
+    return readBoard();
+"""
+
+MODEL_BOARD_SCRIPT = MODEL_READ_BOARD_JS + """
+    return readBoard();
+"""
+
+# Mise à jour incrémentale: la page garde la dernière carte envoyée (window.__pcbBoard)
+# et ne renvoie que les cases modifiées depuis la version connue du bot.
+# Réponses: { unchanged, version }, { version, changes: [[indice, code], ...] }
+# ou la carte complète (full: true) si le bot n'a pas la même version que la page
+BOARD_DELTA_JS = """
+    var knownVersion = arguments[0];
+    var board = readBoard();
+    if (!board || !board.rows.length) { return null; }
+
+    var width = board.rows[0].length;
+    var padding = new Array(width + 1).join('I');
+    var flat = '';
+    for (var y = 0; y < board.rows.length; y++) {
+        flat += (board.rows[y] + padding).substring(0, width);
+    }
+
+    var last = window.__pcbBoard;
+    if (!last || last.version !== knownVersion || last.width !== width
+            || last.height !== board.rows.length || last.name !== board.name) {
+        var version = (last ? last.version : 0) + 1;
+        window.__pcbBoard = {
+            version: version,
+            codes: flat,
+            width: width,
+            height: board.rows.length,
+            name: board.name
+        };
+        board.version = version;
+        board.full = true;
+        return board;
+    }
+
+    if (flat === last.codes) { return { unchanged: true, version: last.version }; }
+
+    var changes = [];
+    for (var i = 0; i < flat.length; i++) {
+        if (flat.charAt(i) !== last.codes.charAt(i)) { changes.push([i, flat.charAt(i)]); }
+    }
+    last.codes = flat;
+    last.version += 1;
+    return { version: last.version, changes: changes };
+"""
+
+DOM_BOARD_DELTA_SCRIPT = DOM_READ_BOARD_JS + BOARD_DELTA_JS
+MODEL_BOARD_DELTA_SCRIPT = MODEL_READ_BOARD_JS + BOARD_DELTA_JS
+
+DOM_ENEMY_HEALTH_JS = """
+    function domEnemyHealthText() {
+        var span = document.querySelector('span[data-bind*="DungeonBattle.enemyPokemon().health()"]');
+        return span ? span.textContent : null;
+    }
+"""
+
+MODEL_ENEMY_HEALTH_JS = """
+    function modelEnemyHealth() {
+        if (typeof DungeonBattle === 'undefined' || !DungeonBattle.enemyPokemon) { return null; }
+        try {
+            var enemy = DungeonBattle.enemyPokemon();
+            if (!enemy) { return null; }
+            var current = ko.unwrap(enemy.health);
+            var max = ko.unwrap(enemy.maxHealth);
+            if (current === undefined || max === undefined) { return null; }
+            return { current: current, max: max, name: ko.unwrap(enemy.name) || null };
+        } catch (e) {
+            return null;
+        }
+    }
+"""
+
+DOM_ENEMY_HEALTH_SCRIPT = DOM_ENEMY_HEALTH_JS + """
+    return { text: domEnemyHealthText() };
+"""
+
+# Santé lue dans le modèle, ou texte affiché si l'ennemi n'y est pas exposé
+MODEL_ENEMY_HEALTH_SCRIPT = DOM_ENEMY_HEALTH_JS + MODEL_ENEMY_HEALTH_JS + """
+    return modelEnemyHealth() || { text: domEnemyHealthText() };
+"""
+
+
+# Indicateurs d'état lus avec les mêmes sélecteurs que les prédicats historiques
+STATE_FLAGS_JS = """
+    function domFlags() {
+        return {
+            in_dungeon: !!document.querySelector('table.dungeon-board'),
+            in_battle: !!document.querySelector("div[data-bind*='DungeonBattle.enemyPokemon']"),
+            chest: !!document.querySelector('div.dungeon-chest'),
+            boss: !!document.querySelector('button.btn-danger.dungeon-button')
+        };
+    }
+    function domPlayerPosition() {
+        var td = document.querySelector('table.dungeon-board td.tile-player');
+        if (!td) { return null; }
+        var tr = td.parentElement;
+        return [
+            Array.prototype.indexOf.call(tr.children, td),
+            Array.prototype.indexOf.call(tr.parentElement.children, tr)
+        ];
+    }
+    function modelPlayerPosition() {
+        try {
+            var pos = DungeonRunner.map.playerPosition();
+            return pos ? [pos.x, pos.y] : null;
+        } catch (e) { return null; }
+    }
+"""
+
+DOM_STATE_FLAGS_JS = STATE_FLAGS_JS + """
+    function probeFlags() {
+        return domFlags();
+    }
+"""
+
+# Indicateurs lus dans DungeonRunner (donjon, combat, case du joueur);
+# chaque indicateur que le modèle n'expose pas est lu dans le DOM
+MODEL_STATE_FLAGS_JS = STATE_FLAGS_JS + MODEL_DUNGEON_JS + """
+    function modelFlags() {
+        var active = modelDungeonActive();
+        if (active === null) { return null; }
+        if (!active) { return { in_dungeon: false, in_battle: false, chest: false, boss: false }; }
+        var flags = { in_dungeon: true, in_battle: null, chest: null, boss: null };
+        try {
+            if (DungeonRunner.fighting !== undefined) {
+                flags.in_battle = !!ko.unwrap(DungeonRunner.fighting) || !!ko.unwrap(DungeonRunner.fightingBoss);
+            }
+            var tile = DungeonRunner.map.currentTile();
+            var tileTypes = GameConstants.DungeonTileType || GameConstants.DungeonTile;
+            if (tile && tileTypes && flags.in_battle !== null) {
+                var typeName = tileTypes[ko.unwrap(tile.type)];
+                flags.chest = !flags.in_battle && typeName === 'chest';
+                flags.boss = !flags.in_battle && typeName === 'boss';
+            }
+        } catch (e) {}
+        return flags;
+    }
+    function probeFlags() {
+        var flags = modelFlags();
+        if (!flags) { return domFlags(); }
+        if (flags.in_battle === null || flags.chest === null || flags.boss === null) {
+            var dom = domFlags();
+            for (var key in flags) {
+                if (flags[key] === null) { flags[key] = dom[key]; }
+            }
+        }
+        return flags;
+    }
+"""
+
+DOM_STATE_PROBE_SCRIPT = DOM_STATE_FLAGS_JS + DOM_ENEMY_HEALTH_JS + """
+    var probe = probeFlags();
+    probe.enemy = probe.in_battle ? { text: domEnemyHealthText() } : null;
+    probe.player = domPlayerPosition();
+    return probe;
+"""
+
+MODEL_STATE_PROBE_SCRIPT = MODEL_STATE_FLAGS_JS + DOM_ENEMY_HEALTH_JS + MODEL_ENEMY_HEALTH_JS + """
+    var probe = probeFlags();
+    probe.enemy = probe.in_battle ? (modelEnemyHealth() || { text: domEnemyHealthText() }) : null;
+    probe.player = (probe.in_dungeon && modelPlayerPosition()) || domPlayerPosition();
+    return probe;
+"""
+
+
+def classify_tile_class(cell_class):
+    """Convertir l'attribut class d'une case en code compact (même ordre que le script JS)"""
+    classes = (cell_class or "").split()
+    if "tile-player" in classes:
+        return "P"
+    if "tile-boss" in classes:
+        return "B"
+    if "tile-chest" in classes:
+        if "tile-chest-rare" in classes:
+            return "r"
+        if "tile-chest-epic" in classes:
+            return "e"
+        return "c"
+    if "tile-visited" in classes:
+        return "V"
+    if "tile-invisible" in classes:
+        return "I"
+    if "tile-enemy" in classes:
+        return "S" if "tile-enemy-strong" in classes else "E"
+    if "tile-empty" in classes:
+        return "."
+    if "tile-wall" in classes:
+        return "W"
+    if "tile-exit" in classes:
+        return "X"
+    return "?"
+
+
+def parse_health_text(health_text):
+    """Analyser un texte de santé au format "current / max" (séparateurs de milliers acceptés)"""
+    if not health_text or "/" not in health_text:
+        return None
+
+    parts = health_text.split("/")
+    try:
+        current_health = float(parts[0].strip().replace(",", ""))
+        max_health = float(parts[1].strip().replace(",", ""))
+    except ValueError:
+        # Si la conversion en nombre échoue
+        return None
+
+    return make_health_info(current_health, max_health, health_text)
+
+
+def make_health_info(current_health, max_health, text=None, name=None):
+    """Construire le dictionnaire de santé utilisé par le module de combat (name: nom de l'ennemi s'il est connu)"""
+    current_health = float(current_health)
+    max_health = float(max_health)
+    health_percentage = (current_health / max_health) * 100 if max_health > 0 else 0
+
+    return {
+        "current": current_health,
+        "max": max_health,
+        "percentage": health_percentage,
+        "text": text if text is not None else f"{current_health:,.0f} / {max_health:,.0f}",
+        "name": name
+    }
+
+
+class DomStateBackend:
+    """
+    Lecture de l'état à partir du DOM (classes des cases, textes affichés)
+    Dépend du rendu HTML: les valeurs peuvent avoir un léger retard sur le jeu
+    """
+
+    name = "dom"
+    board_script = DOM_BOARD_SCRIPT
+    board_delta_script = DOM_BOARD_DELTA_SCRIPT
+    health_script = DOM_ENEMY_HEALTH_SCRIPT
+    probe_script = DOM_STATE_PROBE_SCRIPT
+
+    def __init__(self, execute_script):
+        # Fonction d'exécution JavaScript (par exemple PokeclickerBot.run_js)
+        self.execute_script = execute_script
+
+    def read_board(self):
+        """Capturer toute la carte en un seul appel (voir TILE_CODES pour l'encodage)"""
+        board = self.execute_script(self.board_script)
+        if not board or not board.get("rows"):
+            return None
+        return board
+
+    def read_board_delta(self, known_version=None):
+        """
+        Lire uniquement les cases modifiées depuis known_version (voir BOARD_DELTA_JS)
+        Retourne None si la carte est absente de la page
+        """
+        delta = self.execute_script(self.board_delta_script, known_version)
+        if not delta:
+            return None
+        if delta.get("full") and not delta.get("rows"):
+            return None
+        return delta
+
+    def read_enemy_health(self):
+        """Lire la santé de l'ennemi en un seul appel (valeurs du modèle ou texte affiché)"""
+        return self.to_health_info(self.execute_script(self.health_script))
+
+    def probe(self):
+        """
+        Lire en une seule évaluation tous les indicateurs d'état du donjon
+        (donjon, combat, coffre, boss), la santé de l'ennemi et la position du joueur
+        """
+        return self.normalize_probe(self.execute_script(self.probe_script))
+
+    def normalize_probe(self, probe):
+        """Convertir une lecture d'état brute de la page au format utilisé par le bot"""
+        if probe is None:
+            return None
+
+        return {
+            "in_dungeon": bool(probe.get("in_dungeon")),
+            "in_battle": bool(probe.get("in_battle")),
+            "chest": bool(probe.get("chest")),
+            "boss": bool(probe.get("boss")),
+            "enemy_health": self.to_health_info(probe.get("enemy")),
+            "player_pos": tuple(probe["player"]) if probe.get("player") else None
+        }
+
+    def to_health_info(self, health):
+        """Convertir une santé brute (valeurs du modèle ou texte affiché) en dictionnaire de santé"""
+        if not health:
+            return None
+
+        if health.get("current") is not None and health.get("max") is not None:
+            try:
+                return make_health_info(health["current"], health["max"], name=health.get("name"))
+            except (TypeError, ValueError):
+                return None
+
+        return parse_health_text(health.get("text"))
+
+
+class GameModelStateBackend(DomStateBackend):
+    """
+    Lecture de l'état directement dans le modèle du jeu (DungeonRunner, DungeonBattle)
+    Revient au DOM pour toute propriété absente du modèle
+    """
+
+    name = "model"
+    board_script = MODEL_BOARD_SCRIPT
+    board_delta_script = MODEL_BOARD_DELTA_SCRIPT
+    health_script = MODEL_ENEMY_HEALTH_SCRIPT
+    probe_script = MODEL_STATE_PROBE_SCRIPT
+
+
+STATE_BACKENDS = {
+    DomStateBackend.name: DomStateBackend,
+    GameModelStateBackend.name: GameModelStateBackend,
+}
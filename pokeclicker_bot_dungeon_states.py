@@ -0,0 +1,156 @@
+import time
+
+from pokeclicker_bot_metrics import LatencyHistogram
+
+# États de l'exploration d'un donjon
+EXPLORING = "exploring"
+BATTLE = "battle"
+CHEST = "chest"
+BOSS = "boss"
+RECOVERING = "recovering"
+FINISHED = "finished"
+
+# Méthode du bot qui traite chaque état: elle ne lit que les données utiles à cet état
+# et retourne l'événement qui décide de la transition suivante
+STATE_HANDLERS = {
+    EXPLORING: "run_exploring_state",
+    BATTLE: "run_battle_state",
+    CHEST: "run_chest_state",
+    BOSS: "run_boss_state",
+    RECOVERING: "run_recovering_state",
+}
+
+# Événement -> état suivant. Les états lus dans la page (check_game_state) sont aussi des événements;
+# None: rester dans l'état courant
+TRANSITIONS = {
+    "exploring": EXPLORING,
+    "battle": BATTLE,
+    "chest": CHEST,
+    "boss": BOSS,
+    "chest_skipped": EXPLORING,
+    "stalled": RECOVERING,
+    "timeout": RECOVERING,
+    "error": RECOVERING,
+    "unknown": FINISHED,        # Plus dans un donjon: terminé ou quitté (fin du temps imparti...)
+    "boss_defeated": FINISHED,
+    "boss_failed": FINISHED,
+    "aborted": FINISHED,
+}
+
+# Transitions propres à un état (prioritaires sur TRANSITIONS)
+STATE_TRANSITIONS = {
+    (RECOVERING, "timeout"): FINISHED,
+}
+
+# Durée maximale (s) passée sans interruption dans un état avant l'événement "timeout"
+# (l'exploration est surveillée par sa progression: voir STALL_TIMEOUT)
+STATE_BUDGETS = {
+    BATTLE: 120,
+    CHEST: 10,
+    BOSS: 300,
+    RECOVERING: 60,
+}
+
+# Durée (s) sans nouvelle case découverte avant de passer en récupération
+STALL_TIMEOUT = 15
+
+
+class DungeonRun:
+    """
+    Contexte d'une exploration de donjon: état courant, statistiques, progression
+    et temps passé dans chaque état (un histogramme de durée par état)
+    """
+
+    def __init__(self, min_chests_required=0, timeout=600, max_ticks=250):
+        self.started = time.time()
+        self.min_chests_required = min_chests_required
+        self.timeout = timeout
+        self.max_ticks = max_ticks
+        self.ticks = 0
+
+        self.state = EXPLORING
+        self.state_entered = self.started
+        self.entered_by = None
+        self.result = None
+
+        # Dernière carte connue (relue en exploration et au début d'un combat) et suivi de la progression
+        self.dungeon_map = None
+        self.last_map_version = None
+        self.last_visible_count = None
+        self.last_progress = self.started
+        self.consecutive_failures = 0
+        self.recoveries = 0
+
+        self.stats = {
+            "chests_opened": 0,
+            "enemies_defeated": 0,
+            "tiles_explored": 0,
+            "phase_changes": 0,
+            "current_phase": "initial"
+        }
+
+        # Durée de chaque appel de traitement et temps total par état
+        self.timings = {}
+        self.time_in_states = {}
+        self.transitions = {}
+
+    @property
+    def chests_needed(self):
+        """Coffres restant à ouvrir avant de pouvoir ignorer les autres coffres"""
+        return max(0, self.min_chests_required - self.stats["chests_opened"])
+
+    def elapsed(self):
+        return time.time() - self.started
+
+    def time_in_state(self):
+        return time.time() - self.state_entered
+
+    def note_progress(self):
+        """Nouvelle case découverte ou action utile: la récupération repart de zéro"""
+        self.last_progress = time.time()
+        self.recoveries = 0
+
+    def record_tick(self, state, seconds):
+        """Mesurer la durée d'un appel de traitement"""
+        self.ticks += 1
+        histogram = self.timings.get(state)
+        if histogram is None:
+            histogram = self.timings[state] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def next_state(self, event):
+        """État suivant pour un événement (None: rester dans l'état courant)"""
+        if event is None:
+            return self.state
+        next_state = STATE_TRANSITIONS.get((self.state, event), TRANSITIONS.get(event))
+        return next_state if next_state is not None else self.state
+
+    def budget_exceeded(self):
+        budget = STATE_BUDGETS.get(self.state)
+        return budget is not None and self.time_in_state() > budget
+
+    def enter(self, state, event=None):
+        """Passer dans un nouvel état (le temps passé dans l'état précédent est comptabilisé)"""
+        now = time.time()
+        self.time_in_states[self.state] = self.time_in_states.get(self.state, 0) + now - self.state_entered
+        key = (self.state, event, state)
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        self.state = state
+        self.state_entered = now
+        self.entered_by = event
+
+    def finish(self, result):
+        self.result = result
+        if self.state != FINISHED:
+            self.enter(FINISHED, "finish")
+
+    def report_lines(self):
+        """Temps passé par état et durée des appels de traitement (ms)"""
+        lines = []
+        for state, histogram in sorted(self.timings.items(), key=lambda item: item[1].total, reverse=True):
+            stats = histogram.summary()
+            lines.append(
+                f"{state}: {self.time_in_states.get(state, 0):.1f}s, n={stats['count']} "
+                f"p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms max={stats['max_ms']:.1f}ms"
+            )
+        return lines
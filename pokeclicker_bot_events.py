@@ -0,0 +1,236 @@
+import time
+
+# Taille maximale de la file d'événements conservée dans la page
+EVENT_QUEUE_LIMIT = 500
+
+# Événements de la page qui signalent qu'un déplacement a produit un effet
+MOVE_EVENTS = ["battle_start", "chest_visible", "boss_revealed", "tile_revealed", "dungeon_end"]
+
+# Enregistreur installé une seule fois dans la page: il observe les mutations du DOM
+# (et les observables du jeu quand ils existent) et met en file les changements d'état
+EVENT_RECORDER_SCRIPT = """
+    if (window.__pcbEvents && window.__pcbEvents.observer) { return true; }
+    if (!document.body) { return false; }
+
+    var rec = window.__pcbEvents = {
+        queue: [],
+        seq: 0,
+        waiters: [],
+        flags: {},
+        visibleTiles: 0,
+        modelChests: false,
+        limit: arguments[0] || 500
+    };
+
+    rec.push = function(type, data) {
+        rec.seq += 1;
+        rec.queue.push({ type: type, seq: rec.seq, t: Date.now(), data: data || null });
+        if (rec.queue.length > rec.limit) {
+            rec.queue.splice(0, rec.queue.length - rec.limit);
+        }
+        var waiters = rec.waiters;
+        rec.waiters = [];
+        for (var i = 0; i < waiters.length; i++) {
+            try { waiters[i](); } catch (e) {}
+        }
+    };
+
+    function readFlags() {
+        var table = document.querySelector('table.dungeon-board');
+        return {
+            in_dungeon: !!table,
+            in_battle: !!document.querySelector("div[data-bind*='DungeonBattle.enemyPokemon']"),
+            chest: !!document.querySelector('div.dungeon-chest'),
+            boss: !!document.querySelector('button.btn-danger.dungeon-button')
+                || !!(table && table.querySelector('td.tile-boss')),
+            visible: table ? table.querySelectorAll('td.tile:not(.tile-invisible)').length : 0
+        };
+    }
+
+    rec.check = function() {
+        var f = readFlags();
+        var prev = rec.flags;
+        if (f.in_dungeon && !prev.in_dungeon) { rec.push('dungeon_start'); }
+        if (!f.in_dungeon && prev.in_dungeon) { rec.push('dungeon_end'); }
+        if (f.in_battle && !prev.in_battle) { rec.push('battle_start'); }
+        if (!f.in_battle && prev.in_battle) { rec.push('battle_end'); }
+        if (f.chest && !prev.chest) { rec.push('chest_visible'); }
+        if (!f.chest && prev.chest && f.in_dungeon && !rec.modelChests) { rec.push('chest_opened'); }
+        if (f.boss && !prev.boss) { rec.push('boss_revealed'); }
+        if (f.in_dungeon && f.visible > rec.visibleTiles && prev.in_dungeon) {
+            rec.push('tile_revealed', { visible: f.visible, delta: f.visible - rec.visibleTiles });
+        }
+        rec.visibleTiles = f.visible;
+        rec.flags = f;
+    };
+
+    function scanToasts(node) {
+        if (!node || node.nodeType !== 1) { return; }
+        var toasts = node.matches('.toast-body') ? [node] : node.querySelectorAll('.toast-body');
+        for (var i = 0; i < toasts.length; i++) {
+            var text = toasts[i].textContent || '';
+            if (text.indexOf('You have captured') !== -1) {
+                rec.push('capture', { text: text.trim() });
+            }
+        }
+    }
+
+    rec.observer = new MutationObserver(function(mutations) {
+        for (var i = 0; i < mutations.length; i++) {
+            var added = mutations[i].addedNodes;
+            for (var j = 0; j < added.length; j++) { scanToasts(added[j]); }
+        }
+        rec.check();
+    });
+    rec.observer.observe(document.body, {
+        subtree: true,
+        childList: true,
+        attributes: true,
+        attributeFilter: ['class']
+    });
+
+    // Abonnements directs au modèle du jeu quand il est disponible
+    try {
+        if (typeof ko !== 'undefined' && typeof DungeonRunner !== 'undefined'
+                && ko.isObservable(DungeonRunner.chestsOpened)) {
+            DungeonRunner.chestsOpened.subscribe(function(count) {
+                if (count > 0) { rec.push('chest_opened', { count: count }); }
+            });
+            rec.modelChests = true;
+        }
+    } catch (e) {}
+    try {
+        if (typeof ko !== 'undefined' && typeof DungeonBattle !== 'undefined'
+                && ko.isObservable(DungeonBattle.enemyPokemon)) {
+            DungeonBattle.enemyPokemon.subscribe(function() { rec.check(); });
+        }
+    } catch (e) {}
+
+    rec.check();
+    return true;
+"""
+
+DRAIN_EVENTS_SCRIPT = """
+    var rec = window.__pcbEvents;
+    if (!rec) { return null; }
+    var events = rec.queue;
+    rec.queue = [];
+    return events;
+"""
+
+# Attente asynchrone: rend la main dès qu'un événement attendu est en file, sinon au timeout
+WAIT_FOR_EVENT_SCRIPT = """
+    var types = arguments[0];
+    var timeoutMs = arguments[1];
+    var done = arguments[arguments.length - 1];
+    var rec = window.__pcbEvents;
+    if (!rec) { done(null); return; }
+
+    function matches() {
+        if (!types || !types.length) { return rec.queue.length > 0; }
+        for (var i = 0; i < rec.queue.length; i++) {
+            if (types.indexOf(rec.queue[i].type) !== -1) { return true; }
+        }
+        return false;
+    }
+    function drain() {
+        var events = rec.queue;
+        rec.queue = [];
+        return events;
+    }
+
+    if (matches()) { done(drain()); return; }
+
+    var finished = false;
+    var timer = setTimeout(function() {
+        finished = true;
+        done(drain());
+    }, timeoutMs);
+    function waiter() {
+        if (finished) { return; }
+        if (matches()) {
+            finished = true;
+            clearTimeout(timer);
+            done(drain());
+        } else {
+            rec.waiters.push(waiter);
+        }
+    }
+    rec.waiters.push(waiter);
+"""
+
+
+class PokeclickerBotEvents:
+    """
+    Canal d'événements poussés par la page (combat, coffre, boss, cases révélées, captures)
+    Remplace les attentes à intervalle fixe: le bot réagit dès que l'événement arrive
+    """
+
+    def install_event_recorder(self):
+        """Installer l'enregistreur d'événements dans la page (sans effet s'il est déjà actif)"""
+        try:
+            installed = bool(self.run_js(EVENT_RECORDER_SCRIPT, EVENT_QUEUE_LIMIT))
+        except Exception as e:
+            self.log(f"Erreur lors de l'installation du canal d'événements: {str(e)}")
+            installed = False
+
+        self.event_channel_ready = installed
+        return installed
+
+    def drain_events(self):
+        """Récupérer et vider la file d'événements de la page en un seul appel"""
+        if not getattr(self, "use_event_channel", True):
+            return []
+
+        try:
+            events = self.run_js(DRAIN_EVENTS_SCRIPT)
+        except Exception as e:
+            self.log(f"Erreur lors de la lecture des événements: {str(e)}")
+            return []
+
+        if events is None:
+            # La page a été rechargée: réinstaller l'enregistreur pour les prochains appels
+            self.install_event_recorder()
+            return []
+
+        return events
+
+    def wait_for_event(self, event_types=None, timeout=1.0):
+        """
+        Bloquer jusqu'au prochain événement attendu (ou n'importe lequel si event_types est vide)
+        Retourne tous les événements en file; sans canal disponible, attend simplement timeout
+        """
+        if not getattr(self, "use_event_channel", True):
+            time.sleep(timeout)
+            return []
+
+        # Attente précédente en échec: réinstaller l'enregistreur plutôt que de renoncer au canal
+        if getattr(self, "_event_channel_lost", False):
+            self._event_channel_lost = not self.install_event_recorder()
+
+        if not getattr(self, "event_channel_ready", False):
+            time.sleep(timeout)
+            return []
+
+        try:
+            events = self.run_js_async(
+                WAIT_FOR_EVENT_SCRIPT, list(event_types or []), int(timeout * 1000)
+            )
+        except Exception as e:
+            self.log(f"Erreur lors de l'attente d'un événement: {str(e)}")
+            self.event_channel_ready = False
+            self._event_channel_lost = True
+            time.sleep(timeout)
+            return []
+
+        if events is None:
+            # Enregistreur perdu (rechargement de la page): réinstaller et attendre normalement
+            self.install_event_recorder()
+            time.sleep(timeout)
+            return []
+
+        return events
+
+    def has_event(self, events, *event_types):
+        """Vérifier si une liste d'événements contient l'un des types donnés"""
+        return any(event.get("type") in event_types for event in events or [])
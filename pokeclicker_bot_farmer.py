@@ -1,6 +1,147 @@
 import time
 import threading
 
+# Durée maximale (s) consacrée à la capture d'un Pokémon cible avant d'abandonner
+CAPTURE_TIMEOUT = 10
+
+# Moteur de farming installé dans la page: il intercepte Battle.generateNewEnemy et
+# Battle.catchPokemon, filtre l'espèce cible dans la page et ne réveille le bot (via le canal
+# d'événements) que lorsqu'une cible apparaît, est capturée ou s'échappe
+FARMING_ENGINE_SCRIPT = """
+    var target = String(arguments[0] || '').toLowerCase();
+    var rerollMs = Math.max(10, arguments[1]);
+    var attackMs = Math.max(1, arguments[2]);
+    var captureTimeoutMs = arguments[3];
+    var rec = window.__pcbEvents;
+    if (!rec || typeof Battle === 'undefined' || typeof Battle.generateNewEnemy !== 'function') {
+        return null;
+    }
+
+    var farm = window.__pcbFarm;
+    if (farm && farm.timer) { clearInterval(farm.timer); }
+    farm = window.__pcbFarm = {
+        active: true,
+        target: target,
+        encounters: 0,
+        found: 0,
+        captures: 0,
+        escapes: 0,
+        rerolls: 0,
+        attacks: 0,
+        hunting: null,
+        lastReroll: 0,
+        started: Date.now(),
+        timer: null
+    };
+
+    function enemyName() {
+        try {
+            var enemy = Battle.enemyPokemon();
+            return enemy ? String(ko.unwrap(enemy.name)) : null;
+        } catch (e) { return null; }
+    }
+
+    farm.onEnemy = function() {
+        var name = enemyName();
+        if (!name) { return; }
+        farm.encounters += 1;
+        if (name.toLowerCase() === farm.target) {
+            farm.found += 1;
+            farm.hunting = { name: name, since: Date.now() };
+            rec.push('target_found', { name: name, encounters: farm.encounters });
+        } else {
+            farm.hunting = null;
+        }
+    };
+
+    farm.onCatch = function(enemy) {
+        var name = null;
+        try { name = String(ko.unwrap(enemy.name)); } catch (e) {}
+        if (name && name.toLowerCase() === farm.target) {
+            farm.captures += 1;
+            farm.hunting = null;
+            rec.push('target_captured', { name: name, captures: farm.captures });
+        }
+    };
+
+    // Interceptions installées une seule fois: elles délèguent au moteur actif
+    if (!Battle.__pcbGenerateNewEnemy) {
+        Battle.__pcbGenerateNewEnemy = Battle.generateNewEnemy;
+        Battle.generateNewEnemy = function() {
+            var result = Battle.__pcbGenerateNewEnemy.apply(this, arguments);
+            var engine = window.__pcbFarm;
+            if (engine && engine.active) { engine.onEnemy(); }
+            return result;
+        };
+    }
+    if (typeof Battle.catchPokemon === 'function' && !Battle.__pcbCatchPokemon) {
+        Battle.__pcbCatchPokemon = Battle.catchPokemon;
+        Battle.catchPokemon = function(enemy) {
+            var result = Battle.__pcbCatchPokemon.apply(this, arguments);
+            var engine = window.__pcbFarm;
+            if (engine && engine.active) { engine.onCatch(enemy); }
+            return result;
+        };
+    }
+
+    farm.timer = setInterval(function() {
+        if (!farm.active) { return; }
+        var now = Date.now();
+        if (farm.hunting) {
+            if (now - farm.hunting.since > captureTimeoutMs) {
+                farm.escapes += 1;
+                rec.push('target_escaped', { name: farm.hunting.name });
+                farm.hunting = null;
+            } else {
+                try {
+                    Battle.clickAttack();
+                    farm.attacks += 1;
+                } catch (e) {}
+                return;
+            }
+        }
+        if (now - farm.lastReroll >= rerollMs) {
+            farm.lastReroll = now;
+            try {
+                Battle.generateNewEnemy();
+                farm.rerolls += 1;
+            } catch (e) {}
+        }
+    }, Math.min(rerollMs, attackMs));
+
+    // Le Pokémon déjà affiché peut être la cible
+    farm.onEnemy();
+    return { catch_hook: !!Battle.__pcbCatchPokemon };
+"""
+
+FARMING_STATUS_SCRIPT = """
+    var farm = window.__pcbFarm;
+    if (!farm || !farm.active) { return null; }
+    return {
+        encounters: farm.encounters,
+        found: farm.found,
+        captures: farm.captures,
+        escapes: farm.escapes,
+        rerolls: farm.rerolls,
+        attacks: farm.attacks,
+        hunting: !!farm.hunting,
+        elapsed: (Date.now() - farm.started) / 1000
+    };
+"""
+
+STOP_FARMING_ENGINE_SCRIPT = """
+    var farm = window.__pcbFarm;
+    if (!farm) { return null; }
+    if (farm.timer) { clearInterval(farm.timer); }
+    farm.timer = null;
+    farm.active = false;
+    farm.hunting = null;
+    return { encounters: farm.encounters, rerolls: farm.rerolls, attacks: farm.attacks };
+"""
+
+# Événements du moteur de farming qui réveillent le bot
+FARMING_EVENTS = ["target_found", "target_captured", "target_escaped", "capture"]
+
 class PokeclickerBotFarmer:
     def farm_pokemon(self):
         """Fonction principale pour le farming automatisé"""
@@ -18,6 +159,10 @@ class PokeclickerBotFarmer:
         # Attendre que le jeu soit chargé
         time.sleep(2)
         
+        # Canal d'événements pour détecter les captures sans parcourir les notifications
+        if getattr(self, "use_event_channel", True):
+            self.install_event_recorder()
+        
         # Au lieu de cliquer sur la route, essayons d'appeler directement la fonction JavaScript
         try:
             self.driver.execute_script(f"MapHelper.moveToRoute({self.target_route}, 2);")
@@ -25,6 +170,25 @@ class PokeclickerBotFarmer:
         except Exception as e:
             self.log(f"Erreur lors de la navigation vers la route: {str(e)}")
         
+        engine = None
+        if getattr(self, "farming_mode", "in_page") == "in_page" and self.event_channel_ready:
+            engine = self.install_farming_engine()
+        
+        if engine is not None:
+            self.farm_pokemon_in_page(engine)
+        else:
+            self.farm_pokemon_with_webdriver()
+        
+        elapsed_time = int(time.time() - self.start_time)
+        self.log(f"========== FARMING TERMINÉ ==========")
+        self.log(f"Durée totale: {elapsed_time} secondes")
+        self.log(f"Clics: {self.clicks}")
+        self.log(f"Pokémon cible trouvés: {self.pokemon_found}")
+        self.log(f"Pokémon capturés: {self.pokemon_caught}")
+        self.log_driver_metrics()
+    
+    def farm_pokemon_with_webdriver(self):
+        """Boucle de farming historique: lecture du nom et capture pilotées depuis Python"""
         last_pokemon_name = None
         while self.running:
             try:
@@ -47,13 +211,17 @@ class PokeclickerBotFarmer:
                         capture_clicks = 0
                         captured = False
                         
-                        while self.running and not captured and (time.time() - capture_start_time < 10):
+                        # Oublier les notifications antérieures à cette rencontre
+                        if self.event_channel_ready:
+                            self.drain_events()
+                        
+                        while self.running and not captured and (time.time() - capture_start_time < CAPTURE_TIMEOUT):
                             # Cliquer sur le Pokémon
                             if self.click_on_pokemon():
                                 capture_clicks += 1
                                 
                                 # Vérifier si le Pokémon a été capturé
-                                if self.check_capture_notification():
+                                if self.is_target_captured():
                                     captured = True
                                     self.pokemon_caught += 1
                                     self.log(f"SUCCÈS! {self.target_pokemon} a été capturé après {capture_clicks} clics!")
@@ -63,7 +231,7 @@ class PokeclickerBotFarmer:
                             time.sleep(0.01)
                         
                         if not captured:
-                            self.log(f"Échec de la capture après {capture_clicks} clics et 10 secondes")
+                            self.log(f"Échec de la capture après {capture_clicks} clics et {CAPTURE_TIMEOUT} secondes")
                     else:
                         # Ce n'est pas le bon Pokémon, essayer d'en générer un nouveau 
                         # en cliquant sur un autre endroit (ou en rafraîchissant l'ennemi)
@@ -98,13 +266,116 @@ class PokeclickerBotFarmer:
             except Exception as e:
                 self.log(f"Erreur pendant le farming: {str(e)}")
                 time.sleep(1)
+
+    def install_farming_engine(self):
+        """
+        Installer le moteur de farming dans la page (nécessite le canal d'événements)
+        Retourne les capacités du moteur, ou None si le jeu n'expose pas Battle
+        """
+        reroll_ms = int(getattr(self, "farm_reroll_interval", 0.05) * 1000)
+        attack_ms = int(1000 / max(1, getattr(self, "attack_rate", 100)))
+        try:
+            engine = self.run_js(
+                FARMING_ENGINE_SCRIPT, self.target_pokemon, reroll_ms, attack_ms, CAPTURE_TIMEOUT * 1000
+            )
+        except Exception as e:
+            self.log(f"Erreur lors de l'installation du moteur de farming: {str(e)}")
+            return None
         
-        elapsed_time = int(time.time() - self.start_time)
-        self.log(f"========== FARMING TERMINÉ ==========")
-        self.log(f"Durée totale: {elapsed_time} secondes")
-        self.log(f"Clics: {self.clicks}")
-        self.log(f"Pokémon cible trouvés: {self.pokemon_found}")
-        self.log(f"Pokémon capturés: {self.pokemon_caught}")
+        if engine is None:
+            self.log("Moteur de farming indisponible, utilisation de la boucle WebDriver")
+            return None
+        
+        self.log("Moteur de farming installé dans la page")
+        return engine
+    
+    def get_farming_status(self):
+        """Lire les compteurs du moteur de farming (None s'il n'est plus actif dans la page)"""
+        try:
+            return self.run_js(FARMING_STATUS_SCRIPT)
+        except Exception as e:
+            self.log(f"Erreur lors de la lecture du statut du farming: {str(e)}")
+            return None
+    
+    def stop_farming_engine(self):
+        """Arrêter le moteur de farming dans la page"""
+        try:
+            return self.run_js(STOP_FARMING_ENGINE_SCRIPT)
+        except Exception as e:
+            self.log(f"Erreur lors de l'arrêt du moteur de farming: {str(e)}")
+            return None
+    
+    def farm_pokemon_in_page(self, engine):
+        """
+        Farming piloté par la page: le bot dort jusqu'à ce que le moteur signale
+        une cible trouvée, capturée ou échappée
+        """
+        status_interval = getattr(self, "farm_status_interval", 10)
+        last_status_time = time.time()
+        
+        while self.running:
+            try:
+                events = self.wait_for_event(FARMING_EVENTS, timeout=1.0)
+                
+                for event in events:
+                    event_type = event.get("type")
+                    data = event.get("data") or {}
+                    
+                    if event_type == "target_found":
+                        self.pokemon_found += 1
+                        self.log(f"POKÉMON CIBLE TROUVÉ: {data.get('name', self.target_pokemon)} (rencontre n°{data.get('encounters')})")
+                    elif event_type == "target_captured":
+                        self.pokemon_caught += 1
+                        self.log(f"SUCCÈS! {self.target_pokemon} a été capturé!")
+                    elif event_type == "target_escaped":
+                        self.log(f"Échec de la capture après {CAPTURE_TIMEOUT} secondes")
+                    elif event_type == "capture" and not engine.get("catch_hook"):
+                        # Sans interception de Battle.catchPokemon, les notifications font foi
+                        if f"You have captured a {self.target_pokemon}" in data.get("text", ""):
+                            self.pokemon_caught += 1
+                            self.log(f"SUCCÈS! {self.target_pokemon} a été capturé!")
+                
+                if time.time() - last_status_time >= status_interval:
+                    last_status_time = time.time()
+                    status = self.get_farming_status()
+                    if status is None:
+                        # Page rechargée: réinstaller le canal, la route et le moteur
+                        self.log("Moteur de farming perdu, réinstallation...")
+                        self.install_event_recorder()
+                        self.driver.execute_script(f"MapHelper.moveToRoute({self.target_route}, 2);")
+                        engine = self.install_farming_engine() or engine
+                        continue
+                    
+                    self.clicks = status["rerolls"] + status["attacks"]
+                    elapsed_time = int(time.time() - self.start_time)
+                    self.log(f"Statistiques: {status['encounters']} rencontres, {self.clicks} clics, {self.pokemon_found} trouvés, {self.pokemon_caught} capturés, {elapsed_time}s écoulées")
+                
+            except Exception as e:
+                self.log(f"Erreur pendant le farming: {str(e)}")
+                time.sleep(1)
+        
+        final_status = self.stop_farming_engine()
+        if final_status:
+            self.clicks = final_status["rerolls"] + final_status["attacks"]
+            self.log(f"Rencontres examinées dans la page: {final_status['encounters']}")
+    
+    def is_target_captured(self):
+        """
+        Vérifier si le Pokémon cible vient d'être capturé
+        Utilise les notifications poussées par la page si le canal est actif, sinon parcourt les toasts
+        """
+        if not self.event_channel_ready:
+            return self.check_capture_notification()
+        
+        for event in self.drain_events():
+            if event.get("type") != "capture":
+                continue
+            text = (event.get("data") or {}).get("text", "")
+            if f"You have captured a {self.target_pokemon}" in text:
+                self.log(f"Notification de capture trouvée pour {self.target_pokemon}")
+                return True
+        
+        return False
     
     def start_farming_thread(self):
         """Démarrer le farming dans un thread séparé"""
@@ -0,0 +1,231 @@
+import sys
+import threading
+import time
+
+# Sous-compartiments par puissance de deux: 2**7 = 128, soit moins de 1% d'erreur relative
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+
+# Appels WebDriver mesurés sur le driver et sur les éléments qu'il retourne
+DRIVER_METHODS = ("find_element", "find_elements", "execute_script", "execute_async_script", "execute_cdp_cmd")
+ELEMENT_METHODS = ("find_element", "find_elements", "get_attribute", "click", "is_displayed", "is_enabled")
+
+# Méthodes intermédiaires ignorées pour attribuer un appel à la méthode du bot qui l'a demandé
+PASSTHROUGH_METHODS = frozenset(["run_js", "run_js_async", "<lambda>"])
+
+
+def bucket_index(value):
+    """Compartiment HDR d'une valeur entière (linéaire jusqu'à 128, puis logarithmique)"""
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+
+def bucket_value(index):
+    """Valeur représentative (milieu) d'un compartiment HDR"""
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    lower = (index - (shift << (SUB_BUCKET_BITS - 1))) << shift
+    return lower + ((1 << shift) >> 1)
+
+
+class LatencyHistogram:
+    """
+    Histogramme de latences à précision relative constante (style HdrHistogram)
+    Les durées sont enregistrées en microsecondes; la mémoire ne dépend que de l'étendue des valeurs
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        """Enregistrer une durée exprimée en secondes"""
+        value = max(0, int(seconds * 1000000))
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percentile):
+        """Latence (ms) en dessous de laquelle se trouvent percentile % des appels"""
+        if not self.count:
+            return 0.0
+
+        threshold = self.count * percentile / 100
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= threshold:
+                return min(bucket_value(index), self.max) / 1000
+        return self.max / 1000
+
+    def mean(self):
+        """Latence moyenne (ms)"""
+        return self.total / self.count / 1000 if self.count else 0.0
+
+    def summary(self):
+        """Résumé chiffré: nombre d'appels, moyenne, p50/p95/p99 et maximum (ms)"""
+        return {
+            "count": self.count,
+            "total_ms": self.total / 1000,
+            "mean_ms": self.mean(),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": (self.max or 0) / 1000
+        }
+
+
+class DriverMetrics:
+    """Histogrammes de latence par site d'appel (méthode du bot + opération WebDriver)"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, caller, operation, seconds):
+        key = (caller, operation)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.started = time.time()
+
+    def summaries(self):
+        """Résumés triés par temps total décroissant (les sites les plus coûteux en premier)"""
+        with self.lock:
+            rows = [(caller, operation, histogram.summary())
+                    for (caller, operation), histogram in self.histograms.items()]
+        rows.sort(key=lambda row: row[2]["total_ms"], reverse=True)
+        return rows
+
+    def report_lines(self, limit=None):
+        """Lignes de rapport lisibles, une par site d'appel"""
+        rows = self.summaries()
+        if limit:
+            rows = rows[:limit]
+
+        lines = []
+        for caller, operation, stats in rows:
+            lines.append(
+                f"{caller}.{operation}: n={stats['count']} total={stats['total_ms']:.0f}ms "
+                f"p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms "
+                f"p99={stats['p99_ms']:.2f}ms max={stats['max_ms']:.2f}ms"
+            )
+        return lines
+
+
+def find_caller(owner):
+    """Nom de la méthode du bot à l'origine de l'appel WebDriver en cours"""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        name = frame.f_code.co_name
+        if name not in PASSTHROUGH_METHODS:
+            if frame.f_locals.get("self") is owner:
+                return name
+            if fallback is None:
+                fallback = name
+        frame = frame.f_back
+    return fallback or "?"
+
+
+def unwrap(value):
+    """Retrouver l'objet Selenium d'origine (les arguments des scripts doivent être de vrais WebElement)"""
+    if isinstance(value, InstrumentedElement):
+        return value._element
+    if isinstance(value, (list, tuple)):
+        return type(value)(unwrap(item) for item in value)
+    return value
+
+
+class InstrumentedProxy:
+    """Base des proxys: délègue tout à l'objet enveloppé et chronomètre les méthodes listées"""
+
+    instrumented_methods = ()
+
+    def __init__(self, target, metrics, owner):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_metrics", metrics)
+        object.__setattr__(self, "_owner", owner)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if name not in self.instrumented_methods or not callable(attribute):
+            return attribute
+
+        def timed(*args, **kwargs):
+            caller = find_caller(self._owner)
+            start = time.perf_counter()
+            try:
+                result = attribute(*unwrap(args), **kwargs)
+            finally:
+                self._metrics.record(caller, name, time.perf_counter() - start)
+            return self._wrap_result(result)
+
+        return timed
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def _wrap_result(self, result):
+        """Envelopper les éléments retournés pour mesurer aussi leurs appels"""
+        if hasattr(result, "get_attribute") and hasattr(result, "id"):
+            return InstrumentedElement(result, self._metrics, self._owner)
+        if isinstance(result, list) and result and hasattr(result[0], "get_attribute"):
+            return [InstrumentedElement(item, self._metrics, self._owner) for item in result]
+        return result
+
+
+class InstrumentedDriver(InstrumentedProxy):
+    """
+    Proxy du WebDriver qui mesure la latence de chaque appel, attribuée à la méthode du bot appelante
+    S'utilise à la place de self.driver sans modifier le reste du code
+    """
+
+    instrumented_methods = DRIVER_METHODS
+
+    @property
+    def wrapped_driver(self):
+        """WebDriver Selenium d'origine"""
+        return self._target
+
+
+class InstrumentedElement(InstrumentedProxy):
+    """Proxy d'un WebElement retourné par le driver instrumenté"""
+
+    instrumented_methods = ELEMENT_METHODS
+
+    @property
+    def _element(self):
+        return self._target
+
+    @property
+    def text(self):
+        caller = find_caller(self._owner)
+        start = time.perf_counter()
+        try:
+            return self._target.text
+        finally:
+            self._metrics.record(caller, "text", time.perf_counter() - start)
+
+    def __eq__(self, other):
+        return self._target == unwrap(other)
+
+    def __hash__(self):
+        return hash(self._target)
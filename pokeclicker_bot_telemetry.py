@@ -0,0 +1,237 @@
+import argparse
+import glob
+import json
+import math
+import os
+import threading
+import time
+
+# Version du format des enregistrements de combat (une ligne JSON par combat)
+TELEMETRY_VERSION = 1
+
+# Intervalle minimal (s) entre deux points de la courbe de santé d'un combat
+SAMPLE_INTERVAL = 0.1
+
+# Percentiles rapportés par l'agrégateur
+REPORT_PERCENTILES = (10, 50, 90)
+
+
+class BattleRecorder:
+    """
+    Série temporelle d'un combat: instants, santé de l'ennemi, clics effectués et latence des lectures,
+    plus les événements (blocage, déblocage, changement de cadence) et l'issue du combat
+    Les séries sont stockées en colonnes pour un enregistrement compact
+    """
+
+    def __init__(self, dungeon=None, boss=False, mode=None, rate=None):
+        self.started = time.time()
+        self.start_counter = time.perf_counter()
+        self.dungeon = dungeon
+        self.boss = boss
+        self.mode = mode
+        self.rate = rate
+        self.enemy = None
+        self.max_hp = None
+        self.first_hp = None
+        self.last_hp = None
+        self.clicks = 0
+        self.click_offset = 0
+        self.last_page_clicks = 0
+        self.last_sample_time = None
+        self.times = []
+        self.hps = []
+        self.click_counts = []
+        self.latencies = []
+        self.events = []
+
+    def elapsed(self):
+        """Temps écoulé (s) depuis le début du combat"""
+        return time.perf_counter() - self.start_counter
+
+    def count_clicks(self, clicks):
+        """
+        Mettre à jour le total de clics à partir d'un compteur qui peut repartir de zéro
+        (boucle d'attaque réinstallée dans la page)
+        """
+        if clicks < self.last_page_clicks:
+            self.click_offset += self.last_page_clicks
+        self.last_page_clicks = clicks
+        self.clicks = self.click_offset + clicks
+        return self.clicks
+
+    def sample(self, health_info, clicks, latency=None, force=False):
+        """Ajouter un point (santé, clics effectués, latence de la lecture en secondes)"""
+        now = self.elapsed()
+        self.count_clicks(clicks)
+        if health_info is None:
+            return
+
+        if self.max_hp is None:
+            self.max_hp = health_info["max"]
+            self.first_hp = health_info["current"]
+        if self.enemy is None:
+            self.enemy = health_info.get("name")
+        self.last_hp = health_info["current"]
+
+        if not force and self.last_sample_time is not None and now - self.last_sample_time < SAMPLE_INTERVAL:
+            return
+        self.last_sample_time = now
+        self.times.append(round(now, 3))
+        self.hps.append(health_info["current"])
+        self.click_counts.append(self.clicks)
+        self.latencies.append(round(latency * 1000, 2) if latency is not None else None)
+
+    def event(self, kind, detail=None):
+        """Noter un événement du combat (stuck, unblock, advanced_unblock, rate, loop_restart...)"""
+        self.events.append([round(self.elapsed(), 3), kind, detail])
+
+    def finish(self, outcome, clicks=None):
+        """Clore le combat et retourner son enregistrement"""
+        duration = self.elapsed()
+        if clicks is not None:
+            self.count_clicks(clicks)
+
+        # Un combat gagné se termine ennemi vaincu, même si la dernière lecture précède le coup final
+        if outcome == "won" and self.max_hp is not None:
+            self.times.append(round(duration, 3))
+            self.hps.append(0)
+            self.click_counts.append(self.clicks)
+            self.latencies.append(None)
+            self.last_hp = 0
+
+        damage = (self.first_hp - self.last_hp) if self.first_hp is not None else None
+        return {
+            "v": TELEMETRY_VERSION,
+            "started": round(self.started, 3),
+            "dungeon": self.dungeon,
+            "enemy": self.enemy,
+            "boss": self.boss,
+            "mode": self.mode,
+            "outcome": outcome,
+            "duration": round(duration, 3),
+            "clicks": self.clicks,
+            "attacks_per_second": round(self.clicks / duration, 2) if duration > 0 else None,
+            "max_hp": self.max_hp,
+            "damage": damage,
+            "dps": round(damage / duration, 2) if damage is not None and duration > 0 else None,
+            "rate": self.rate,
+            "t": self.times,
+            "hp": self.hps,
+            "clicks_at": self.click_counts,
+            "latency_ms": self.latencies,
+            "events": self.events
+        }
+
+
+class TelemetryWriter:
+    """Fichier JSONL en ajout seul, un par session: une ligne par combat"""
+
+    def __init__(self, directory="telemetry", session=None):
+        self.directory = directory
+        self.session = session or time.strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(directory, f"combat_{self.session}.jsonl")
+        self.lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as telemetry_file:
+                telemetry_file.write(line + "\n")
+
+
+def load_battles(paths):
+    """Lire les enregistrements de combat des fichiers donnés (lignes illisibles ignorées)"""
+    for path in paths:
+        with open(path, encoding="utf-8") as telemetry_file:
+            for line in telemetry_file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+
+def percentile(values, percent):
+    """Percentile par rang le plus proche d'une liste triée"""
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, math.ceil(percent / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def summarize_battles(records, by=("dungeon", "enemy")):
+    """
+    Distribution des dégâts/s par groupe (donjon et ennemi par défaut)
+    Seuls les combats gagnés entrent dans les distributions; les autres issues sont comptées à part
+    """
+    groups = {}
+    for record in records:
+        key = tuple("?" if record.get(field) is None else record[field] for field in by)
+        group = groups.setdefault(key, {"battles": 0, "outcomes": {}, "dps": [], "durations": [],
+                                        "attack_rates": [], "latencies": []})
+        group["battles"] += 1
+        outcome = record.get("outcome") or "?"
+        group["outcomes"][outcome] = group["outcomes"].get(outcome, 0) + 1
+        group["latencies"].extend(latency for latency in record.get("latency_ms") or [] if latency is not None)
+
+        if outcome == "won" and record.get("dps") is not None:
+            group["dps"].append(record["dps"])
+            group["durations"].append(record["duration"])
+            if record.get("attacks_per_second") is not None:
+                group["attack_rates"].append(record["attacks_per_second"])
+
+    summaries = {}
+    for key, group in groups.items():
+        for values in (group["dps"], group["durations"], group["attack_rates"], group["latencies"]):
+            values.sort()
+        summaries[key] = {
+            "battles": group["battles"],
+            "outcomes": group["outcomes"],
+            "dps": {p: percentile(group["dps"], p) for p in REPORT_PERCENTILES},
+            "mean_dps": sum(group["dps"]) / len(group["dps"]) if group["dps"] else None,
+            "duration_p50": percentile(group["durations"], 50),
+            "attack_rate_p50": percentile(group["attack_rates"], 50),
+            "latency_p95_ms": percentile(group["latencies"], 95)
+        }
+    return summaries
+
+
+def report_lines(summaries):
+    """Lignes de rapport lisibles, les groupes les plus fréquents en premier"""
+    def number(value, digits=1):
+        return "-" if value is None else f"{value:.{digits}f}"
+
+    lines = []
+    for key, stats in sorted(summaries.items(), key=lambda item: item[1]["battles"], reverse=True):
+        outcomes = ", ".join(f"{outcome}={count}" for outcome, count in sorted(stats["outcomes"].items()))
+        dps = " ".join(f"p{p}={number(value)}" for p, value in stats["dps"].items())
+        lines.append(
+            f"{' / '.join(str(part) for part in key)}: {stats['battles']} combats ({outcomes}) "
+            f"dégâts/s {dps} moyenne={number(stats['mean_dps'])} "
+            f"durée p50={number(stats['duration_p50'], 2)}s attaques/s p50={number(stats['attack_rate_p50'])} "
+            f"latence p95={number(stats['latency_p95_ms'], 2)}ms"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agrégation de la télémétrie des combats PokéClicker")
+    parser.add_argument("paths", nargs="*", default=[os.path.join("telemetry", "combat_*.jsonl")],
+                        help="fichiers JSONL de télémétrie (motifs acceptés)")
+    parser.add_argument("--by", default="dungeon,enemy",
+                        help="champs de regroupement séparés par des virgules (dungeon, enemy, boss, mode, rate)")
+    args = parser.parse_args()
+
+    paths = sorted(path for pattern in args.paths for path in glob.glob(pattern))
+    summaries = summarize_battles(load_battles(paths), by=tuple(field.strip() for field in args.by.split(",")))
+    for line in report_lines(summaries):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
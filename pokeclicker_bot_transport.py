@@ -0,0 +1,194 @@
+import json
+import threading
+import urllib.request
+
+from selenium.common.exceptions import JavascriptException, WebDriverException
+
+try:
+    import websocket  # Paquet optionnel websocket-client (transport "websocket")
+except ImportError:
+    websocket = None
+
+# Délai maximal (ms) accordé à un script asynchrone évalué via CDP
+ASYNC_SCRIPT_TIMEOUT = 30000
+
+
+def build_expression(script, args):
+    """Envelopper un corps de script WebDriver (return, arguments[i]) dans une expression CDP"""
+    return "(function() {\n" + script + "\n}).apply(window, " + json.dumps(list(args)) + ")"
+
+
+def build_async_expression(script, args, timeout_ms=ASYNC_SCRIPT_TIMEOUT):
+    """
+    Expression CDP équivalente à execute_async_script: le rappel est ajouté en dernier argument
+    et la promesse est rejetée si le script ne rappelle pas avant timeout_ms
+    """
+    return (
+        "new Promise(function(resolve, reject) {\n"
+        "    var args = " + json.dumps(list(args)) + ";\n"
+        "    var timer = setTimeout(function() { reject(new Error('script timeout')); }, " + str(int(timeout_ms)) + ");\n"
+        "    args.push(function(value) { clearTimeout(timer); resolve(value); });\n"
+        "    try {\n"
+        "        (function() {\n" + script + "\n        }).apply(window, args);\n"
+        "    } catch (e) {\n"
+        "        clearTimeout(timer);\n"
+        "        reject(e);\n"
+        "    }\n"
+        "})"
+    )
+
+
+def is_json_serializable(args):
+    """Les arguments CDP doivent être des valeurs JSON (pas de références d'éléments WebDriver)"""
+    try:
+        json.dumps(list(args))
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+class WebDriverTransport:
+    """
+    Évaluation JavaScript par le protocole WebDriver classique (requête HTTP vers chromedriver)
+    Fonctionne avec tous les navigateurs et accepte les éléments WebDriver en arguments
+    """
+
+    name = "webdriver"
+    fallback = None
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def execute(self, script, *args):
+        """Évaluer un script synchrone (même sémantique que driver.execute_script)"""
+        return self.driver.execute_script(script, *args)
+
+    def execute_async(self, script, *args):
+        """Évaluer un script asynchrone (même sémantique que driver.execute_async_script)"""
+        return self.driver.execute_async_script(script, *args)
+
+    def close(self):
+        """Libérer les ressources propres au transport"""
+        pass
+
+
+class CdpTransport(WebDriverTransport):
+    """
+    Évaluation via Chrome DevTools Protocol (Runtime.evaluate à travers execute_cdp_cmd)
+    Évite la sérialisation des scripts WebDriver; les arguments non JSON repassent par WebDriver
+    """
+
+    name = "cdp"
+    fallback = WebDriverTransport
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        if not hasattr(driver, "execute_cdp_cmd"):
+            raise WebDriverException("Le navigateur ne prend pas en charge Chrome DevTools Protocol")
+
+    def send_command(self, method, params):
+        """Envoyer une commande CDP et retourner son résultat"""
+        return self.driver.execute_cdp_cmd(method, params)
+
+    def evaluate(self, expression, await_promise=False):
+        """Évaluer une expression dans la page et retourner sa valeur sérialisée"""
+        response = self.send_command("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": await_promise
+        })
+
+        if response.get("exceptionDetails"):
+            details = response["exceptionDetails"]
+            exception = details.get("exception") or {}
+            message = exception.get("description") or details.get("text") or "Erreur JavaScript"
+            raise JavascriptException(message)
+
+        return (response.get("result") or {}).get("value")
+
+    def execute(self, script, *args):
+        if not is_json_serializable(args):
+            return super().execute(script, *args)
+        return self.evaluate(build_expression(script, args))
+
+    def execute_async(self, script, *args):
+        if not is_json_serializable(args):
+            return super().execute_async(script, *args)
+        return self.evaluate(build_async_expression(script, args), await_promise=True)
+
+
+class DevToolsWebSocketTransport(CdpTransport):
+    """
+    Évaluation CDP par une connexion websocket directe au navigateur (sans passer par chromedriver)
+    Nécessite le paquet websocket-client et l'adresse de débogage exposée par Chrome
+    """
+
+    name = "websocket"
+    fallback = CdpTransport
+
+    def __init__(self, driver):
+        super().__init__(driver)
+        if websocket is None:
+            raise WebDriverException("Le paquet websocket-client est requis pour le transport websocket")
+
+        chrome_options = driver.capabilities.get("goog:chromeOptions") or {}
+        self.debugger_address = chrome_options.get("debuggerAddress")
+        if not self.debugger_address:
+            raise WebDriverException("Adresse de débogage de Chrome introuvable")
+
+        self.connection = None
+        self.message_id = 0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        """Ouvrir la connexion websocket vers l'onglet piloté par le driver"""
+        with urllib.request.urlopen(f"http://{self.debugger_address}/json", timeout=5) as response:
+            targets = json.loads(response.read().decode("utf-8"))
+
+        pages = [target for target in targets if target.get("type") == "page"]
+        if not pages:
+            raise WebDriverException("Aucun onglet disponible pour le transport websocket")
+
+        # Chromedriver utilise l'identifiant de la cible comme handle de fenêtre
+        handle = self.driver.current_window_handle or ""
+        page = next((target for target in pages if target.get("id") and target["id"] in handle), pages[0])
+        self.connection = websocket.create_connection(page["webSocketDebuggerUrl"], timeout=ASYNC_SCRIPT_TIMEOUT / 1000)
+
+    def send_command(self, method, params):
+        with self.lock:
+            if self.connection is None:
+                self.connect()
+
+            self.message_id += 1
+            message_id = self.message_id
+            try:
+                self.connection.send(json.dumps({"id": message_id, "method": method, "params": params}))
+                # Ignorer les notifications CDP jusqu'à la réponse attendue
+                while True:
+                    message = json.loads(self.connection.recv())
+                    if message.get("id") == message_id:
+                        break
+            except Exception:
+                # Connexion perdue (navigation, onglet fermé): la prochaine commande se reconnecte
+                self.close()
+                raise
+
+        if "error" in message:
+            raise WebDriverException(message["error"].get("message", "Erreur CDP"))
+
+        return message.get("result") or {}
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+
+TRANSPORTS = {
+    WebDriverTransport.name: WebDriverTransport,
+    CdpTransport.name: CdpTransport,
+    DevToolsWebSocketTransport.name: DevToolsWebSocketTransport,
+}